@@ -0,0 +1,200 @@
+import os
+from datetime import date, timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select, text, tuple_, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from database import TimeOffRequest, TimeOffRequestArchive
+from overlap import unindex_request_days
+from versions import bump_versions
+
+# Closed requests that ended more than this many days ago move to
+# time_off_requests_archive, keeping the hot table and its indexes small.
+#
+# Reads that name a date range reaching back to archived dates (balances for
+# a past year, history or exports with an old `from`) also read the archive;
+# everything else, including unbounded dashboard lists and search, reads the
+# hot table only. staffing_coverage keeps counting archived requests, so the
+# coverage calendar is unchanged by archiving.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "730"))
+
+# Requests moved per transaction; each batch holds the write lock briefly
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+# Pending requests stay until they are decided, however old
+ARCHIVED_STATUSES = ("approved", "denied")
+
+ARCHIVE_TABLE = TimeOffRequestArchive.__table__
+
+# Columns copied as is; archived_at is set by the archive table
+_COPIED_COLUMNS = [column.name for column in TimeOffRequest.__table__.columns]
+
+def archive_cutoff(today: Optional[date] = None, age_days: Optional[int] = None) -> date:
+    """Requests that ended before this date are archived"""
+    if age_days is None:
+        age_days = ARCHIVE_AFTER_DAYS
+    return (today or date.today()) - timedelta(days=age_days)
+
+def archive_batch(connection: Connection, cutoff: date, batch_size: Optional[int] = None) -> int:
+    """Move up to batch_size closed requests that ended before cutoff, in one transaction
+
+    A Core move, so it removes the day index rows and bumps the managers'
+    request versions itself; the search triggers follow the DELETE.
+    Returns how many requests were moved.
+    """
+    if batch_size is None:
+        batch_size = ARCHIVE_BATCH_SIZE
+    with connection.begin():
+        if connection.dialect.name == "sqlite":
+            # Take the write lock before reading, so the rows read are the rows moved
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        rows = connection.execute(
+            select(TimeOffRequest.id, TimeOffRequest.manager_id)
+            # start_date <= end_date, so the start_date bound is implied; it lets
+            # idx_time_off_dates serve the scan
+            .where(TimeOffRequest.start_date < cutoff, TimeOffRequest.end_date < cutoff,
+                   TimeOffRequest.status.in_(ARCHIVED_STATUSES))
+            .order_by(TimeOffRequest.start_date)
+            .limit(batch_size)
+            .with_for_update()
+        ).all()
+        if not rows:
+            return 0
+
+        ids = [row.id for row in rows]
+        hot = TimeOffRequest.__table__
+        connection.execute(
+            insert(ARCHIVE_TABLE).from_select(
+                _COPIED_COLUMNS, select(*(hot.c[name] for name in _COPIED_COLUMNS)).where(hot.c.id.in_(ids)))
+        )
+        unindex_request_days(connection, ids)
+        connection.execute(delete(TimeOffRequest).where(TimeOffRequest.id.in_(ids)))
+        bump_versions(connection, [row.manager_id for row in rows])
+    return len(rows)
+
+def archive_requests(
+    connection: Connection,
+    cutoff: Optional[date] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Archive in bounded batches until nothing is left (or max_batches); returns requests moved"""
+    if cutoff is None:
+        cutoff = archive_cutoff()
+    if batch_size is None:
+        batch_size = ARCHIVE_BATCH_SIZE
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(connection, cutoff, batch_size)
+        moved += count
+        batches += 1
+        if count < batch_size:
+            break
+    return moved
+
+async def begin_read(db: AsyncSession):
+    """Make the session's following reads share one snapshot; call it before any write
+
+    pysqlite runs SELECTs outside any transaction, so on SQLite each read
+    would see its own snapshot until an explicit BEGIN. MySQL's REPEATABLE
+    READ transaction already does.
+    """
+    if db.bind.dialect.name == "sqlite":
+        await db.execute(text("BEGIN"))
+
+async def archived_through(db: AsyncSession) -> Optional[date]:
+    """Latest end_date in the archive (None while it is empty); one index lookup
+
+    Read it in the transaction that runs the query it decides on (see
+    begin_read), so an archive batch committed in between cannot hide rows
+    from both tables.
+    """
+    return (await db.execute(select(func.max(TimeOffRequestArchive.end_date)))).scalar()
+
+def needs_archive(
+    archived_until: Optional[date],
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> bool:
+    """Whether a read for [date_from, date_to] can match archived requests
+
+    Unbounded reads (no from and no to) stay on the hot table.
+    """
+    if archived_until is None or (date_from is None and date_to is None):
+        return False
+    # Archived requests all ended on or before archived_until
+    return date_from is None or date_from <= archived_until
+
+def archived_requests_query(
+    columns: Sequence[str],
+    manager_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    statuses: Optional[Sequence[str]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    after: Optional[tuple] = None,
+) -> Select:
+    """Archived requests with the named columns, overlapping [date_from, date_to]
+
+    `after` is a (start_date, id) keyset position, as in pagination.
+    """
+    archive = ARCHIVE_TABLE.c
+    query = select(*(archive[name] for name in columns))
+    if manager_id is not None:
+        query = query.where(archive.manager_id == manager_id)
+    if employee_id is not None:
+        query = query.where(archive.employee_id == employee_id)
+    if statuses is not None:
+        query = query.where(archive.status.in_(statuses))
+    if date_from is not None:
+        query = query.where(archive.end_date >= date_from)
+    if date_to is not None:
+        query = query.where(archive.start_date <= date_to)
+    if after is not None:
+        query = query.where(tuple_(archive.start_date, archive.id) > tuple_(*after))
+    return query
+
+def with_archive(
+    hot: Select,
+    archived: Select,
+    order_by: Sequence[str],
+    descending: bool = False,
+    limit: Optional[int] = None,
+) -> Select:
+    """hot UNION ALL archived, ordered and limited as a whole
+
+    The hot query's own ORDER BY and LIMIT are dropped; both sides must
+    select the same column names in the same order.
+    """
+    combined = union_all(hot.order_by(None).limit(None), archived).subquery("requests")
+    keys: List = [combined.c[name].desc() if descending else combined.c[name] for name in order_by]
+    query = select(combined).order_by(*keys)
+    return query.limit(limit) if limit is not None else query
+
+async def read_with_archive(
+    db: AsyncSession,
+    hot: Select,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    order_by: Sequence[str] = (),
+    descending: bool = False,
+    limit: Optional[int] = None,
+    archived: Optional[Select] = None,
+    **filters,
+) -> Select:
+    """`hot`, or hot plus the archive when [date_from, date_to] reaches archived dates
+
+    The archive side is archived_requests_query(**filters) over hot's columns
+    unless `archived` is given. Run the returned query on `db` before ending
+    its transaction: the decision holds for the snapshot it was made in.
+    """
+    await begin_read(db)
+    if not needs_archive(await archived_through(db), date_from, date_to):
+        return hot
+    if archived is None:
+        names = [column.key for column in hot.selected_columns]
+        archived = archived_requests_query(names, date_from=date_from, date_to=date_to, **filters)
+    return with_archive(hot, archived, order_by, descending, limit)
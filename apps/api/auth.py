@@ -0,0 +1,87 @@
+import math
+import os
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Manager
+from passwords import password_hasher
+from ratelimit import RateLimiter
+from sessions import session_store
+
+# Login attempts allowed per client IP, and per email address, in each window
+LOGIN_RATE_PER_IP = int(os.getenv("LOGIN_RATE_PER_IP", "20"))
+LOGIN_RATE_PER_EMAIL = int(os.getenv("LOGIN_RATE_PER_EMAIL", "5"))
+LOGIN_RATE_WINDOW = float(os.getenv("LOGIN_RATE_WINDOW", "60"))
+
+# Session cookie, named as in lib/auth/session.ts
+SESSION_COOKIE = "manager_session"
+
+# Send the cookie over HTTPS only (enable whenever the API is served over TLS)
+SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "false").strip().lower() in ("1", "true", "yes", "on")
+
+ip_limiter = RateLimiter(LOGIN_RATE_PER_IP, LOGIN_RATE_WINDOW)
+email_limiter = RateLimiter(LOGIN_RATE_PER_EMAIL, LOGIN_RATE_WINDOW)
+
+class InvalidCredentials(Exception):
+    """Unknown email or wrong password (deliberately indistinguishable)"""
+
+class LoginThrottled(Exception):
+    """Too many login attempts from this IP or for this email"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many login attempts, try again later")
+        self.retry_after = math.ceil(retry_after)
+
+async def authenticate(db: AsyncSession, email: str, password: str, client_ip: str) -> dict:
+    """Check a manager's credentials; returns the ManagerSession fields
+
+    Raises LoginThrottled before any hashing work, passwords.HasherBusy when the
+    hashing pool is saturated, and InvalidCredentials on a failed check.
+    """
+    # Emails compare case-insensitively, for the lookup and the throttle alike
+    email = email.strip().lower()
+    wait = ip_limiter.hit(client_ip) or email_limiter.hit(email)
+    if wait:
+        raise LoginThrottled(wait)
+
+    result = await db.execute(
+        select(Manager.id, Manager.name, Manager.email, Manager.password_hash).where(func.lower(Manager.email) == email))
+    manager = result.first()
+    # Return the connection to the pool while the hash runs
+    await db.rollback()
+
+    if manager is None:
+        await password_hasher.verify_dummy(password)
+        raise InvalidCredentials("Invalid email or password")
+    if not await password_hasher.verify(password, manager.password_hash):
+        raise InvalidCredentials("Invalid email or password")
+
+    email_limiter.reset(email)
+    if password_hasher.needs_rehash(manager.password_hash):
+        # BCRYPT_ROUNDS changed since this hash was made; only the login knows the password
+        new_hash = await password_hasher.hash(password)
+        await db.execute(
+            update(Manager)
+            .where(Manager.id == manager.id, Manager.password_hash == manager.password_hash)
+            .values(password_hash=new_hash)
+        )
+        await db.commit()
+    return {"id": manager.id, "name": manager.name, "email": manager.email, "authenticated": True}
+
+async def get_current_manager(request: Request) -> dict:
+    """The logged-in manager (ManagerSession fields), from the session cookie alone
+
+    The store caches the manager's identity, so protected routes run no
+    database query to authenticate.
+    """
+    token = request.cookies.get(SESSION_COOKIE)
+    manager = session_store.get(token) if token else None
+    if manager is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return manager
+
+async def get_current_manager_id(manager: dict = Depends(get_current_manager)) -> int:
+    """Identify the calling manager for /manager endpoints"""
+    return manager["id"]
@@ -0,0 +1,113 @@
+import os
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from database import Employee, TimeOffRequest
+
+# Working days per week, Monday first (numpy busday weekmask)
+WEEKMASK = os.getenv("BUSINESS_WEEKMASK", "1111100")
+
+# Paid leave granted per employee per year, in business days
+ANNUAL_ALLOWANCE_DAYS = float(os.getenv("ANNUAL_ALLOWANCE_DAYS", "20"))
+
+# Statuses that draw on the balance
+BALANCE_STATUSES = ("approved", "pending")
+
+def load_holidays(dates: Optional[str] = None, path: Optional[str] = None) -> np.ndarray:
+    """Holiday calendar from HOLIDAY_DATES (comma separated) and HOLIDAY_FILE (one ISO date per line)"""
+    dates = os.getenv("HOLIDAY_DATES", "") if dates is None else dates
+    path = os.getenv("HOLIDAY_FILE") if path is None else path
+    values = [value.strip() for value in dates.split(",")]
+    if path:
+        values += [line.split("#", 1)[0].strip() for line in Path(path).read_text().splitlines()]
+    return np.array(sorted({value for value in values if value}), dtype="datetime64[D]")
+
+class BusinessCalendar:
+    """Weekend mask plus holidays, precomputed once for numpy busday_count"""
+
+    def __init__(self, weekmask: str = WEEKMASK, holidays: Iterable = ()):
+        self.holidays = np.asarray(list(holidays), dtype="datetime64[D]")
+        self._calendar = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+
+    def business_days(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Business days in each inclusive [start, end] range; empty ranges count 0"""
+        starts = np.asarray(starts, dtype="datetime64[D]")
+        ends = np.asarray(ends, dtype="datetime64[D]") + np.timedelta64(1, "D")
+        return np.maximum(np.busday_count(starts, ends, busdaycal=self._calendar), 0)
+
+# date.toordinal() of the numpy datetime64 epoch (1970-01-01)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def to_datetime64(dates: Sequence[date]) -> np.ndarray:
+    """Convert Python dates via their ordinals; much faster than np.array(dates, "datetime64[D]")"""
+    ordinals = np.fromiter((day.toordinal() for day in dates), dtype=np.int64, count=len(dates))
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+default_calendar = BusinessCalendar(WEEKMASK, load_holidays())
+
+def request_business_days(start_date: date, end_date: date, calendar: BusinessCalendar = default_calendar) -> int:
+    return int(calendar.business_days(to_datetime64([start_date]), to_datetime64([end_date]))[0])
+
+def balances_query(year: int, manager_id: Optional[int] = None, employee_id: Optional[int] = None, table=None):
+    """Requests drawing on the balance that touch the given calendar year
+
+    Requests are grouped under their employee's name, so differently spelled
+    submissions by one employee share a balance. Reads time_off_requests, or
+    the given table with the same columns (the archive).
+    """
+    if table is None:
+        table = TimeOffRequest.__table__
+    requests = table.c
+    query = select(
+        func.coalesce(Employee.name, requests.employee_name).label("employee_name"),
+        requests.start_date,
+        requests.end_date,
+        requests.status,
+    ).select_from(table).outerjoin(Employee, Employee.id == requests.employee_id).where(
+        requests.status.in_(BALANCE_STATUSES),
+        requests.start_date <= date(year, 12, 31),
+        requests.end_date >= date(year, 1, 1),
+    )
+    if manager_id is not None:
+        query = query.where(requests.manager_id == manager_id)
+    if employee_id is not None:
+        query = query.where(requests.employee_id == employee_id)
+    return query
+
+def yearly_balances(
+    rows: Sequence[Tuple[str, date, date, str]],
+    year: int,
+    allowance: float = ANNUAL_ALLOWANCE_DAYS,
+    calendar: BusinessCalendar = default_calendar,
+) -> List[dict]:
+    """Per-employee used/pending/remaining business days for one year, in a single vectorized pass"""
+    if not rows:
+        return []
+    names, starts, ends, statuses = zip(*rows)
+
+    # Clip every request to the year so spans across New Year count once per year
+    year_start = np.datetime64(f"{year:04d}-01-01")
+    year_end = np.datetime64(f"{year:04d}-12-31")
+    starts = np.maximum(to_datetime64(starts), year_start)
+    ends = np.minimum(to_datetime64(ends), year_end)
+    days = calendar.business_days(starts, ends)
+
+    employees, employee_index = np.unique(np.array(names, dtype=object), return_inverse=True)
+    approved = np.array(statuses, dtype=object) == "approved"
+    used = np.bincount(employee_index, weights=np.where(approved, days, 0), minlength=len(employees))
+    pending = np.bincount(employee_index, weights=np.where(approved, 0, days), minlength=len(employees))
+    remaining = allowance - used
+
+    return [
+        {
+            "employee_name": name,
+            "used_days": int(used_days),
+            "pending_days": int(pending_days),
+            "remaining_days": float(remaining_days),
+        }
+        for name, used_days, pending_days, remaining_days in zip(employees.tolist(), used, pending, remaining)
+    ]
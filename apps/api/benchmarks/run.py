@@ -0,0 +1,328 @@
+"""
+API Benchmark Runner
+Seeds a database, drives the FastAPI app in-process and/or over uvicorn with
+concurrent clients, and writes per-endpoint latency percentiles, throughput and
+per-query timings to JSON so runs can be compared before and after a change
+
+    cd apps/api
+    python -m benchmarks.run --managers 20 --requests-per-year 500 --mode both
+    python -m benchmarks.run --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+API_DIR = Path(__file__).resolve().parents[1]
+if str(API_DIR) not in sys.path:
+    sys.path.insert(0, str(API_DIR))
+
+from benchmarks.seed import seed_database
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Endpoint templates; placeholders are filled per request from the seeded volumes
+ENDPOINTS = {
+    "health": "/health",
+    "manager_requests": "/manager/requests?limit=50",
+    "manager_requests_projected": "/manager/requests?status=pending&fields=id,employee_name,start_date,end_date,status",
+    "overlapping": "/requests/overlapping?from={day}&to={week_later}",
+    "export_ndjson": "/manager/requests/export?format=ndjson&from={year_start}&to={year_end}",
+    "balances": "/balances?year={year}",
+    "search": "/manager/requests/search?q={search}",
+}
+
+# Search box queries: whole words and prefixes of the seeded reasons
+SEARCH_QUERIES = ["vacation", "medical appointment", "conf", "fam", "personal time", "vac"]
+
+# Password of every seeded manager (benchmarks/seed.py)
+MANAGER_PASSWORD = "admin123"
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "throughput_rps": round(len(values) / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+class QueryTimer:
+    """Collects per-statement timings from every engine while active"""
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("bench_query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.timings[" ".join(statement.split())].append(time.perf_counter() - conn.info["bench_query_start"].pop())
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "before_cursor_execute", self._before)
+        event.remove(Engine, "after_cursor_execute", self._after)
+
+    def report(self, top: int = 15) -> List[dict]:
+        rows = []
+        for statement, samples in self.timings.items():
+            values = sorted(samples)
+            rows.append({
+                "statement": statement[:300],
+                "calls": len(values),
+                "total_ms": round(sum(values) * 1000, 3),
+                "mean_ms": round(sum(values) / len(values) * 1000, 4),
+                "p95_ms": round(percentile(values, 95) * 1000, 4),
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:top]
+
+def make_params(volumes: dict, rng: random.Random) -> dict:
+    year = rng.randrange(volumes["first_year"], volumes["first_year"] + volumes["years"])
+    day = date(year, 1, 1) + timedelta(days=rng.randrange(358))
+    return {
+        "manager_id": rng.randrange(1, volumes["managers"] + 1),
+        "year": year,
+        "day": day.isoformat(),
+        "week_later": (day + timedelta(days=7)).isoformat(),
+        "year_start": f"{year}-01-01",
+        "year_end": f"{year}-12-31",
+        # Derived from the day so earlier parameters keep their random sequence
+        "search": SEARCH_QUERIES[day.toordinal() % len(SEARCH_QUERIES)],
+    }
+
+def session_headers(tokens: Dict[int, str]) -> Dict[int, dict]:
+    from auth import SESSION_COOKIE
+    return {manager_id: {"Cookie": f"{SESSION_COOKIE}={token}"} for manager_id, token in tokens.items()}
+
+async def login_managers(client: httpx.AsyncClient, managers: int) -> Dict[int, dict]:
+    """Log every seeded manager in over HTTP; returns session cookie headers by manager id"""
+    from auth import SESSION_COOKIE
+    tokens = {}
+    for manager_id in range(1, managers + 1):
+        response = await client.post("/manager/login", json={
+            "email": f"manager{manager_id}@company.com", "password": MANAGER_PASSWORD})
+        response.raise_for_status()
+        tokens[manager_id] = response.cookies[SESSION_COOKIE]
+    # Requests choose their manager's cookie explicitly
+    client.cookies.clear()
+    return session_headers(tokens)
+
+async def drive(client: httpx.AsyncClient, endpoints: Dict[str, str], volumes: dict,
+                requests_per_endpoint: int, concurrency: int, sessions: Dict[int, dict],
+                seed: int = 7) -> Dict[str, dict]:
+    """Run each endpoint with `concurrency` clients sharing `requests_per_endpoint` requests"""
+    rng = random.Random(seed)
+    results = {}
+    for name, template in endpoints.items():
+        urls = []
+        for _ in range(requests_per_endpoint):
+            params = make_params(volumes, rng)
+            urls.append((template.format(**params), sessions[params["manager_id"]]))
+        latencies: List[float] = []
+        errors = 0
+        queue = iter(urls)
+
+        async def worker():
+            nonlocal errors
+            for url, headers in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, headers=headers)
+                    await response.aread()
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        # Warm up once so connection setup is not measured
+        await client.get(urls[0][0], headers=urls[0][1])
+        wall_started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        results[name] = summarize(latencies, errors, time.perf_counter() - wall_started)
+    return results
+
+async def run_in_process(db_path: Path, volumes: dict, endpoints: Dict[str, str],
+                         requests_per_endpoint: int, concurrency: int) -> dict:
+    """Drive the ASGI app directly (no network, no server process)"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from database import create_async_db_engine, get_async_db
+    from main import app
+    from sessions import session_store
+
+    bench_engine = create_async_db_engine(f"sqlite+aiosqlite:///{db_path}")
+    sessions = sessionmaker(bind=bench_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = bench_get_async_db
+    try:
+        with QueryTimer() as timer:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Sessions are created directly: bcrypt logins are not what this measures
+                tokens = {manager_id: session_store.create({
+                    "id": manager_id, "name": f"Manager {manager_id}",
+                    "email": f"manager{manager_id}@company.com", "authenticated": True,
+                }) for manager_id in range(1, volumes["managers"] + 1)}
+                endpoint_results = await drive(client, endpoints, volumes, requests_per_endpoint, concurrency,
+                                               session_headers(tokens))
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        await bench_engine.dispose()
+    return {"endpoints": endpoint_results, "queries": timer.report()}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def run_uvicorn(db_path: Path, volumes: dict, endpoints: Dict[str, str],
+                      requests_per_endpoint: int, concurrency: int, workers: int = 1) -> dict:
+    """Drive the production server (server.py) over HTTP"""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+        "API_HOST": "127.0.0.1",
+        "API_LISTEN_PORT": str(port),
+        "API_WORKERS": str(workers),
+        "API_LOG_LEVEL": "warning",
+        # One client logs in every seeded manager
+        "LOGIN_RATE_PER_IP": "0",
+    }
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=API_DIR, env=env)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/health/live")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not become ready")
+            sessions = await login_managers(client, volumes["managers"])
+            endpoint_results = await drive(client, endpoints, volumes, requests_per_endpoint, concurrency, sessions)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"endpoints": endpoint_results, "workers": workers}
+
+def run_benchmark(managers=10, requests_per_year=200, years=3, requests_per_endpoint=200,
+                  concurrency=10, modes=("inprocess",), endpoints=None, db_path: Optional[Path] = None,
+                  workers: int = 1) -> dict:
+    """Seed a database, run the requested modes and return the full result document"""
+    endpoints = endpoints or ENDPOINTS
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(db_path or Path(tmp) / "benchmark.db")
+        volumes = seed_database(db_path, managers, requests_per_year, years)
+
+        result = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "volumes": volumes,
+            "settings": {"requests_per_endpoint": requests_per_endpoint, "concurrency": concurrency},
+            "modes": {},
+        }
+        if "inprocess" in modes:
+            result["modes"]["inprocess"] = asyncio.run(
+                run_in_process(db_path, volumes, endpoints, requests_per_endpoint, concurrency))
+        if "uvicorn" in modes:
+            result["modes"]["uvicorn"] = asyncio.run(
+                run_uvicorn(db_path, volumes, endpoints, requests_per_endpoint, concurrency, workers))
+    return result
+
+def compare(baseline: dict, candidate: dict) -> List[str]:
+    """Human-readable p50/p95/throughput deltas between two result documents"""
+    lines = [f"{'mode':<10} {'endpoint':<28} {'p50 ms':>18} {'p95 ms':>18} {'rps':>18}"]
+    for mode, candidate_mode in candidate["modes"].items():
+        baseline_mode = baseline["modes"].get(mode)
+        if baseline_mode is None:
+            continue
+        for name, after in candidate_mode["endpoints"].items():
+            before = baseline_mode["endpoints"].get(name)
+            if before is None:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms", "throughput_rps"):
+                change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                cells.append(f"{before[key]:>7} -> {after[key]:<7}({change:+.0f}%)")
+            lines.append(f"{mode:<10} {name:<28} " + " ".join(cells))
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Time Off System API")
+    parser.add_argument("--managers", type=int, default=10)
+    parser.add_argument("--requests-per-year", type=int, default=200, help="requests per manager per year")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="server.py workers in uvicorn mode")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS), help="limit to endpoint (repeatable)")
+    parser.add_argument("--output", help="result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, candidate = (json.loads(Path(path).read_text()) for path in args.compare)
+        print("\n".join(compare(baseline, candidate)))
+        return
+
+    modes = ("inprocess", "uvicorn") if args.mode == "both" else (args.mode,)
+    endpoints = {name: ENDPOINTS[name] for name in args.endpoint} if args.endpoint else ENDPOINTS
+    result = run_benchmark(args.managers, args.requests_per_year, args.years, args.requests,
+                           args.concurrency, modes, endpoints, workers=args.workers)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+
+    for mode, mode_result in result["modes"].items():
+        print(f"\n{mode}")
+        for name, stats in mode_result["endpoints"].items():
+            print(f"  {name:<28} p50 {stats['p50_ms']:>8}ms  p95 {stats['p95_ms']:>8}ms  "
+                  f"p99 {stats['p99_ms']:>8}ms  {stats['throughput_rps']:>8} rps  errors {stats['errors']}")
+    print(f"\n✓ Results written to {output}")
+
+if __name__ == "__main__":
+    main()
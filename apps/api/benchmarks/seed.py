@@ -0,0 +1,98 @@
+"""
+Benchmark Database Seeder
+Builds a SQLite database from database/create_sqlite_db.py's schema and fills it
+with managers x requests x years of synthetic time-off requests
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Reuse the canonical schema script
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "database"))
+
+from create_sqlite_db import COUNT_STAFFING_COVERAGE_SQL, INDEX_REQUEST_DAYS_SQL, create_database
+
+PASSWORD_HASH = '$2b$12$G1Oc3mjnFw1xVUApdfw4d.SttgDUZEB1nsMqDwS6xnfwYPzKS//Wq'
+REASONS = ["Vacation", "Personal time", "Medical appointment", "Family event", "Conference", None]
+STATUS_WEIGHTS = {"approved": 0.6, "pending": 0.25, "denied": 0.15}
+
+def seed_database(db_path, managers=10, requests_per_year=200, years=3, employees_per_manager=25, seed=42):
+    """Create and fill a benchmark database; returns the volumes written"""
+
+    rng = random.Random(seed)
+    create_database(db_path, sample_data=False)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(
+            "INSERT INTO managers (name, email, password_hash) VALUES (?, ?, ?)",
+            [(f"Manager {m}", f"manager{m}@company.com", PASSWORD_HASH) for m in range(1, managers + 1)]
+        )
+
+        # Employees are numbered manager by manager, so "Employee m-k" has a fixed id
+        cursor.executemany(
+            "INSERT INTO employees (id, name, normalized_name, manager_id) VALUES (?, ?, ?, ?)",
+            [
+                ((manager_id - 1) * employees_per_manager + k + 1, f"Employee {manager_id}-{k}",
+                 f"employee {manager_id}-{k}", manager_id)
+                for manager_id in range(1, managers + 1) for k in range(employees_per_manager)
+            ]
+        )
+
+        first_year = date.today().year - years + 1
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        rows = []
+        for manager_id in range(1, managers + 1):
+            for year in range(first_year, first_year + years):
+                for _ in range(requests_per_year):
+                    start = date(year, 1, 1) + timedelta(days=rng.randrange(365))
+                    end = start + timedelta(days=rng.choice([0, 0, 1, 2, 4, 6, 13]))
+                    employee = rng.randrange(employees_per_manager)
+                    rows.append((
+                        f"Employee {manager_id}-{employee}",
+                        (manager_id - 1) * employees_per_manager + employee + 1,
+                        start.isoformat(),
+                        end.isoformat(),
+                        rng.choice(REASONS),
+                        manager_id,
+                        rng.choices(statuses, weights)[0],
+                    ))
+        cursor.executemany(
+            "INSERT INTO time_off_requests (employee_name, employee_id, start_date, end_date, reason, manager_id, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        cursor.execute(INDEX_REQUEST_DAYS_SQL)
+        cursor.execute(COUNT_STAFFING_COVERAGE_SQL)
+        conn.commit()
+        cursor.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    return {
+        "managers": managers,
+        "requests_per_year": requests_per_year,
+        "years": years,
+        "requests": len(rows),
+        "first_year": first_year,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument("path", help="SQLite file to (re)create")
+    parser.add_argument("--managers", type=int, default=10)
+    parser.add_argument("--requests-per-year", type=int, default=200, help="requests per manager per year")
+    parser.add_argument("--years", type=int, default=3)
+    args = parser.parse_args()
+
+    volumes = seed_database(args.path, args.managers, args.requests_per_year, args.years)
+    print(f"✓ Seeded {volumes['requests']} requests for {volumes['managers']} managers over {volumes['years']} years")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+JSON Serialization Benchmark
+Times the ways a list endpoint can turn selected request rows into a JSON body:
+FastAPI's default dict path (jsonable_encoder + json.dumps), Pydantic response
+models, and the row-tuple + orjson path the list endpoints use
+
+    cd apps/api
+    python -m benchmarks.serialization --rows 5000
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+API_DIR = Path(__file__).resolve().parents[1]
+if str(API_DIR) not in sys.path:
+    sys.path.insert(0, str(API_DIR))
+
+from queries import REQUEST_COLUMNS, row_dicts
+import schemas
+
+class _Row(namedtuple("_Row", [column.key for column in REQUEST_COLUMNS])):
+    """Stands in for a SQLAlchemy Row: a tuple with _fields and _mapping"""
+
+    @property
+    def _mapping(self):
+        return self._asdict()
+
+def sample_rows(count: int) -> List[_Row]:
+    start = date(2025, 1, 1)
+    created = datetime(2024, 12, 1, 9, 30)
+    return [
+        _Row(n + 1, f"Employee {n % 250}", n % 250 + 1, start + timedelta(days=n % 365),
+             start + timedelta(days=n % 365 + 2), "Vacation" if n % 3 else None, n % 10 + 1,
+             ("pending", "approved", "denied")[n % 3], created, created)
+        for n in range(count)
+    ]
+
+def _default_path(rows) -> bytes:
+    # What a route returning {"data": [dict(row._mapping), ...]} cost before
+    content = jsonable_encoder({"success": True, "data": [dict(row._mapping) for row in rows]})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+_page_adapter = TypeAdapter(schemas.ApiResponse[List[schemas.TimeOffRequest]])
+
+def _pydantic_path(rows) -> bytes:
+    return _page_adapter.dump_json(_page_adapter.validate_python({"success": True, "data": row_dicts(rows)}))
+
+def _orjson_path(rows) -> bytes:
+    return schemas.json_response({"success": True, "data": row_dicts(rows)}).body
+
+STRATEGIES: Dict[str, Callable] = {
+    "jsonable_encoder+json": _default_path,
+    "pydantic_models": _pydantic_path,
+    "row_dicts+orjson": _orjson_path,
+}
+
+def run_serialization_benchmark(rows: int = 5000, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-`repeat` milliseconds per strategy to encode `rows` rows"""
+    sample = sample_rows(rows)
+    # All strategies must produce the same items (the model also writes its unset envelope fields)
+    expected = json.loads(_default_path(sample))["data"]
+    results = {}
+    for name, encode in STRATEGIES.items():
+        assert json.loads(encode(sample))["data"] == expected, name
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            encode(sample)
+            timings.append(time.perf_counter() - started)
+        results[name] = round(min(timings) * 1000, 2)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding of request lists")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run_serialization_benchmark(args.rows, args.repeat)
+    baseline = results["jsonable_encoder+json"]
+    for name, ms in results.items():
+        print(f"  {name:<24} {ms:>9}ms  ({baseline / ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
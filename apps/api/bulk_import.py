@@ -0,0 +1,316 @@
+import codecs
+import csv
+import json
+import os
+from collections import Counter, deque
+from datetime import date
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DataError, IntegrityError
+
+from database import REQUEST_STATUSES, Manager, TimeOffRequest, TimeOffRequestDay
+from employees import ensure_employees, normalize_name
+from live import IMPORTED, live_hub
+from overlap import index_request_days
+from staffing import add_requests_coverage
+from versions import bump_versions
+
+# Rows written per transaction unless the caller overrides it
+DEFAULT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "1000"))
+
+# Cap on per-row errors echoed back in the report
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+# Longest CSV record; a quoted field left open would otherwise buffer the rest of the body
+MAX_CSV_RECORD_CHARS = 65536
+
+# Longest request in calendar days; each day is one day index row and one
+# staffing_coverage row, so unbounded ranges would write millions of rows
+MAX_REQUEST_DAYS = int(os.getenv("MAX_REQUEST_DAYS", "366"))
+
+def validate_row(raw: dict, manager_ids: Set[int], max_days: Optional[int] = None) -> dict:
+    """Validate one incoming record and return the row to insert; raises ValueError"""
+    if max_days is None:
+        max_days = MAX_REQUEST_DAYS
+    if not isinstance(raw, dict):
+        raise ValueError("record must be an object")
+
+    employee_name = str(raw.get("employee_name") or "").strip()
+    if not employee_name:
+        raise ValueError("employee_name is required")
+    if len(employee_name) > 255:
+        raise ValueError("employee_name must be at most 255 characters")
+
+    try:
+        start_date = date.fromisoformat(str(raw.get("start_date") or "").strip())
+        end_date = date.fromisoformat(str(raw.get("end_date") or "").strip())
+    except ValueError:
+        raise ValueError("start_date and end_date must be ISO dates (YYYY-MM-DD)")
+    if end_date < start_date:
+        raise ValueError("end_date must be on or after start_date")
+    if (end_date - start_date).days + 1 > max_days:
+        raise ValueError(f"a request may cover at most {max_days} days")
+
+    try:
+        manager_id = int(raw.get("manager_id"))
+    except (TypeError, ValueError):
+        raise ValueError("manager_id must be an integer")
+    if manager_id not in manager_ids:
+        raise ValueError(f"manager_id {manager_id} does not exist")
+
+    status = str(raw.get("status") or "pending").strip().lower()
+    if status not in REQUEST_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(REQUEST_STATUSES)}")
+
+    reason = raw.get("reason")
+    if reason is not None:
+        reason = str(reason).strip() or None
+
+    return {
+        "employee_name": employee_name,
+        "start_date": start_date,
+        "end_date": end_date,
+        "reason": reason,
+        "manager_id": manager_id,
+        "status": status,
+    }
+
+class _LineFeed:
+    """Lines queued for a csv.reader; running dry ends the current record, not the reader"""
+
+    def __init__(self):
+        self._lines = deque()
+
+    def append(self, line: str):
+        self._lines.append(line)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.popleft()
+
+class BulkImport:
+    """Incremental parse/validate/batch state shared by the API endpoint and the CLI"""
+
+    def __init__(
+        self,
+        fmt: str,
+        manager_ids: Set[int],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        manager_id: Optional[int] = None,
+    ):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+        self.fmt = fmt
+        self.manager_ids = manager_ids
+        # The API imports for the logged-in manager only (rows without a manager_id
+        # default to them); the CLI imports for any existing manager
+        self.manager_id = manager_id
+        self.batch_size = batch_size
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self.touched_managers: Set[int] = set()
+        self._header: Optional[List[str]] = None
+        self._pending: List[Tuple[int, dict]] = []
+        # One reader over all CSV lines, so quoted fields may span line breaks; it
+        # is only advanced once _record holds a complete record
+        self._lines = _LineFeed()
+        self._reader = csv.reader(self._lines)
+        self._record: List[str] = []
+        self._record_line = 0
+        self._record_chars = 0
+
+    def _parse(self, line: str) -> Optional[dict]:
+        if self.fmt == "jsonl":
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"invalid JSON: {e.msg}")
+
+        self._lines.append(line)
+        try:
+            values = next(self._reader)
+        except csv.Error as e:
+            raise ValueError(f"invalid CSV: {e}")
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            return None
+        if len(values) != len(self._header):
+            raise ValueError(f"expected {len(self._header)} columns, got {len(values)}")
+        return dict(zip(self._header, values))
+
+    def _scope(self, raw):
+        if self.manager_id is None or not isinstance(raw, dict):
+            return raw
+        if raw.get("manager_id") in (None, ""):
+            return {**raw, "manager_id": self.manager_id}
+        if str(raw["manager_id"]).strip() != str(self.manager_id):
+            raise ValueError(f"manager_id must be your own ({self.manager_id})")
+        return raw
+
+    def add_error(self, line_no: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": error})
+
+    def _csv_record(self, line_no: int, line: str) -> Optional[str]:
+        """Collect physical lines until the quotes balance; returns the whole record then"""
+        if not self._record:
+            if not line.strip():
+                return None
+            self._record_line, self._record_chars = line_no, 0
+        self._record.append(line)
+        self._record_chars += len(line)
+        # "" escapes count twice, so an odd total means a quoted field is still open
+        if sum(part.count('"') for part in self._record) % 2:
+            if self._record_chars > MAX_CSV_RECORD_CHARS:
+                self._record = []
+                self.add_error(self._record_line, f"record longer than {MAX_CSV_RECORD_CHARS} characters")
+            return None
+        record, self._record = "".join(self._record), []
+        return record
+
+    def feed_line(self, line_no: int, line: str) -> Optional[List[Tuple[int, dict]]]:
+        """Parse and validate one line; returns a full batch when one is ready to write
+
+        A CSV record spanning several lines is numbered by its first line.
+        """
+        if self.fmt == "csv":
+            line = self._csv_record(line_no, line)
+            if line is None:
+                return None
+            line_no = self._record_line
+        else:
+            line = line.strip()
+            if not line:
+                return None
+        try:
+            raw = self._parse(line)
+            if raw is None:
+                return None
+            self.received += 1
+            self._pending.append((line_no, validate_row(self._scope(raw), self.manager_ids)))
+        except ValueError as e:
+            self.add_error(line_no, str(e))
+            return None
+
+        if len(self._pending) >= self.batch_size:
+            return self.take_batch()
+        return None
+
+    def take_batch(self) -> List[Tuple[int, dict]]:
+        """Hand over the rows validated so far"""
+        batch, self._pending = self._pending, []
+        return batch
+
+    def finish(self) -> List[Tuple[int, dict]]:
+        """Hand over the last rows once the input has ended"""
+        if self._record:
+            self._record = []
+            self.add_error(self._record_line, "unterminated quoted field")
+        return self.take_batch()
+
+    def record_batch(self, batch: List[Tuple[int, dict]], failures: List[Tuple[int, str]]):
+        """Account for a written batch and the rows the database rejected"""
+        self.inserted += len(batch) - len(failures)
+        failed_lines = {line_no for line_no, _ in failures}
+        self.touched_managers.update(row["manager_id"] for line_no, row in batch if line_no not in failed_lines)
+        for line_no, error in failures:
+            self.add_error(line_no, error)
+
+    def report(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+def load_manager_ids(connection: Connection) -> Set[int]:
+    return set(connection.execute(select(Manager.id)).scalars())
+
+def _insert_requests(connection: Connection, rows: List[dict]) -> List:
+    """executemany the rows, then index the days of the requests just written; returns those requests"""
+    employee_ids = ensure_employees(connection, [(row["employee_name"], row["manager_id"]) for row in rows])
+    # Copies, so a batch retried row by row after a rollback resolves its employees again
+    rows = [{**row, "employee_id": employee_ids[normalize_name(row["employee_name"])]} for row in rows]
+    last_id = connection.execute(select(func.coalesce(func.max(TimeOffRequest.id), 0))).scalar()
+    connection.execute(TimeOffRequest.__table__.insert(), rows)
+
+    # Core inserts bypass the ORM listeners, so maintain the day index, staffing
+    # coverage and request versions here; NOT EXISTS skips rows a concurrent ORM
+    # writer already handled
+    new_requests = connection.execute(
+        select(
+            TimeOffRequest.id,
+            TimeOffRequest.start_date,
+            TimeOffRequest.end_date,
+            TimeOffRequest.manager_id,
+            TimeOffRequest.status,
+        ).where(
+            TimeOffRequest.id > last_id,
+            ~exists().where(TimeOffRequestDay.request_id == TimeOffRequest.id),
+        )
+    ).all()
+    index_request_days(connection, [row[:4] for row in new_requests])
+    add_requests_coverage(connection, [(manager_id, start_date, end_date, status)
+                                       for _, start_date, end_date, manager_id, status in new_requests])
+    bump_versions(connection, [row.manager_id for row in new_requests])
+    return new_requests
+
+def write_batch(connection: Connection, batch: List[Tuple[int, dict]]) -> List[Tuple[int, str]]:
+    """Insert a batch in one transaction; if it fails, retry row by row to isolate bad rows"""
+    if not batch:
+        return []
+    try:
+        with connection.begin():
+            new_requests = _insert_requests(connection, [row for _, row in batch])
+    except (IntegrityError, DataError) as e:
+        if len(batch) == 1:
+            return [(batch[0][0], str(e.orig))]
+    else:
+        # One "refetch" event per manager, not one per imported row
+        imported = Counter(manager_id for _, _, _, manager_id, _ in new_requests)
+        live_hub.publish_many((manager_id, IMPORTED, {"count": count}) for manager_id, count in imported.items())
+        return []
+
+    failures = []
+    for item in batch:
+        failures.extend(write_batch(connection, [item]))
+    return failures
+
+def import_lines(connection: Connection, lines: Iterable[str], importer: BulkImport) -> dict:
+    """Run a whole import from an iterable of text lines (used by the CLI)"""
+    for line_no, line in enumerate(lines, start=1):
+        batch = importer.feed_line(line_no, line)
+        if batch:
+            importer.record_batch(batch, write_batch(connection, batch))
+    batch = importer.finish()
+    importer.record_batch(batch, write_batch(connection, batch))
+    return importer.report()
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Decode a streamed request body incrementally into numbered lines, line endings kept"""
+    # utf-8-sig strips a leading BOM (common in spreadsheet CSV exports)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            line_no += 1
+            yield line_no, line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        line_no += 1
+        yield line_no, buffer
@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from database import TimeOffRequest
+
+class CacheBackend:
+    """Storage interface for the read-through cache (e.g. in-process or Redis)"""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()):
+        raise NotImplementedError
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry stored with the tag; returns entries removed"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything (CACHE_BACKEND=none)"""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl, tags=()):
+        pass
+
+    def invalidate_tag(self, tag):
+        return 0
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"entries": 0, "hits": 0, "misses": self.misses, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+class MemoryLRUCache(CacheBackend):
+    """Thread-safe in-process LRU cache with per-entry TTL and tag invalidation"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key: str):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl, tags=()):
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+def _manager_tag(manager_id: int) -> str:
+    return f"manager:{manager_id}"
+
+class ManagerRequestCache:
+    """Read-through cache of manager dashboard queries, keyed by manager and parameters"""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, view: str, manager_id: int, params: Dict[str, Any]) -> str:
+        canonical = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        return f"{_manager_tag(manager_id)}:{view}:{canonical}"
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.backend.get(key)
+
+    def set(self, key: str, manager_id: int, value: Any):
+        self.backend.set(key, value, self.ttl, tags=(_manager_tag(manager_id),))
+
+    def invalidate_managers(self, manager_ids: Iterable[int]):
+        for manager_id in set(manager_ids):
+            self.backend.invalidate_tag(_manager_tag(manager_id))
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+def create_cache_backend() -> CacheBackend:
+    """Backend selected by CACHE_BACKEND (memory | none)"""
+    if os.getenv("CACHE_BACKEND", "memory").lower() == "none":
+        return NullCache()
+    return MemoryLRUCache(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")))
+
+manager_cache = ManagerRequestCache(
+    create_cache_backend(),
+    ttl=float(os.getenv("CACHE_TTL_SECONDS", "30")),
+)
+
+# Invalidate precisely when a manager's requests change. Managers touched during
+# a flush are invalidated at once and again after commit, so a read racing the
+# transaction cannot leave pre-commit data cached.
+_PENDING_KEY = "cache_invalidate_managers"
+
+def _touched_managers(target) -> Set[int]:
+    managers = {target.manager_id}
+    history = inspect(target).attrs.manager_id.history
+    managers.update(manager_id for manager_id in history.deleted if manager_id is not None)
+    return managers
+
+def _mark_managers(target):
+    managers = _touched_managers(target)
+    manager_cache.invalidate_managers(managers)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).update(managers)
+
+@event.listens_for(TimeOffRequest.manager_id, "set", active_history=True)
+def _load_previous_manager(target, value, oldvalue, initiator):
+    """active_history loads the old manager_id on reassignment so both managers are invalidated"""
+
+@event.listens_for(TimeOffRequest, "after_insert")
+def _invalidate_on_insert(mapper, connection, target):
+    _mark_managers(target)
+
+@event.listens_for(TimeOffRequest, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    _mark_managers(target)
+
+@event.listens_for(TimeOffRequest, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    _mark_managers(target)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    managers = session.info.pop(_PENDING_KEY, None)
+    if managers:
+        manager_cache.invalidate_managers(managers)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
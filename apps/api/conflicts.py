@@ -0,0 +1,109 @@
+import os
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Employee, StaffingCoverage, TimeOffRequest
+from employees import normalize_name
+
+# Most team members a manager may have off (approved or pending) on one day; 0 disables
+MAX_CONCURRENT_ABSENCES = int(os.getenv("MAX_CONCURRENT_ABSENCES", "0"))
+
+# Statuses that block an overlapping request from the same employee
+BLOCKING_STATUSES = ("pending", "approved")
+
+class SubmissionConflict(Exception):
+    """A new request overlaps the employee's own requests or exceeds the team limit"""
+
+def employee_overlap_query(employee_id: int, start_date: date, end_date: date, exclude_id: Optional[int] = None):
+    """Ids of the employee's live requests overlapping [start_date, end_date] (idx_time_off_employee_id_start)"""
+    query = select(TimeOffRequest.id).where(
+        TimeOffRequest.employee_id == employee_id,
+        TimeOffRequest.start_date <= end_date,
+        TimeOffRequest.end_date >= start_date,
+        TimeOffRequest.status.in_(BLOCKING_STATUSES),
+    ).order_by(TimeOffRequest.id)
+    if exclude_id is not None:
+        query = query.where(TimeOffRequest.id != exclude_id)
+    return query
+
+def over_limit_query(manager_id: int, start_date: date, end_date: date, limit: int):
+    """First day in the range where the team already has more than `limit` absences (staffing_coverage PK)"""
+    return (
+        select(StaffingCoverage.day)
+        .where(
+            StaffingCoverage.manager_id == manager_id,
+            StaffingCoverage.day.between(start_date, end_date),
+            StaffingCoverage.approved_count + StaffingCoverage.pending_count > limit,
+        )
+        .order_by(StaffingCoverage.day)
+        .limit(1)
+    )
+
+async def find_conflict(
+    db: AsyncSession,
+    row: dict,
+    limit: int,
+    request_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+) -> Optional[str]:
+    """Describe why `row` cannot be accepted, or None
+
+    Pass request_id and its employee_id once the row is written; before that the
+    employee is looked up by normalized name, so "carol  davis" is Carol Davis.
+    """
+    if employee_id is None:
+        employee_id = (await db.execute(
+            select(Employee.id).where(Employee.normalized_name == normalize_name(row["employee_name"]))
+        )).scalar()
+    # A name never seen before has no requests to overlap
+    overlapping = []
+    if employee_id is not None:
+        overlap_query = employee_overlap_query(employee_id, row["start_date"], row["end_date"], request_id)
+        if request_id is not None:
+            # Lock the employee's overlapping rows (MySQL; SQLite already holds the write lock)
+            overlap_query = overlap_query.with_for_update()
+        overlapping = (await db.execute(overlap_query)).scalars().all()
+    if overlapping:
+        ids = ", ".join(str(other_id) for other_id in overlapping)
+        return f"{row['employee_name']} already has time off overlapping these dates (request {ids})"
+
+    if limit > 0:
+        # Before the insert this request is not counted yet, so one fewer fits
+        threshold = limit if request_id is not None else limit - 1
+        day = (await db.execute(over_limit_query(row["manager_id"], row["start_date"], row["end_date"], threshold))).scalar()
+        if day is not None:
+            return f"Team already has {limit} people off on {day.isoformat()}"
+    return None
+
+async def submit_request(db: AsyncSession, row: dict, limit: Optional[int] = None) -> TimeOffRequest:
+    """Insert a validated request unless it conflicts; the final check runs in the insert's transaction"""
+    if limit is None:
+        limit = MAX_CONCURRENT_ABSENCES
+
+    # Unlocked pre-check: most conflicting submissions in a burst are rejected here
+    # without ever queueing for the write lock
+    conflict = await find_conflict(db, row, limit)
+    await db.rollback()
+    if conflict:
+        raise SubmissionConflict(conflict)
+
+    # The flush links the employee (employees.ensure_employees) and writes the
+    # request, its day index and its staffing_coverage rows.
+    # That takes SQLite's write lock (or the per-day coverage row locks on MySQL),
+    # so a concurrent submission for the same days waits here and then re-checks
+    # against committed data, including this request.
+    request = TimeOffRequest(**row)
+    db.add(request)
+    await db.flush()
+
+    conflict = await find_conflict(db, row, limit, request_id=request.id, employee_id=request.employee_id)
+    if conflict:
+        await db.rollback()
+        raise SubmissionConflict(conflict)
+
+    await db.commit()
+    await db.refresh(request)
+    return request
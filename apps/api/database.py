@@ -1,10 +1,24 @@
 import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Date, Text, DateTime, ForeignKey, Enum
+import threading
+from pathlib import Path
+from sqlalchemy import create_engine, event, Column, Integer, String, Date, Text, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.sql import func
-from typing import Generator
+from sqlalchemy.sql import func, text
+from typing import AsyncGenerator, Generator, Optional
+
+def load_dotenv():
+    """Load the nearest .env file; python-dotenv is only imported when there is one"""
+    here = Path(__file__).resolve().parent
+    for directory in (Path.cwd(), here, *here.parents):
+        dotenv_path = directory / ".env"
+        if dotenv_path.is_file():
+            from dotenv import load_dotenv as load_dotenv_file
+            load_dotenv_file(dotenv_path)
+            return
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,41 +29,317 @@ DATABASE_URL = os.getenv(
     "sqlite:///./database/time_off_system.db"
 )
 
-# Create engine with appropriate configuration for SQLite
-if DATABASE_URL.startswith('sqlite'):
-    engine = create_engine(DATABASE_URL, echo=True, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL, echo=True)
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_sqlite_memory(url: str) -> bool:
+    return _is_sqlite(url) and (url.split("://", 1)[1] in ("", "/", "/:memory:") or "mode=memory" in url)
+
+def _engine_options(url: str, async_driver: bool = False) -> dict:
+    """Build pool/echo keyword arguments for an engine from the environment"""
+    options = {
+        "echo": _env_bool("DB_ECHO", False),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+    if _is_sqlite_memory(url):
+        # In-memory databases keep the dialect's single-connection pool
+        return options
+
+    options["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+    options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    options["pool_recycle"] = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+    if _is_sqlite(url):
+        # SQLAlchemy 1.4 defaults file-based SQLite to NullPool; pool it instead
+        # so connections (and their pragmas) are reused across checkouts
+        options["poolclass"] = AsyncAdaptedQueuePool if async_driver else QueuePool
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply WAL and related tuning to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}")
+        cursor.execute(f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+def _sync_database_url(url: str) -> str:
+    """Map a driverless mysql:// URL onto PyMySQL (SQLAlchemy would look for mysqlclient)"""
+    if url.startswith("mysql://"):
+        return "mysql+pymysql://" + url[len("mysql://"):]
+    return url
+
+def create_db_engine(url: str = DATABASE_URL) -> Engine:
+    """Create a sync engine configured from the environment"""
+    url = _sync_database_url(url)
+    if _is_sqlite(url):
+        db_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            **_engine_options(url),
+        )
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+        return db_engine
+    return create_engine(url, **_engine_options(url))
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Create an async engine configured from the environment"""
+    db_engine = create_async_engine(url, **_engine_options(url, async_driver=True))
+    if _is_sqlite(url):
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+def _async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    if url.startswith("mysql://") or url.startswith("mysql+pymysql://"):
+        return "mysql+aiomysql://" + url.split("://", 1)[1]
+    return url
+
+# Async database URL - defaults to DATABASE_URL on the aiosqlite/aiomysql driver
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+# Engines are built on first use so importing this module (app startup, test
+# collection, CLI scripts) never loads a database driver it does not need
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> Engine:
+    """Sync engine for DATABASE_URL (scripts and sync helpers), created on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine(DATABASE_URL)
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine for ASYNC_DATABASE_URL used by the API routes, created on first use"""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+    return _async_engine
+
+async def dispose_engines():
+    """Close the pooled connections of whichever engines were created (app shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+def _reset_pools_after_fork():
+    # A forked worker must not share the parent's pooled connections; give it
+    # fresh pools without closing sockets the parent still owns
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+def __getattr__(name: str):
+    # Keep `database.engine` / `database.async_engine` working without building them at import
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to its engine when the first session is created"""
+
+    def __init__(self, engine_factory, **kw):
+        super().__init__(**kw)
+        self._engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine_factory())
+        return super().__call__(**local_kw)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+
+# Create async session factory
+AsyncSessionLocal = LazySessionmaker(
+    get_async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Base class for models
 Base = declarative_base()
 
+# Allowed values for TimeOffRequest.status
+REQUEST_STATUSES = ("pending", "approved", "denied")
+
+# Column types, defaults and index names match database/create_sqlite_db.py and
+# database/init/01-create-tables.sql; migrations.py brings older databases in line
+
 class Manager(Base):
     __tablename__ = "managers"
     
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=False, index=True)
-    password_hash = Column(String, nullable=False)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), unique=True, nullable=False)
+    password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("idx_managers_email", "email"),
+        {"sqlite_autoincrement": True},
+    )
+
+class Employee(Base):
+    """One person who takes time off; requests link here by employee_id (see employees.py)"""
+    __tablename__ = "employees"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    # Case-folded, whitespace-collapsed name: "Alice  Smith" and "alice smith" are one employee
+    normalized_name = Column(String(255), nullable=False)
+    email = Column(String(255))
+    manager_id = Column(Integer, ForeignKey("managers.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("uq_employees_normalized_name", "normalized_name", unique=True),
+        Index("idx_employees_manager_id", "manager_id"),
+        {"sqlite_autoincrement": True},
+    )
+
 class TimeOffRequest(Base):
     __tablename__ = "time_off_requests"
     
-    id = Column(Integer, primary_key=True, index=True)
-    employee_name = Column(String, nullable=False)
-    start_date = Column(Date, nullable=False, index=True)
-    end_date = Column(Date, nullable=False, index=True)
-    reason = Column(String)
-    manager_id = Column(Integer, ForeignKey("managers.id"), nullable=False, index=True)
-    status = Column(String, default="pending")
+    id = Column(Integer, primary_key=True)
+    employee_name = Column(String(255), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="SET NULL"))
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    reason = Column(Text)
+    manager_id = Column(Integer, ForeignKey("managers.id", ondelete="CASCADE"), nullable=False)
+    # ENUM on MySQL, CHECK (status IN (...)) elsewhere
+    status = Column(
+        Enum(*REQUEST_STATUSES, name="ck_time_off_requests_status", create_constraint=True),
+        default="pending",
+        server_default="pending",
+    )
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("idx_time_off_manager_id", "manager_id"),
+        Index("idx_time_off_dates", "start_date", "end_date"),
+        # Keyset pagination of a manager's requests by (start_date, id)
+        Index("idx_time_off_manager_start", "manager_id", "start_date"),
+        # Per-employee history, balances and the overlap check on submission
+        Index("idx_time_off_employee_id_start", "employee_id", "start_date"),
+        {"sqlite_autoincrement": True},
+    )
+
+class TimeOffRequestDay(Base):
+    """One row per calendar day covered by a time-off request (day-bucket index)"""
+    __tablename__ = "time_off_request_days"
+
+    request_id = Column(Integer, ForeignKey("time_off_requests.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    manager_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("idx_request_days_day", "day", "request_id"),
+        Index("idx_request_days_manager_day", "manager_id", "day"),
+    )
+
+class TimeOffRequestArchive(Base):
+    """Closed requests moved out of time_off_requests by archive.py, same ids and columns"""
+    __tablename__ = "time_off_requests_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    employee_name = Column(String(255), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="SET NULL"))
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    reason = Column(Text)
+    manager_id = Column(Integer, ForeignKey("managers.id", ondelete="CASCADE"), nullable=False)
+    status = Column(Enum(*REQUEST_STATUSES, name="ck_time_off_requests_archive_status", create_constraint=True))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Date-range reads of one manager's or employee's archived requests
+        Index("idx_time_off_archive_manager_end", "manager_id", "end_date"),
+        Index("idx_time_off_archive_employee_end", "employee_id", "end_date"),
+        # Newest archived end_date (archive.archived_through)
+        Index("idx_time_off_archive_end", "end_date"),
+    )
+
+class SchemaVersion(Base):
+    """Migrations applied to this database (see migrations.py)"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, server_default=func.now())
+
+class StaffingCoverage(Base):
+    """Materialized per-manager, per-day counts of approved and pending requests"""
+    __tablename__ = "staffing_coverage"
+
+    manager_id = Column(Integer, ForeignKey("managers.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    approved_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
+
+class ManagerRequestVersion(Base):
+    """Counter bumped in every transaction that changes a manager's requests (HTTP ETags)"""
+    __tablename__ = "manager_request_versions"
+
+    manager_id = Column(Integer, ForeignKey("managers.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+OUTBOX_STATUSES = ("pending", "delivered", "failed")
+
+class OutboxEvent(Base):
+    """Event written in the transaction that caused it, delivered later by events.OutboxDispatcher"""
+    __tablename__ = "event_outbox"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(100), nullable=False)
+    request_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=False)
+    # Set while a dispatcher is delivering the event, so workers never share one
+    claim_token = Column(String(32))
+    last_error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    delivered_at = Column(DateTime)
+
+    __table_args__ = (
+        # Due-event scan of the dispatcher
+        Index("idx_event_outbox_due", "status", "next_attempt_at"),
+        Index("idx_event_outbox_claim", "claim_token"),
+        {"sqlite_autoincrement": True},
+    )
+
 # Dependency to get database session
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -58,18 +348,45 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-# Initialize database tables
-def init_db():
-    Base.metadata.create_all(bind=engine)
+# Dependency to get async database session
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Bring the schema up to date; a no-op beyond one version lookup once migrated
+def init_db(db_engine: Optional[Engine] = None) -> int:
+    # migrations imports the derived-table helpers, which import this module
+    from migrations import migrate
+    with (db_engine or get_engine()).begin() as conn:
+        return migrate(conn)
+
+# Bring the schema up to date without blocking the event loop
+async def init_async_db(db_engine: Optional[AsyncEngine] = None) -> int:
+    from migrations import migrate
+    async with (db_engine or get_async_engine()).begin() as conn:
+        return await conn.run_sync(migrate)
 
 # Test database connectivity
 def test_db_connection():
+    db = None
     try:
         db = SessionLocal()
         # Simple test query
         result = db.execute("SELECT 1").fetchone()
-        db.close()
         return True
     except Exception as e:
         print(f"Database connection failed: {e}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        if db is not None:
+            db.close()
+
+# Test database connectivity from async code
+async def check_async_db_connection() -> bool:
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"Database connection failed: {e}")
+        return False
@@ -0,0 +1,114 @@
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection
+
+from database import TimeOffRequest
+from events import STATUS_CHANGED, add_events, event_data, request_event
+from live import live_hub
+from staffing import Deltas, add_request_deltas, apply_deltas
+from versions import bump_versions
+
+# Statuses a manager can give a pending request
+DECISION_STATUSES = ("approved", "denied")
+
+# Ids per UPDATE ... WHERE id IN (...), each chunk in its own short transaction
+DECISION_CHUNK_SIZE = int(os.getenv("DECISION_CHUNK_SIZE", "500"))
+
+# Most decisions accepted in one call
+MAX_DECISIONS = int(os.getenv("MAX_DECISIONS", "5000"))
+
+def parse_decisions(payload: dict) -> Dict[int, str]:
+    """Validate {"decisions": [{"id": ..., "status": ...}]} into id -> status; raises ValueError"""
+    items = payload.get("decisions") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError("decisions must be a non-empty list")
+    if len(items) > MAX_DECISIONS:
+        raise ValueError(f"at most {MAX_DECISIONS} decisions per call")
+
+    decisions: Dict[int, str] = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"decision {position}: must be an object")
+        request_id = item.get("id")
+        if not isinstance(request_id, int) or isinstance(request_id, bool):
+            raise ValueError(f"decision {position}: id must be an integer")
+        status = str(item.get("status") or "").strip().lower()
+        if status not in DECISION_STATUSES:
+            raise ValueError(f"decision {position}: status must be one of {', '.join(DECISION_STATUSES)}")
+        if decisions.setdefault(request_id, status) != status:
+            raise ValueError(f"request {request_id} is both approved and denied")
+    return decisions
+
+def decision_chunks(decisions: Dict[int, str], chunk_size: Optional[int] = None) -> List[Tuple[str, List[int]]]:
+    """Group ids by target status, then split each group into chunks"""
+    if chunk_size is None:
+        chunk_size = DECISION_CHUNK_SIZE
+    by_status: Dict[str, List[int]] = defaultdict(list)
+    for request_id, status in decisions.items():
+        by_status[status].append(request_id)
+    return [
+        (status, ids[offset:offset + chunk_size])
+        for status, ids in sorted(by_status.items())
+        for offset in range(0, len(ids), chunk_size)
+    ]
+
+def decide_chunk(connection: Connection, manager_id: int, status: str, ids: List[int]) -> Dict[int, str]:
+    """Move the manager's pending requests among `ids` to `status` in one transaction
+
+    Returns an outcome per id: the new status, "not_pending" or "not_found"
+    (missing or another manager's). This is a Core UPDATE, so it maintains
+    staffing_coverage, the request version, the event outbox and the live
+    streams itself, once for the whole chunk.
+    """
+    decided_rows = []
+    with connection.begin():
+        if connection.dialect.name == "sqlite":
+            # Take the write lock before reading, so the rows read are the rows updated
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        rows = connection.execute(
+            select(TimeOffRequest.id, TimeOffRequest.employee_name, TimeOffRequest.start_date,
+                   TimeOffRequest.end_date, TimeOffRequest.reason, TimeOffRequest.manager_id)
+            .where(TimeOffRequest.id.in_(ids), TimeOffRequest.manager_id == manager_id,
+                   TimeOffRequest.status == "pending")
+            .with_for_update()
+        ).all()
+
+        outcomes: Dict[int, str] = {}
+        if rows:
+            decided = [row.id for row in rows]
+            connection.execute(
+                update(TimeOffRequest)
+                .where(TimeOffRequest.id.in_(decided), TimeOffRequest.manager_id == manager_id,
+                       TimeOffRequest.status == "pending")
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            deltas: Deltas = defaultdict(lambda: [0, 0])
+            for row in rows:
+                add_request_deltas(deltas, manager_id, row.start_date, row.end_date, "pending", -1)
+                add_request_deltas(deltas, manager_id, row.start_date, row.end_date, status, +1)
+            apply_deltas(connection, deltas)
+            bump_versions(connection, [manager_id])
+            add_events(connection, [
+                request_event(STATUS_CHANGED, {**row._asdict(), "status": status}, "pending") for row in rows
+            ])
+            outcomes.update((request_id, status) for request_id in decided)
+            decided_rows = rows
+
+        undecided = [request_id for request_id in ids if request_id not in outcomes]
+        if undecided:
+            owned = set(connection.execute(
+                select(TimeOffRequest.id).where(TimeOffRequest.id.in_(undecided),
+                                                TimeOffRequest.manager_id == manager_id)
+            ).scalars())
+            outcomes.update((request_id, "not_pending" if request_id in owned else "not_found")
+                            for request_id in undecided)
+
+    # Committed: tell the manager's open dashboards
+    live_hub.publish_many(
+        (manager_id, STATUS_CHANGED, event_data({**row._asdict(), "status": status}, "pending")) for row in decided_rows
+    )
+    return outcomes
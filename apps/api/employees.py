@@ -0,0 +1,123 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, inspect, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Connection
+
+from database import Employee, TimeOffRequest
+from queries import REQUEST_COLUMNS
+
+# Names looked up / inserted per statement when resolving employees in bulk
+EMPLOYEE_BATCH_SIZE = 500
+
+def normalize_name(name: str) -> str:
+    """Dedup key for an employee name: trimmed, inner whitespace collapsed, case-folded"""
+    return " ".join(name.split()).casefold()
+
+def _insert_ignoring_duplicates(connection: Connection):
+    """INSERT that skips names a concurrent writer has just added"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(Employee).on_conflict_do_nothing(index_elements=["normalized_name"])
+    if dialect == "mysql":
+        return mysql.insert(Employee).prefix_with("IGNORE")
+    return insert(Employee)
+
+def _lookup(connection: Connection, keys: List[str]) -> Dict[str, int]:
+    found = {}
+    for offset in range(0, len(keys), EMPLOYEE_BATCH_SIZE):
+        chunk = keys[offset:offset + EMPLOYEE_BATCH_SIZE]
+        found.update(connection.execute(
+            select(Employee.normalized_name, Employee.id).where(Employee.normalized_name.in_(chunk))
+        ).all())
+    return found
+
+def ensure_employees(connection: Connection, people: Iterable[Tuple[str, Optional[int]]]) -> Dict[str, int]:
+    """Employee id per normalized name for (name, manager_id) pairs, creating missing employees
+
+    When a name repeats, a new employee keeps the first spelling and the last
+    manager. Existing employees are left as they are.
+    """
+    wanted: Dict[str, Tuple[str, Optional[int]]] = {}
+    for name, manager_id in people:
+        key = normalize_name(name)
+        wanted[key] = (wanted[key][0] if key in wanted else " ".join(name.split()), manager_id)
+    if not wanted:
+        return {}
+
+    ids = _lookup(connection, list(wanted))
+    missing = [
+        {"name": name, "normalized_name": key, "manager_id": manager_id}
+        for key, (name, manager_id) in wanted.items() if key not in ids
+    ]
+    if missing:
+        statement = _insert_ignoring_duplicates(connection)
+        for offset in range(0, len(missing), EMPLOYEE_BATCH_SIZE):
+            connection.execute(statement, missing[offset:offset + EMPLOYEE_BATCH_SIZE])
+        ids.update(_lookup(connection, [row["normalized_name"] for row in missing]))
+    return ids
+
+def link_request_employees(connection: Connection) -> int:
+    """Create employees for, and link, every request without an employee_id; returns requests linked"""
+    rows = connection.execute(
+        select(TimeOffRequest.employee_name, TimeOffRequest.manager_id)
+        .where(TimeOffRequest.employee_id.is_(None))
+        # Oldest first, so each employee gets the manager of their latest request
+        .order_by(TimeOffRequest.id)
+    ).all()
+    if not rows:
+        return 0
+    ids = ensure_employees(connection, rows)
+
+    by_name: Dict[str, int] = {name: ids[normalize_name(name)] for name, _ in rows}
+    params = [{"b_name": name, "b_employee_id": employee_id} for name, employee_id in by_name.items()]
+    statement = (
+        update(TimeOffRequest)
+        .where(TimeOffRequest.employee_name == bindparam("b_name"), TimeOffRequest.employee_id.is_(None))
+        .values(employee_id=bindparam("b_employee_id"))
+        .execution_options(synchronize_session=False)
+    )
+    for offset in range(0, len(params), EMPLOYEE_BATCH_SIZE):
+        connection.execute(statement, params[offset:offset + EMPLOYEE_BATCH_SIZE])
+    return len(rows)
+
+def employee_requests_query(
+    employee_id: int,
+    limit: int,
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """An employee's requests, newest first (served by idx_time_off_employee_id_start)"""
+    query = select(*REQUEST_COLUMNS).where(TimeOffRequest.employee_id == employee_id)
+    if status is not None:
+        query = query.where(TimeOffRequest.status == status)
+    if date_from is not None:
+        query = query.where(TimeOffRequest.end_date >= date_from)
+    if date_to is not None:
+        query = query.where(TimeOffRequest.start_date <= date_to)
+    return query.order_by(TimeOffRequest.start_date.desc(), TimeOffRequest.id.desc()).limit(limit)
+
+def employee_to_dict(employee) -> dict:
+    return {
+        "id": employee.id,
+        "name": employee.name,
+        "email": employee.email,
+        "manager_id": employee.manager_id,
+    }
+
+# Link requests written through the ORM as they are flushed; Core writers
+# (bulk_import) call ensure_employees themselves
+
+@event.listens_for(TimeOffRequest, "before_insert")
+def _link_inserted_request(mapper, connection, target):
+    if target.employee_id is None and target.employee_name:
+        key = normalize_name(target.employee_name)
+        target.employee_id = ensure_employees(connection, [(target.employee_name, target.manager_id)])[key]
+
+@event.listens_for(TimeOffRequest, "before_update")
+def _relink_renamed_request(mapper, connection, target):
+    if inspect(target).attrs.employee_name.history.has_changes():
+        key = normalize_name(target.employee_name)
+        target.employee_id = ensure_employees(connection, [(target.employee_name, target.manager_id)])[key]
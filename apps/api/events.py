@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import random
+import secrets
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+import httpx
+from sqlalchemy import delete, event, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import OutboxEvent, TimeOffRequest
+
+# Where events are POSTed in batches (e.g. an n8n webhook); unset disables the outbox
+EVENT_WEBHOOK_URL = os.getenv("EVENT_WEBHOOK_URL", "")
+
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "100"))
+EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", "1"))
+EVENT_TIMEOUT = float(os.getenv("EVENT_TIMEOUT", "10"))
+
+# Failed batches are retried after EVENT_RETRY_BASE * 2^attempts seconds (jittered,
+# capped at EVENT_RETRY_MAX); events still undelivered after EVENT_MAX_ATTEMPTS are marked failed
+EVENT_MAX_ATTEMPTS = int(os.getenv("EVENT_MAX_ATTEMPTS", "10"))
+EVENT_RETRY_BASE = float(os.getenv("EVENT_RETRY_BASE", "2"))
+EVENT_RETRY_MAX = float(os.getenv("EVENT_RETRY_MAX", "300"))
+
+# Delivered events are kept this long for inspection
+EVENT_RETENTION_DAYS = float(os.getenv("EVENT_RETENTION_DAYS", "7"))
+
+SUBMITTED = "time_off_request.submitted"
+STATUS_CHANGED = "time_off_request.status_changed"
+
+EVENT_FIELDS = ("id", "employee_name", "start_date", "end_date", "reason", "manager_id", "status")
+
+def outbox_enabled() -> bool:
+    return bool(EVENT_WEBHOOK_URL)
+
+def _utcnow() -> datetime:
+    # Naive UTC, like the CURRENT_TIMESTAMP server defaults
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def event_data(request: Dict, previous_status: Optional[str] = None) -> Dict:
+    """JSON-ready event body for a request given as a dict of EVENT_FIELDS"""
+    data = {key: value.isoformat() if isinstance(value, date) else value for key, value in request.items()}
+    if previous_status is not None:
+        data["previous_status"] = previous_status
+    return data
+
+def request_event(event_type: str, request: Dict, previous_status: Optional[str] = None) -> Dict:
+    """An event_outbox row for a request given as a dict of EVENT_FIELDS"""
+    return {
+        "event_type": event_type,
+        "request_id": request["id"],
+        "payload": json.dumps(event_data(request, previous_status)),
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": _utcnow(),
+    }
+
+def add_events(connection: Connection, events: Iterable[Dict]):
+    """Write events in the caller's transaction (Core writers bypass the listeners below)"""
+    events = list(events)
+    if events and outbox_enabled():
+        connection.execute(insert(OutboxEvent), events)
+
+def _request_fields(target) -> Dict:
+    return {name: getattr(target, name) for name in EVENT_FIELDS}
+
+@event.listens_for(TimeOffRequest.status, "set", active_history=True)
+def _load_previous_status(target, value, oldvalue, initiator):
+    """active_history loads the replaced status for the status_changed event"""
+
+@event.listens_for(TimeOffRequest, "after_insert")
+def _request_submitted(mapper, connection, target):
+    add_events(connection, [request_event(SUBMITTED, _request_fields(target))])
+
+@event.listens_for(TimeOffRequest, "after_update")
+def _request_status_changed(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    previous = history.deleted[0] if history.deleted else None
+    if history.has_changes() and previous != target.status:
+        add_events(connection, [request_event(STATUS_CHANGED, _request_fields(target), previous)])
+
+def retry_delay(attempts: int, base: float = EVENT_RETRY_BASE, cap: float = EVENT_RETRY_MAX) -> float:
+    """Seconds before retry number `attempts`: exponential, capped, with jitter so workers spread out"""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+class OutboxDispatcher:
+    """Delivers outbox events in batches over a pooled HTTP client, off the request path
+
+    Delivery is at-least-once: a batch whose outcome is not recorded (worker
+    killed mid-POST) is claimed again once its lease expires, so receivers
+    should de-duplicate on the event id.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], AsyncEngine],
+        url: str,
+        batch_size: int = EVENT_BATCH_SIZE,
+        poll_interval: float = EVENT_POLL_INTERVAL,
+        timeout: float = EVENT_TIMEOUT,
+        max_attempts: int = EVENT_MAX_ATTEMPTS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.engine_factory = engine_factory
+        self.url = url
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._last_purge = 0.0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def claim(self, engine: AsyncEngine) -> List:
+        """Lease up to batch_size due events to this dispatcher"""
+        now = _utcnow()
+        token = secrets.token_hex(16)
+        due = select(OutboxEvent.id).where(
+            OutboxEvent.status == "pending", OutboxEvent.next_attempt_at <= now,
+        ).order_by(OutboxEvent.id).limit(self.batch_size)
+
+        async with engine.begin() as conn:
+            if conn.dialect.name == "mysql":
+                # MySQL cannot UPDATE a table it selects from in a subquery; lock the
+                # due rows instead, skipping those another worker is claiming
+                ids = (await conn.execute(due.with_for_update(skip_locked=True))).scalars().all()
+                claimed = OutboxEvent.id.in_(ids)
+            else:
+                # One statement, so concurrent dispatchers never claim the same row
+                claimed = OutboxEvent.id.in_(due.scalar_subquery())
+            await conn.execute(
+                update(OutboxEvent).where(claimed).values(
+                    claim_token=token,
+                    # Redelivered only if this dispatcher dies before recording the outcome
+                    next_attempt_at=now + timedelta(seconds=self.timeout * 3),
+                ).execution_options(synchronize_session=False)
+            )
+            result = await conn.execute(
+                select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.request_id, OutboxEvent.payload,
+                       OutboxEvent.attempts, OutboxEvent.created_at)
+                .where(OutboxEvent.claim_token == token).order_by(OutboxEvent.id))
+            return result.all()
+
+    async def deliver(self, rows: List) -> Optional[str]:
+        """POST one batch; returns None on a 2xx, else why it failed"""
+        body = {"events": [
+            {
+                "id": row.id,
+                "type": row.event_type,
+                "request_id": row.request_id,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "data": json.loads(row.payload),
+            }
+            for row in rows
+        ]}
+        try:
+            response = await self._get_client().post(self.url, json=body)
+        except httpx.HTTPError as e:
+            return f"{type(e).__name__}: {e}"
+        if not response.is_success:
+            return f"HTTP {response.status_code}"
+        return None
+
+    async def record(self, engine: AsyncEngine, rows: List, error: Optional[str]):
+        now = _utcnow()
+        ids = [row.id for row in rows]
+        async with engine.begin() as conn:
+            if error is None:
+                await conn.execute(
+                    update(OutboxEvent).where(OutboxEvent.id.in_(ids)).values(
+                        status="delivered", delivered_at=now, attempts=OutboxEvent.attempts + 1,
+                        claim_token=None, last_error=None,
+                    ).execution_options(synchronize_session=False))
+                self.delivered += len(rows)
+                return
+            for row in rows:
+                attempts = row.attempts + 1
+                exhausted = attempts >= self.max_attempts
+                await conn.execute(
+                    update(OutboxEvent).where(OutboxEvent.id == row.id).values(
+                        status="failed" if exhausted else "pending",
+                        attempts=attempts,
+                        next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+                        claim_token=None,
+                        last_error=error[:1000],
+                    ).execution_options(synchronize_session=False))
+                if exhausted:
+                    self.failed += 1
+                else:
+                    self.retried += 1
+
+    async def purge_delivered(self, engine: AsyncEngine) -> int:
+        cutoff = _utcnow() - timedelta(days=EVENT_RETENTION_DAYS)
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                delete(OutboxEvent).where(OutboxEvent.status == "delivered", OutboxEvent.delivered_at < cutoff))
+            return result.rowcount
+
+    async def run_once(self) -> int:
+        """Claim, deliver and record one batch; returns how many events it held"""
+        engine = self.engine_factory()
+        rows = await self.claim(engine)
+        if not rows:
+            if time.monotonic() - self._last_purge > 3600:
+                self._last_purge = time.monotonic()
+                await self.purge_delivered(engine)
+            return 0
+        self.batches += 1
+        error = await self.deliver(rows)
+        if error:
+            print(f"Event delivery failed ({len(rows)} events): {error}")
+        await self.record(engine, rows, error)
+        return len(rows)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # One pooled client: batches reuse keep-alive connections to the webhook
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                print(f"Event dispatch failed: {e}")
+                handled = 0
+            # A full batch means more are probably waiting
+            if handled < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Let the batch in flight be delivered and recorded: cancelling between
+            # deliver() and record() would leave it claimed, and it would be sent
+            # again once the lease expires. The POST is bounded by the client timeout.
+            self._stopping.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=self.timeout * 2)
+            except asyncio.TimeoutError:
+                print("Event dispatcher did not stop in time; its batch will be redelivered")
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"delivered": self.delivered, "retried": self.retried, "failed": self.failed, "batches": self.batches}
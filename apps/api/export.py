@@ -0,0 +1,50 @@
+import csv
+import io
+import os
+from datetime import date, datetime
+from typing import AsyncIterator
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Select
+
+from queries import REQUEST_COLUMNS, row_dicts
+
+# Rows fetched from the cursor (and written to the response) per chunk
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_FIELDS = [column.key for column in REQUEST_COLUMNS]
+
+def _to_text(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow(["" if value is None else _to_text(value) for value in row])
+    return buffer.getvalue()
+
+def _ndjson_chunk(rows) -> str:
+    # orjson encodes dates itself, several times faster than json.dumps over converted dicts
+    return b"".join(orjson.dumps(row) + b"\n" for row in row_dicts(rows)).decode()
+
+async def stream_export(engine: AsyncEngine, query: Select, fmt: str) -> AsyncIterator[str]:
+    """Stream query rows as CSV or NDJSON text, one chunk per server-side cursor fetch"""
+    if fmt == "csv":
+        yield _csv_chunk([], header=True)
+
+    # Own connection: the response body is produced after the route has returned
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows)
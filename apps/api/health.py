@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+class HealthMonitor:
+    """Probes the database in the background and caches the last result"""
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[bool]],
+        interval: float = 10.0,
+        stale_after: float = 30.0,
+    ):
+        self.probe = probe
+        self.interval = interval
+        self.stale_after = stale_after
+        self.healthy: Optional[bool] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[datetime] = None
+        self._checked_monotonic: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe_once(self) -> bool:
+        """Run the probe once and record its outcome"""
+        started = time.perf_counter()
+        try:
+            healthy = bool(await self.probe())
+        except Exception as e:
+            print(f"Health probe failed: {e}")
+            healthy = False
+        self.record(healthy, (time.perf_counter() - started) * 1000)
+        return healthy
+
+    def record(self, healthy: bool, latency_ms: float):
+        """Store a probe result"""
+        self.healthy = healthy
+        self.latency_ms = round(latency_ms, 3)
+        self.checked_at = datetime.now(timezone.utc)
+        self._checked_monotonic = time.monotonic()
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last probe, or None if never probed"""
+        if self._checked_monotonic is None:
+            return None
+        return time.monotonic() - self._checked_monotonic
+
+    @property
+    def stale(self) -> bool:
+        age = self.age
+        return age is None or age > self.stale_after
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.healthy) and not self.stale
+
+    def snapshot(self) -> dict:
+        """Cached database health for the /health endpoints"""
+        if self.healthy is None:
+            database = "unknown"
+        else:
+            database = "connected" if self.healthy else "disconnected"
+        return {
+            "database": database,
+            "database_latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "stale": self.stale,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.probe_once()
+
+    async def start(self):
+        """Probe once, then keep probing on the configured interval"""
+        await self.probe_once()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background probe"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+def create_health_monitor(probe: Callable[[], Awaitable[bool]]) -> HealthMonitor:
+    """Create a monitor using HEALTH_PROBE_INTERVAL / HEALTH_STALE_AFTER seconds"""
+    return HealthMonitor(
+        probe,
+        interval=float(os.getenv("HEALTH_PROBE_INTERVAL", "10")),
+        stale_after=float(os.getenv("HEALTH_STALE_AFTER", "30")),
+    )
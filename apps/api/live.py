@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, object_session
+
+from database import ManagerRequestVersion, TimeOffRequest
+from events import EVENT_FIELDS, STATUS_CHANGED, SUBMITTED, event_data
+
+# Recent events kept per manager so a reconnecting dashboard can resume
+LIVE_BUFFER_SIZE = int(os.getenv("LIVE_BUFFER_SIZE", "256"))
+
+# Events queued per connection; a client that falls further behind is disconnected
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "100"))
+
+# Seconds between keep-alive comments on an idle stream
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+
+# Streams are ended after this long; EventSource reconnects and resumes, which
+# spreads dashboards across workers and keeps shutdowns short
+LIVE_MAX_STREAM_SECONDS = float(os.getenv("LIVE_MAX_STREAM_SECONDS", "300"))
+
+# Open streams allowed per API worker
+LIVE_MAX_CONNECTIONS = int(os.getenv("LIVE_MAX_CONNECTIONS", "1000"))
+
+# Seconds between polls of the shared request versions when several workers serve streams
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "1"))
+
+# Sent instead of a replay when the events after Last-Event-ID are gone: refetch the list
+RESET = "reset"
+# Published once per manager per bulk-import batch rather than per row
+IMPORTED = "time_off_requests.imported"
+# The manager's requests changed, possibly on another worker: refetch the list
+CHANGED = "time_off_requests.changed"
+
+class TooManyStreams(Exception):
+    """The worker is at LIVE_MAX_CONNECTIONS"""
+
+def sse_frame(event_id: Optional[str], event_type: str, data: Dict) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event_type}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return "\n".join(lines) + "\n\n"
+
+class Subscriber:
+    """One open stream: a bounded frame queue owned by the stream's event loop"""
+
+    def __init__(self, manager_id: int, max_queue: int):
+        self.manager_id = manager_id
+        self.max_queue = max_queue
+        self.loop = asyncio.get_running_loop()
+        self.frames: Deque[str] = deque()
+        self.wakeup = asyncio.Event()
+        self.overflowed = False
+
+    def offer(self, frame: str):
+        """Queue a frame (called on self.loop); a full queue marks the stream for disconnect"""
+        if self.overflowed:
+            return
+        if len(self.frames) >= self.max_queue:
+            self.overflowed = True
+            self.frames.clear()
+        else:
+            self.frames.append(frame)
+        self.wakeup.set()
+
+class RequestEventHub:
+    """In-process pub/sub of request changes per manager, with a short replay buffer
+
+    Only writes made in this process are published here; VersionWatcher adds
+    those made on other workers.
+
+    Events are numbered "<epoch>-<sequence>", where the epoch is random per
+    process: a Last-Event-ID from another worker or an earlier run cannot be
+    resumed and gets a reset event instead.
+    """
+
+    def __init__(self, buffer_size: int = LIVE_BUFFER_SIZE, max_queue: int = LIVE_QUEUE_SIZE,
+                 max_connections: int = LIVE_MAX_CONNECTIONS):
+        self.buffer_size = buffer_size
+        self.max_queue = max_queue
+        self.max_connections = max_connections
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._buffers: Dict[int, Deque[Tuple[int, str]]] = {}
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._connections = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.resets = 0
+
+    def publish(self, manager_id: int, event_type: str, data: Dict):
+        """Fan an event out to the manager's open streams; safe to call from any thread"""
+        self.publish_many([(manager_id, event_type, data)])
+
+    def publish_many(self, events: Iterable[Tuple[int, str, Dict]]):
+        deliveries: List[Tuple[Subscriber, str]] = []
+        with self._lock:
+            for manager_id, event_type, data in events:
+                self._sequence += 1
+                # Encoded once, however many dashboards receive it
+                frame = sse_frame(f"{self.epoch}-{self._sequence}", event_type, data)
+                buffer = self._buffers.get(manager_id)
+                if buffer is None:
+                    buffer = self._buffers[manager_id] = deque(maxlen=self.buffer_size)
+                buffer.append((self._sequence, frame))
+                deliveries.extend((subscriber, frame) for subscriber in self._subscribers.get(manager_id, ()))
+                self.published += 1
+            self.delivered += len(deliveries)
+        for subscriber, frame in deliveries:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, frame)
+            except RuntimeError:
+                # The stream's loop has closed; it unsubscribes itself
+                pass
+
+    def _parse_event_id(self, event_id: str) -> Optional[int]:
+        epoch, _, sequence = event_id.strip().partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def subscribe(self, manager_id: int, last_event_id: Optional[str] = None) -> Subscriber:
+        """Open a stream for the manager, replaying events after last_event_id when still buffered"""
+        subscriber = Subscriber(manager_id, self.max_queue)
+        with self._lock:
+            if self._connections >= self.max_connections:
+                raise TooManyStreams(f"at most {self.max_connections} live streams per worker")
+            if last_event_id:
+                after = self._parse_event_id(last_event_id)
+                buffer = self._buffers.get(manager_id, ())
+                oldest = buffer[0][0] if buffer else self._sequence + 1
+                # Resumable only if nothing after `after` has been evicted
+                if after is not None and oldest - 1 <= after <= self._sequence:
+                    # Not subject to the queue limit: a replay longer than the queue would
+                    # otherwise overflow on every reconnect
+                    subscriber.frames.extend(frame for sequence, frame in buffer if sequence > after)
+                else:
+                    subscriber.frames.append(sse_frame(f"{self.epoch}-{self._sequence}", RESET, {}))
+                    self.resets += 1
+                if subscriber.frames:
+                    subscriber.wakeup.set()
+            self._subscribers.setdefault(manager_id, set()).add(subscriber)
+            self._connections += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.manager_id)
+            if subscribers is not None and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.manager_id]
+                self._connections -= 1
+            if subscriber.overflowed:
+                self.dropped += 1
+
+    def subscribed_managers(self) -> List[int]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self._connections,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "resets": self.resets,
+        }
+
+async def stream_events(
+    hub: RequestEventHub,
+    subscriber: Subscriber,
+    heartbeat: Optional[float] = None,
+    max_seconds: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """SSE body for one subscriber: queued frames, heartbeats, and an end after max_seconds"""
+    heartbeat = LIVE_HEARTBEAT_SECONDS if heartbeat is None else heartbeat
+    max_seconds = LIVE_MAX_STREAM_SECONDS if max_seconds is None else max_seconds
+    deadline = time.monotonic() + max_seconds
+    try:
+        # Reconnect quickly after the server ends the stream
+        yield "retry: 1000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(subscriber.wakeup.wait(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            subscriber.wakeup.clear()
+            if subscriber.overflowed:
+                # Too slow to keep up: end the stream; the client resumes from the buffer or resets
+                yield sse_frame(None, "overflow", {})
+                return
+            frames = "".join(subscriber.frames)
+            subscriber.frames.clear()
+            yield frames
+    finally:
+        hub.unsubscribe(subscriber)
+
+class VersionWatcher:
+    """Announces changes made on other workers to this worker's streams
+
+    The hub only hears about writes made in its own process. Every writer also
+    bumps manager_request_versions in its transaction, so polling the versions of
+    the managers with open streams catches the rest: a version that moved since
+    the last poll is published as a `changed` event.
+    """
+
+    def __init__(self, hub: RequestEventHub, engine_factory: Callable[[], AsyncEngine],
+                 interval: float = LIVE_POLL_SECONDS):
+        self.hub = hub
+        self.engine_factory = engine_factory
+        self.interval = interval
+        self._versions: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.changes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def watch(self, manager_id: int, version: int):
+        """Start from the version the stream opened at, unless the manager is already watched"""
+        self._versions.setdefault(manager_id, version)
+
+    async def poll(self):
+        """One round: publish `changed` for every watched manager whose version moved"""
+        managers = self.hub.subscribed_managers()
+        self._versions = {manager_id: self._versions[manager_id] for manager_id in managers if manager_id in self._versions}
+        if not managers:
+            return
+        async with self.engine_factory().connect() as conn:
+            current = dict((await conn.execute(
+                select(ManagerRequestVersion.manager_id, ManagerRequestVersion.version)
+                .where(ManagerRequestVersion.manager_id.in_(managers))
+            )).all())
+        self.polls += 1
+
+        events = []
+        for manager_id in managers:
+            version = current.get(manager_id, 0)
+            if manager_id in self._versions and self._versions[manager_id] != version:
+                events.append((manager_id, CHANGED, {"version": version}))
+            self._versions[manager_id] = version
+        self.changes += len(events)
+        self.hub.publish_many(events)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Live version poll failed: {e}")
+
+    async def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._versions = {}
+
+    def stats(self) -> Dict[str, int]:
+        return {"polls": self.polls, "changes": self.changes}
+
+live_hub = RequestEventHub()
+
+# ORM writes are published after their transaction commits, so dashboards never
+# see a change that was rolled back. Core writers (decisions, bulk_import)
+# publish after their own commits.
+_PENDING_KEY = "live_events"
+
+def _queue_event(target, event_type: str, previous_status: Optional[str] = None):
+    session = object_session(target)
+    if session is None:
+        return
+    data = event_data({name: getattr(target, name) for name in EVENT_FIELDS}, previous_status)
+    session.info.setdefault(_PENDING_KEY, []).append((target.manager_id, event_type, data))
+
+@event.listens_for(TimeOffRequest, "after_insert")
+def _request_inserted(mapper, connection, target):
+    _queue_event(target, SUBMITTED)
+
+@event.listens_for(TimeOffRequest, "after_update")
+def _request_updated(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    previous = history.deleted[0] if history.deleted else None
+    if history.has_changes() and previous != target.status:
+        _queue_event(target, STATUS_CHANGED, previous)
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        live_hub.publish_many(events)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,13 +1,54 @@
-from fastapi import FastAPI
+from datetime import date
+from typing import List, Optional
+from fastapi import FastAPI, Body, Depends, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uvicorn
+import math
 import os
-from database import init_db, test_db_connection
+from database import REQUEST_STATUSES, Employee, Manager, TimeOffRequest, init_async_db, check_async_db_connection, dispose_engines, get_async_db, get_async_engine
+from bulk_import import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, BulkImport, iter_lines, validate_row, write_batch
+from archive import ARCHIVE_TABLE, archived_requests_query, read_with_archive, with_archive
+from auth import (
+    SESSION_COOKIE,
+    SESSION_COOKIE_SECURE,
+    InvalidCredentials,
+    LoginThrottled,
+    authenticate,
+    get_current_manager,
+    get_current_manager_id,
+)
+from balances import ANNUAL_ALLOWANCE_DAYS, balances_query, yearly_balances
+from cache import manager_cache
+from compression import CompressionMiddleware
+from conflicts import SubmissionConflict, submit_request
+from decisions import decide_chunk, decision_chunks, parse_decisions
+from employees import employee_requests_query, employee_to_dict
+from events import EVENT_WEBHOOK_URL, OutboxDispatcher, outbox_enabled
+from export import EXPORT_FORMATS, stream_export
+from health import create_health_monitor
+from live import TooManyStreams, VersionWatcher, live_hub, stream_events
+from metrics import MetricsMiddleware, metrics, stats_collector
+from overlap import overlapping_requests_query
+from pagination import DEFAULT_PAGE_SIZE, KEYSET_FIELDS, MAX_PAGE_SIZE, build_page, decode_cursor, manager_page_query, parse_fields
+from passwords import HasherBusy, password_hasher
+from queries import REQUEST_COLUMNS, REQUEST_FIELD_NAMES, request_to_dict, row_dicts
+import schemas
+from schemas import json_response
+from search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MAX_SEARCH_OFFSET, search_requests_query, search_terms
+from server import running_workers
+from sessions import SESSION_TTL_SECONDS, SessionSweeper, session_store
+from staffing import MAX_COVERAGE_DAYS, coverage_query, dense_coverage
+from versions import etag_matches, manager_version, request_etag
 
 app = FastAPI(
     title="Time Off System API",
     description="FastAPI backend for time-off request management system",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson renders responses; the list endpoints also skip jsonable_encoder (schemas.json_response)
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS for frontend communication
@@ -19,22 +60,480 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and per-request SQL instrumentation, exported on /metrics
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# brotli or gzip for large JSON bodies; the SSE stream is never buffered by the compressor
+app.add_middleware(CompressionMiddleware, excluded_paths=("/manager/requests/stream",))
+metrics.add_collector(stats_collector("time_off_cache", manager_cache.stats))
+metrics.add_collector(stats_collector("login_hasher", password_hasher.stats, gauges=("in_flight",)))
+metrics.add_collector(stats_collector("sessions", session_store.stats))
+metrics.add_collector(stats_collector("live_stream", live_hub.stats, gauges=("connections",)))
+
+# Background database probe; health endpoints answer from its cached result
+health_monitor = create_health_monitor(check_async_db_connection)
+
+# Background bulk expiry of login sessions
+session_sweeper = SessionSweeper(session_store)
+
+# With several workers, tells each worker's streams about changes made on the others
+version_watcher = VersionWatcher(live_hub, get_async_engine)
+metrics.add_collector(stats_collector("live_versions", version_watcher.stats, gauges=()))
+
+# Delivers request events from the outbox table to EVENT_WEBHOOK_URL
+event_dispatcher = OutboxDispatcher(get_async_engine, EVENT_WEBHOOK_URL)
+metrics.add_collector(stats_collector("event_outbox", event_dispatcher.stats, gauges=()))
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
-    init_db()
+    await init_async_db()
     print("Database initialized successfully")
+    await health_monitor.start()
+    await session_sweeper.start()
+    if running_workers() > 1:
+        await version_watcher.start()
+    if outbox_enabled():
+        await event_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and close pooled connections once requests have drained"""
+    await health_monitor.stop()
+    await session_sweeper.stop()
+    await version_watcher.stop()
+    await event_dispatcher.stop()
+    password_hasher.shutdown()
+    await dispose_engines()
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for application monitoring"""
-    db_healthy = test_db_connection()
     return {
-        "status": "healthy" if db_healthy else "unhealthy",
+        "status": "healthy" if health_monitor.ready else "unhealthy",
         "service": "time-off-api",
         "version": "1.0.0",
-        "database": "connected" if db_healthy else "disconnected"
+        "workers": running_workers(),
+        "pid": os.getpid(),
+        **health_monitor.snapshot(),
+    }
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe - the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe - the last database probe succeeded and is fresh"""
+    ready = health_monitor.ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", **health_monitor.snapshot()},
+    )
+
+@app.get("/requests/overlapping", response_model=schemas.ApiResponse[List[schemas.TimeOffRequest]])
+async def overlapping_requests(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    status: Optional[str] = None,
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The manager's requests that overlap the [from, to] date range (who is off between X and Y)"""
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    if status is not None and status not in REQUEST_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(REQUEST_STATUSES)}")
+
+    query = await read_with_archive(
+        db, overlapping_requests_query(date_from, date_to, manager_id, status), date_from, date_to,
+        order_by=KEYSET_FIELDS, manager_id=manager_id, statuses=[status] if status else None,
+    )
+    rows = (await db.execute(query)).all()
+    return json_response({"success": True, "data": row_dicts(rows)})
+
+@app.post("/requests", status_code=201, response_model=schemas.ApiResponse[schemas.TimeOffRequest])
+async def create_request(payload: dict = Body(...), db: AsyncSession = Depends(get_async_db)):
+    """Submit a time-off request; rejects overlaps and days where the team is at its absence limit"""
+    try:
+        manager_id = int(payload.get("manager_id"))
+    except (TypeError, ValueError):
+        manager_id = None
+    manager_ids = set((await db.execute(select(Manager.id).where(Manager.id == manager_id))).scalars())
+    try:
+        # Submissions always start pending; only managers change the status
+        row = validate_row({**payload, "status": "pending"}, manager_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        request = await submit_request(db, row)
+    except SubmissionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"success": True, "data": request_to_dict(request)}
+
+@app.post("/requests/bulk")
+async def bulk_import_requests(
+    request: Request,
+    format: Optional[str] = None,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream-import JSON Lines or CSV requests for the logged-in manager in batched transactions"""
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+    importer = BulkImport(format, {manager_id}, batch_size, manager_id=manager_id)
+
+    async with db.bind.connect() as conn:
+        async for line_no, line in iter_lines(request.stream()):
+            batch = importer.feed_line(line_no, line)
+            if batch:
+                importer.record_batch(batch, await conn.run_sync(write_batch, batch))
+        batch = importer.finish()
+        importer.record_batch(batch, await conn.run_sync(write_batch, batch))
+
+    # Core inserts bypass the ORM cache listeners
+    manager_cache.invalidate_managers(importer.touched_managers)
+    return {"success": True, "data": importer.report()}
+
+@app.post("/manager/login", response_model=schemas.ApiResponse[schemas.ManagerSession])
+async def manager_login(
+    request: Request,
+    response: Response,
+    payload: dict = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Verify a manager's email and password and start a cookie session; hashing runs on the bounded bcrypt pool"""
+    email, password = payload.get("email"), payload.get("password")
+    if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
+        raise HTTPException(status_code=400, detail="email and password are required")
+
+    client_ip = request.client.host if request.client else "unknown"
+    try:
+        manager = await authenticate(db, email, password, client_ip)
+    except LoginThrottled as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except HasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except InvalidCredentials as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    response.set_cookie(
+        SESSION_COOKIE, session_store.create(manager), max_age=int(SESSION_TTL_SECONDS),
+        httponly=True, secure=SESSION_COOKIE_SECURE, samesite="lax",
+    )
+    return {"success": True, "data": manager}
+
+@app.post("/manager/logout")
+async def manager_logout(request: Request, response: Response):
+    """End the current session, if any"""
+    token = request.cookies.get(SESSION_COOKIE)
+    if token:
+        session_store.delete(token)
+    response.delete_cookie(SESSION_COOKIE, httponly=True, secure=SESSION_COOKIE_SECURE, samesite="lax")
+    return {"success": True}
+
+@app.get("/manager/session", response_model=schemas.ApiResponse[schemas.ManagerSession])
+async def manager_session(manager: dict = Depends(get_current_manager)):
+    """The logged-in manager, for the dashboard header and route guards"""
+    return {"success": True, "data": manager}
+
+def revalidate_headers(etag: str) -> dict:
+    # Per-user data: browsers may keep it but must revalidate before every reuse
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Cookie"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=revalidate_headers(etag))
+
+@app.get("/manager/requests", response_model=schemas.RequestPage)
+async def list_manager_requests(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Keyset-paginated list of the manager's requests, ordered by (start_date, id)
+
+    Answers If-None-Match with 304 from the manager's version alone.
+    """
+    if status is not None and status not in REQUEST_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(REQUEST_STATUSES)}")
+    try:
+        selected_fields = parse_fields(fields)
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    params = {
+        "cursor": cursor, "limit": limit, "status": status,
+        "from": date_from, "to": date_to, "fields": selected_fields,
+    }
+    version = await manager_version(db, manager_id)
+    etag = request_etag(manager_id, version, "requests", sorted(params.items()))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # Versioned key: a page cached before a change (on any worker) is never served after it
+    cache_key = manager_cache.key("requests", manager_id, {**params, "version": version})
+    page = manager_cache.get(cache_key)
+    if page is None:
+        query = await read_with_archive(
+            db, manager_page_query(manager_id, selected_fields, limit, position, status, date_from, date_to),
+            date_from, date_to, order_by=KEYSET_FIELDS, limit=limit + 1,
+            manager_id=manager_id, statuses=[status] if status else None, after=position,
+        )
+        rows = (await db.execute(query)).all()
+        data, next_cursor = build_page(rows, selected_fields, limit)
+        page = {"success": True, "data": data, "next_cursor": next_cursor}
+        manager_cache.set(cache_key, manager_id, page)
+    return json_response(page, headers=revalidate_headers(etag))
+
+@app.get("/manager/requests/search", response_model=schemas.SearchPage)
+async def search_manager_requests(
+    q: str = Query(..., max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    status: Optional[str] = None,
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The manager's requests whose employee name or reason contains every word of q, best match first"""
+    if status is not None and status not in REQUEST_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(REQUEST_STATUSES)}")
+    try:
+        terms = search_terms(q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    query = search_requests_query(db.bind.dialect.name, manager_id, terms, limit, offset, status)
+    rows = (await db.execute(query)).all()
+    return json_response({
+        "success": True,
+        "data": row_dicts(rows[:limit]),
+        "next_offset": offset + limit if len(rows) > limit else None,
+    })
+
+@app.get("/manager/requests/stream")
+async def stream_manager_requests(
+    request: Request,
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Server-Sent Events for the manager's new submissions and status changes
+
+    Idle streams cost a heartbeat, not a query. After a reconnect the
+    Last-Event-ID header replays missed events, or sends `reset` when they are
+    no longer buffered and the dashboard should refetch /manager/requests.
+    With several workers, changes made on the others arrive as `changed`.
+    """
+    if version_watcher.running:
+        version_watcher.watch(manager_id, await manager_version(db, manager_id))
+    try:
+        subscriber = live_hub.subscribe(manager_id, request.headers.get("last-event-id"))
+    except TooManyStreams as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return StreamingResponse(
+        stream_events(live_hub, subscriber),
+        media_type="text/event-stream",
+        # No proxy buffering or caching of the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/manager/requests/decisions")
+async def decide_requests(
+    payload: dict = Body(...),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Approve or deny many pending requests with a few set-based UPDATEs; reports an outcome per id"""
+    try:
+        decisions = parse_decisions(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    outcomes = {}
+    async with db.bind.connect() as conn:
+        for status, ids in decision_chunks(decisions):
+            outcomes.update(await conn.run_sync(decide_chunk, manager_id, status, ids))
+
+    updated = sum(outcome in ("approved", "denied") for outcome in outcomes.values())
+    if updated:
+        # Core updates bypass the ORM cache listeners; invalidate once for the whole call
+        manager_cache.invalidate_managers([manager_id])
+    return {
+        "success": True,
+        "data": {
+            "updated": updated,
+            "results": [{"id": request_id, "outcome": outcomes[request_id]} for request_id in decisions],
+        },
+    }
+
+@app.get("/manager/requests/export")
+async def export_manager_requests(
+    format: str = "csv",
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream the manager's requests as CSV or NDJSON without materializing them"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    if status is not None and status not in REQUEST_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(REQUEST_STATUSES)}")
+
+    if date_from is not None or date_to is not None:
+        # Always with the archive: the export streams on its own connection, so a
+        # watermark read here could be stale by then; one UNION ALL statement is not
+        query = with_archive(
+            overlapping_requests_query(date_from or date.min, date_to or date.max, manager_id, status),
+            archived_requests_query(REQUEST_FIELD_NAMES, manager_id=manager_id, statuses=[status] if status else None,
+                                    date_from=date_from, date_to=date_to),
+            KEYSET_FIELDS,
+        )
+    else:
+        query = select(*REQUEST_COLUMNS).where(TimeOffRequest.manager_id == manager_id)
+        if status is not None:
+            query = query.where(TimeOffRequest.status == status)
+        query = query.order_by(TimeOffRequest.start_date, TimeOffRequest.id)
+
+    return StreamingResponse(
+        stream_export(db.bind, query, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="time-off-requests.{format}"'},
+    )
+
+@app.get("/manager/coverage")
+async def manager_coverage(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    if_none_match: Optional[str] = Header(None),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Dense per-day approved/pending absence counts for the manager's team"""
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    if (date_to - date_from).days + 1 > MAX_COVERAGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"range must be at most {MAX_COVERAGE_DAYS} days")
+
+    etag = request_etag(manager_id, await manager_version(db, manager_id), "coverage", date_from, date_to)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    rows = (await db.execute(coverage_query(manager_id, date_from, date_to))).all()
+    return json_response(
+        {"success": True, "data": {"manager_id": manager_id, **dense_coverage(rows, date_from, date_to)}},
+        headers=revalidate_headers(etag),
+    )
+
+@app.get("/balances")
+async def leave_balances(
+    year: Optional[int] = Query(None, ge=1900, le=9999),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Business days used, pending and remaining for a year by each employee of the manager"""
+    year = year or date.today().year
+    query = await read_with_archive(
+        db, balances_query(year, manager_id), date(year, 1, 1), date(year, 12, 31),
+        archived=balances_query(year, manager_id, table=ARCHIVE_TABLE),
+    )
+    rows = (await db.execute(query)).all()
+    return json_response({
+        "success": True,
+        "data": {
+            "year": year,
+            "allowance_days": ANNUAL_ALLOWANCE_DAYS,
+            "employees": yearly_balances(rows, year),
+        },
+    })
+
+# Most requests returned by one employee history call
+MAX_EMPLOYEE_REQUESTS = 1000
+
+async def _get_employee(db: AsyncSession, employee_id: int, manager_id: int) -> Employee:
+    """The manager's employee; another manager's employee is as missing as an unknown one"""
+    employee = await db.get(Employee, employee_id)
+    if employee is None or employee.manager_id != manager_id:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return employee
+
+@app.get("/employees/{employee_id}/requests", response_model=schemas.ApiResponse[List[schemas.TimeOffRequest]])
+async def list_employee_requests(
+    employee_id: int,
+    limit: int = Query(100, ge=1, le=MAX_EMPLOYEE_REQUESTS),
+    status: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """History of one of the manager's employees, newest first"""
+    if status is not None and status not in REQUEST_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(REQUEST_STATUSES)}")
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+
+    employee = await _get_employee(db, employee_id, manager_id)
+    query = await read_with_archive(
+        db, employee_requests_query(employee_id, limit, status, date_from, date_to), date_from, date_to,
+        order_by=KEYSET_FIELDS, descending=True, limit=limit,
+        employee_id=employee_id, statuses=[status] if status else None,
+    )
+    rows = (await db.execute(query)).all()
+    return json_response({
+        "success": True,
+        "data": row_dicts(rows),
+        "employee": employee_to_dict(employee),
+    })
+
+@app.get("/employees/{employee_id}/balances")
+async def employee_balance(
+    employee_id: int,
+    year: Optional[int] = Query(None, ge=1900, le=9999),
+    manager_id: int = Depends(get_current_manager_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Business days used, pending and remaining for a year by one of the manager's employees"""
+    year = year or date.today().year
+    employee = await _get_employee(db, employee_id, manager_id)
+    query = await read_with_archive(
+        db, balances_query(year, employee_id=employee_id), date(year, 1, 1), date(year, 12, 31),
+        archived=balances_query(year, employee_id=employee_id, table=ARCHIVE_TABLE),
+    )
+    rows = (await db.execute(query)).all()
+    balances = yearly_balances(rows, year)
+    balance = balances[0] if balances else {
+        "employee_name": employee.name, "used_days": 0, "pending_days": 0, "remaining_days": ANNUAL_ALLOWANCE_DAYS,
     }
+    return {
+        "success": True,
+        "data": {"year": year, "allowance_days": ANNUAL_ALLOWANCE_DAYS, "employee_id": employee_id, **balance},
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters for the manager dashboard cache"""
+    return {"success": True, "data": manager_cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, SQL and cache metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
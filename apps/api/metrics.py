@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Queries-per-request buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Statements slower than this are counted and logged
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# The same statement repeated this often within one request is flagged as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, labels: Labels = ()):
+        series = self._series.get(labels)
+        if series is None:
+            # One slot per bucket, then +Inf, sum and count
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 3)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-3] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', _format_bound(bound)),))} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return lines
+
+class CounterMetric:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._series.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+def _format_bound(bound) -> str:
+    return bound if isinstance(bound, str) else repr(float(bound))
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+class RequestStats:
+    """SQL activity recorded while serving one HTTP request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statements: Counter = Counter()
+
+class MetricsRegistry:
+    """Process-wide request and SQL metrics rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by route", LATENCY_BUCKETS)
+        self.requests_total = CounterMetric(
+            "http_requests_total", "HTTP requests by route and status")
+        self.request_queries = Histogram(
+            "http_request_db_queries", "SQL statements executed per HTTP request", QUERY_COUNT_BUCKETS)
+        self.request_query_seconds = Histogram(
+            "http_request_db_seconds", "Time spent in SQL per HTTP request", LATENCY_BUCKETS)
+        self.query_duration = Histogram(
+            "db_query_duration_seconds", "SQL statement latency", LATENCY_BUCKETS)
+        self.slow_queries = CounterMetric(
+            "db_slow_queries_total", f"SQL statements slower than {SLOW_QUERY_MS:g}ms")
+        self.n_plus_one = CounterMetric(
+            "db_n_plus_one_total", f"Requests repeating one statement at least {N_PLUS_ONE_THRESHOLD} times")
+        self._extra_collectors = []
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines at scrape time"""
+        self._extra_collectors.append(collector)
+
+    def observe_query(self, statement: str, seconds: float, path: Optional[str]):
+        with self._lock:
+            self.query_duration.observe(seconds)
+            if seconds * 1000 >= SLOW_QUERY_MS:
+                self.slow_queries.inc()
+                print(f"Slow query ({seconds * 1000:.1f}ms) on {path or 'no request'}: {statement[:200]}")
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        labels = (("method", method), ("route", route))
+        with self._lock:
+            self.request_duration.observe(seconds, labels)
+            self.requests_total.inc(labels + (("status", str(status)),))
+            self.request_queries.observe(stats.queries, labels)
+            self.request_query_seconds.observe(stats.query_seconds, labels)
+            if stats.statements:
+                statement, repeats = stats.statements.most_common(1)[0]
+                if repeats >= N_PLUS_ONE_THRESHOLD:
+                    self.n_plus_one.inc(labels)
+                    print(f"Possible N+1 on {method} {route}: {repeats}x {statement[:200]}")
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (
+                self.request_duration,
+                self.requests_total,
+                self.request_queries,
+                self.request_query_seconds,
+                self.query_duration,
+                self.slow_queries,
+                self.n_plus_one,
+            ):
+                lines.extend(metric.render())
+        for collector in self._extra_collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+def stats_collector(prefix: str, stats_fn, gauges: Iterable[str] = ("entries",)):
+    """Expose a stats() dict as Prometheus gauges/counters named prefix_<key>"""
+    gauges = set(gauges)
+
+    def collect() -> List[str]:
+        lines = []
+        for key, value in stats_fn().items():
+            if key in gauges:
+                name, kind = f"{prefix}_{key}", "gauge"
+            else:
+                name, kind = f"{prefix}_{key}_total", "counter"
+            lines += [f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"]
+        return lines
+
+    return collect
+
+# Stats for the HTTP request currently being served (None outside requests)
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+_current_path: ContextVar[Optional[str]] = ContextVar("current_path", default=None)
+
+# Time every statement on every engine (sync, async and test engines alike)
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+        stats.statements[statement] += 1
+    metrics.observe_query(statement, elapsed, _current_path.get())
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and per-request SQL activity"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+        self._route_paths: Dict[object, str] = {}
+
+    def _route_for(self, scope) -> str:
+        # Label by route template, not raw path, to keep cardinality bounded
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._route_paths:
+            router = scope["app"].router
+            for route in router.routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._route_paths[endpoint] = route.path
+                    break
+            else:
+                self._route_paths[endpoint] = getattr(endpoint, "__name__", "unknown")
+        return self._route_paths[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        stats_token = _current_request.set(stats)
+        path_token = _current_path.set(scope["path"])
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.registry.observe_request(scope["method"], self._route_for(scope), status, elapsed, stats)
+            _current_request.reset(stats_token)
+            _current_path.reset(path_token)
@@ -0,0 +1,196 @@
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, func, inspect, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable, DropIndex, Index
+
+from database import (
+    REQUEST_STATUSES,
+    Base,
+    Employee,
+    Manager,
+    SchemaVersion,
+    StaffingCoverage,
+    TimeOffRequest,
+    TimeOffRequestDay,
+)
+from employees import link_request_employees
+from overlap import rebuild_request_days
+from search import create_search_index, drop_search_index
+from staffing import rebuild_coverage
+
+# Forward-only, idempotent migrations: each checks the live schema before
+# changing it, so databases created by the ORM, by database/create_sqlite_db.py
+# or by database/init/01-create-tables.sql all converge on the same schema.
+
+def _create_missing_tables(connection: Connection):
+    Base.metadata.create_all(connection, checkfirst=True)
+
+def _rebuild_sqlite_requests_table(connection: Connection):
+    """Recreate time_off_requests from the ORM definition (SQLite cannot ALTER in a CHECK)"""
+    table = TimeOffRequest.__table__
+    metadata = MetaData()
+    Manager.__table__.to_metadata(metadata)
+    Employee.__table__.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name="time_off_requests_rebuild")
+    existing = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(time_off_requests)")}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+
+    # The search view would fail the RENAME below while time_off_requests is gone
+    drop_search_index(connection)
+    connection.execute(CreateTable(rebuilt))
+    connection.exec_driver_sql(
+        f"INSERT INTO time_off_requests_rebuild ({columns}) SELECT {columns} FROM time_off_requests")
+    connection.exec_driver_sql("DROP TABLE time_off_requests")
+    connection.exec_driver_sql("ALTER TABLE time_off_requests_rebuild RENAME TO time_off_requests")
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+    # Dropping the old table cascades to the day index and search triggers; restore them
+    rebuild_request_days(connection)
+    create_search_index(connection)
+
+def _constrain_request_status(connection: Connection):
+    """The ORM-created table had no CHECK/ENUM on status and no server default"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        ddl = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'time_off_requests'").scalar()
+        if "CHECK" not in ddl.upper():
+            _rebuild_sqlite_requests_table(connection)
+    elif dialect == "mysql":
+        data_type = connection.exec_driver_sql(
+            "SELECT DATA_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() "
+            "AND TABLE_NAME = 'time_off_requests' AND COLUMN_NAME = 'status'").scalar()
+        if data_type != "enum":
+            values = ", ".join(f"'{status}'" for status in REQUEST_STATUSES)
+            connection.exec_driver_sql(
+                f"ALTER TABLE time_off_requests MODIFY status ENUM({values}) DEFAULT 'pending'")
+
+# Indexes the ORM used to create via index=True, superseded by the named
+# indexes the SQL scripts define
+_LEGACY_INDEXES = {
+    "managers": ("ix_managers_id", "ix_managers_email"),
+    "time_off_requests": (
+        "ix_time_off_requests_id",
+        "ix_time_off_requests_start_date",
+        "ix_time_off_requests_end_date",
+        "ix_time_off_requests_manager_id",
+    ),
+}
+
+def _drop_index(connection: Connection, table_name: str, name: str):
+    # Build the Index on a throwaway table so it is never attached to the ORM tables
+    stub = Table(table_name, MetaData(), Column("id", Integer))
+    connection.execute(DropIndex(Index(name, stub.c.id)))
+
+def _align_index_names(connection: Connection):
+    inspector = inspect(connection)
+    # Create the named indexes first so a foreign key never loses its index on MySQL
+    for table in (Manager.__table__, TimeOffRequest.__table__, TimeOffRequestDay.__table__):
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            # Indexes on columns a later migration adds are created by that migration
+            if all(column.name in existing_columns for column in index.columns):
+                index.create(connection, checkfirst=True)
+    for table_name, legacy_names in _LEGACY_INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        for name in legacy_names:
+            if name in existing:
+                _drop_index(connection, table_name, name)
+
+def _backfill_derived_tables(connection: Connection):
+    """Databases from before the day index / staffing coverage have empty derived tables"""
+    def is_empty(column) -> bool:
+        return connection.execute(select(column).limit(1)).first() is None
+
+    if is_empty(TimeOffRequest.id):
+        return
+    if is_empty(TimeOffRequestDay.request_id):
+        rebuild_request_days(connection)
+    if is_empty(StaffingCoverage.day):
+        rebuild_coverage(connection)
+
+def _link_employees(connection: Connection):
+    """Add time_off_requests.employee_id and fill it from the de-duplicated employee names"""
+    _create_missing_tables(connection)
+    columns = {column["name"] for column in inspect(connection).get_columns("time_off_requests")}
+    if "employee_id" not in columns:
+        if connection.dialect.name == "mysql":
+            connection.exec_driver_sql(
+                "ALTER TABLE time_off_requests ADD COLUMN employee_id INT NULL AFTER employee_name, "
+                "ADD CONSTRAINT fk_time_off_employee FOREIGN KEY (employee_id) "
+                "REFERENCES employees(id) ON DELETE SET NULL")
+        else:
+            connection.exec_driver_sql(
+                "ALTER TABLE time_off_requests ADD COLUMN employee_id INTEGER "
+                "REFERENCES employees(id) ON DELETE SET NULL")
+    for index in TimeOffRequest.__table__.indexes:
+        if "employee_id" in index.columns:
+            index.create(connection, checkfirst=True)
+    linked = link_request_employees(connection)
+    if linked:
+        print(f"Linked {linked} time-off requests to employees")
+
+def _drop_employee_name_index(connection: Connection):
+    """The overlap check now filters on employee_id (idx_time_off_employee_id_start)"""
+    existing = {index["name"] for index in inspect(connection).get_indexes("time_off_requests")}
+    if "idx_time_off_employee_start" in existing:
+        _drop_index(connection, "time_off_requests", "idx_time_off_employee_start")
+
+Migration = Tuple[int, str, Callable[[Connection], None]]
+
+MIGRATIONS: List[Migration] = [
+    (1, "create_missing_tables", _create_missing_tables),
+    (2, "constrain_request_status", _constrain_request_status),
+    (3, "align_index_names", _align_index_names),
+    (4, "backfill_derived_tables", _backfill_derived_tables),
+    (5, "create_event_outbox", _create_missing_tables),
+    (6, "link_employees", _link_employees),
+    (7, "create_manager_request_versions", _create_missing_tables),
+    (8, "create_request_search_index", create_search_index),
+    (9, "create_request_archive", _create_missing_tables),
+    (10, "drop_employee_name_index", _drop_employee_name_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(connection: Connection) -> int:
+    """Highest applied migration (0 if unversioned); one catalog lookup, no table reflection"""
+    if not connection.dialect.has_table(connection, SchemaVersion.__tablename__):
+        return 0
+    return connection.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+def _lock_schema(connection: Connection):
+    """Serialize migrations when several workers boot against one database"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        # Take the write lock now; pysqlite has not begun a transaction yet
+        # because nothing has been written on this connection
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    elif dialect == "mysql":
+        connection.exec_driver_sql("SELECT GET_LOCK('time_off_schema_migration', 60)")
+
+def _unlock_schema(connection: Connection):
+    if connection.dialect.name == "mysql":
+        connection.exec_driver_sql("SELECT RELEASE_LOCK('time_off_schema_migration')")
+
+def migrate(connection: Connection) -> int:
+    """Apply pending migrations inside the caller's transaction; returns how many ran"""
+    if current_version(connection) >= LATEST_VERSION:
+        return 0
+
+    _lock_schema(connection)
+    try:
+        # Another worker may have migrated while we waited for the lock
+        version = current_version(connection)
+        applied = 0
+        for number, name, apply in MIGRATIONS:
+            if number <= version:
+                continue
+            apply(connection)
+            connection.execute(insert(SchemaVersion), {"version": number, "name": name})
+            print(f"Applied schema migration {number:03d} {name}")
+            applied += 1
+        return applied
+    finally:
+        _unlock_schema(connection)
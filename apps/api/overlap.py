@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from database import TimeOffRequest, TimeOffRequestDay
+from queries import REQUEST_COLUMNS
+
+# Rows inserted per executemany when (re)building the day index
+DAY_INSERT_BATCH = 1000
+
+def expand_days(start_date: date, end_date: date) -> List[date]:
+    """Every calendar day from start_date to end_date inclusive"""
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+def index_request_days(connection: Connection, requests: Iterable[Tuple[int, date, date, int]]):
+    """Write day-bucket rows for (request_id, start_date, end_date, manager_id) tuples"""
+    batch = []
+    for request_id, start_date, end_date, manager_id in requests:
+        for day in expand_days(start_date, end_date):
+            batch.append({"request_id": request_id, "day": day, "manager_id": manager_id})
+            if len(batch) >= DAY_INSERT_BATCH:
+                connection.execute(insert(TimeOffRequestDay), batch)
+                batch = []
+    if batch:
+        connection.execute(insert(TimeOffRequestDay), batch)
+
+def unindex_request_days(connection: Connection, request_ids: Iterable[int]):
+    """Remove day-bucket rows for the given requests"""
+    request_ids = list(request_ids)
+    if request_ids:
+        connection.execute(delete(TimeOffRequestDay).where(TimeOffRequestDay.request_id.in_(request_ids)))
+
+def rebuild_request_days(connection: Connection) -> int:
+    """Rebuild the whole day index from time_off_requests; returns requests indexed"""
+    connection.execute(delete(TimeOffRequestDay))
+    rows = connection.execute(
+        select(
+            TimeOffRequest.id,
+            TimeOffRequest.start_date,
+            TimeOffRequest.end_date,
+            TimeOffRequest.manager_id,
+        )
+    ).all()
+    index_request_days(connection, rows)
+    return len(rows)
+
+def overlapping_requests_query(
+    date_from: date,
+    date_to: date,
+    manager_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> Select:
+    """Requests with start_date <= date_to AND end_date >= date_from, via the day index"""
+    matching_days = select(TimeOffRequestDay.request_id).where(TimeOffRequestDay.day.between(date_from, date_to))
+    if manager_id is not None:
+        matching_days = matching_days.where(TimeOffRequestDay.manager_id == manager_id)
+
+    query = select(*REQUEST_COLUMNS).where(TimeOffRequest.id.in_(matching_days))
+    if status is not None:
+        query = query.where(TimeOffRequest.status == status)
+    return query.order_by(TimeOffRequest.start_date, TimeOffRequest.id)
+
+# Keep the day index in sync with ORM writes to TimeOffRequest
+@event.listens_for(TimeOffRequest, "after_insert")
+def _index_inserted_request(mapper, connection, target):
+    index_request_days(connection, [(target.id, target.start_date, target.end_date, target.manager_id)])
+
+@event.listens_for(TimeOffRequest, "after_update")
+def _reindex_updated_request(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ("start_date", "end_date", "manager_id")):
+        unindex_request_days(connection, [target.id])
+        index_request_days(connection, [(target.id, target.start_date, target.end_date, target.manager_id)])
+
+@event.listens_for(TimeOffRequest, "after_delete")
+def _unindex_deleted_request(mapper, connection, target):
+    unindex_request_days(connection, [target.id])
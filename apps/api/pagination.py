@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.sql import Select
+
+from database import TimeOffRequest
+from queries import REQUEST_COLUMNS
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Projectable fields for list endpoints, keyed by name
+REQUEST_FIELDS = {column.key: column for column in REQUEST_COLUMNS}
+
+# Keyset order: start_date then id, matching idx_time_off_manager_start
+KEYSET_FIELDS = ("start_date", "id")
+
+def encode_cursor(start_date: date, request_id: int) -> str:
+    """Opaque token for the position after (start_date, id)"""
+    raw = json.dumps([start_date.isoformat(), request_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[date, int]:
+    """Decode a cursor token; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        start_date, request_id = json.loads(raw)
+        return date.fromisoformat(start_date), int(request_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated fields= projection; defaults to every field"""
+    if not fields:
+        return list(REQUEST_FIELDS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in REQUEST_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+def manager_page_query(
+    manager_id: int,
+    fields: List[str],
+    limit: int,
+    cursor: Optional[Tuple[date, int]] = None,
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Select:
+    """One keyset page (plus one lookahead row) of a manager's requests"""
+    # The keyset columns are always selected so the next cursor can be built
+    selected = list(dict.fromkeys(list(fields) + list(KEYSET_FIELDS)))
+    query = select(*(REQUEST_FIELDS[name] for name in selected)).where(TimeOffRequest.manager_id == manager_id)
+
+    if cursor is not None:
+        query = query.where(tuple_(TimeOffRequest.start_date, TimeOffRequest.id) > tuple_(*cursor))
+    if status is not None:
+        query = query.where(TimeOffRequest.status == status)
+    if date_to is not None:
+        query = query.where(TimeOffRequest.start_date <= date_to)
+    if date_from is not None:
+        query = query.where(TimeOffRequest.end_date >= date_from)
+
+    return query.order_by(TimeOffRequest.start_date, TimeOffRequest.id).limit(limit + 1)
+
+def build_page(rows, fields: List[str], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Trim the lookahead row, project the requested fields and build the next cursor"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    data = [{name: row._mapping[name] for name in fields} for row in rows]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(last["start_date"], last["id"])
+    return data, next_cursor
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import bcrypt
+
+# bcrypt cost for new hashes; stored hashes at another cost are re-hashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Threads running bcrypt; it releases the GIL, so each thread can use a core
+LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", "2"))
+
+# Hash jobs allowed to wait for a thread; further logins are turned away at once
+LOGIN_HASH_QUEUE = int(os.getenv("LOGIN_HASH_QUEUE", "32"))
+
+# A queued job that has not started within this many seconds is dropped unrun
+LOGIN_QUEUE_TIMEOUT = float(os.getenv("LOGIN_QUEUE_TIMEOUT", "5"))
+
+class HasherBusy(Exception):
+    """The hashing pool is saturated; retry after `retry_after` seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def hash_rounds(password_hash: str) -> Optional[int]:
+    """Cost factor of a $2a$/$2b$/$2y$ hash, or None if it is not bcrypt"""
+    parts = password_hash.split("$")
+    if len(parts) != 4 or parts[1] not in ("2a", "2b", "2y") or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+_TIMED_OUT = object()
+
+class PasswordHasher:
+    """bcrypt on a dedicated bounded thread pool, keeping ~250ms hashes off the event loop"""
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = LOGIN_HASH_WORKERS,
+                 max_queue: int = LOGIN_HASH_QUEUE, queue_timeout: float = LOGIN_QUEUE_TIMEOUT):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        # Created on first use so importing the app starts no threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dummy_hash: Optional[bytes] = None
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusy("Too many logins in progress, try again shortly", self.queue_timeout)
+            self._in_flight += 1
+        enqueued_at = time.monotonic()
+
+        def job():
+            # Skip work whose caller has most likely given up already
+            if time.monotonic() - enqueued_at > self.queue_timeout:
+                return _TIMED_OUT
+            return fn(*args)
+
+        future = self._get_executor().submit(job)
+        # Released when the job finishes, even if the awaiting request is cancelled
+        future.add_done_callback(self._release)
+        result = await asyncio.wrap_future(future)
+        if result is _TIMED_OUT:
+            with self._lock:
+                self.timed_out += 1
+            raise HasherBusy("Timed out waiting to check the password", self.queue_timeout)
+        return result
+
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(self.rounds)).decode("ascii")
+
+    def _check(self, password: str, password_hash: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("ascii"))
+        except ValueError:
+            # Malformed or non-bcrypt hash
+            return False
+
+    def _check_dummy(self, password: str) -> bool:
+        if self._dummy_hash is None:
+            self._dummy_hash = bcrypt.hashpw(b"dummy", bcrypt.gensalt(self.rounds))
+        bcrypt.checkpw(password.encode("utf-8"), self._dummy_hash)
+        return False
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self._check, password, password_hash)
+
+    async def verify_dummy(self, password: str) -> bool:
+        """Spend a real check's time for an unknown account, so timing does not reveal which emails exist"""
+        return await self._run(self._check_dummy, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return hash_rounds(password_hash) != self.rounds
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher()
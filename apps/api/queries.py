@@ -0,0 +1,31 @@
+from typing import List, Sequence
+
+from database import TimeOffRequest
+
+# Columns returned by the time-off request read endpoints
+REQUEST_COLUMNS = (
+    TimeOffRequest.id,
+    TimeOffRequest.employee_name,
+    TimeOffRequest.employee_id,
+    TimeOffRequest.start_date,
+    TimeOffRequest.end_date,
+    TimeOffRequest.reason,
+    TimeOffRequest.manager_id,
+    TimeOffRequest.status,
+    TimeOffRequest.created_at,
+    TimeOffRequest.updated_at,
+)
+
+REQUEST_FIELD_NAMES = [column.key for column in REQUEST_COLUMNS]
+
+def row_dicts(rows: Sequence) -> List[dict]:
+    """Plain dicts from selected rows, zipping each tuple with the column names once"""
+    if not rows:
+        return []
+    # Plain str: names selected from a subquery are str subclasses orjson rejects as keys
+    keys = [str(key) for key in rows[0]._fields]
+    return [dict(zip(keys, row)) for row in rows]
+
+def request_to_dict(request: TimeOffRequest) -> dict:
+    """Serialize an ORM request with the same fields as the read endpoints"""
+    return {column.key: getattr(request, column.key) for column in REQUEST_COLUMNS}
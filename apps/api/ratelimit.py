@@ -0,0 +1,47 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+class RateLimiter:
+    """Thread-safe token bucket per key: `limit` attempts per `window` seconds, refilled continuously"""
+
+    def __init__(self, limit: int, window: float, max_keys: int = 10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (tokens left, last refill time), least recently hit first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def hit(self, key: str) -> float:
+        """Spend one attempt for `key`; returns 0 if allowed, else seconds until the next one is"""
+        if self.limit <= 0:
+            return 0.0
+        rate = self.limit / self.window
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.limit), now))
+            tokens = min(float(self.limit), tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            # The least recently hit keys have refilled the most; forget them first
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def reset(self, key: str):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"keys": len(self._buckets), "allowed": self.allowed, "limited": self.limited}
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+from typing import Any, Dict, Generic, List, Literal, Optional, TypeVar
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Response models mirroring packages/shared-types/index.ts. They document the
+# API (OpenAPI) and pin the wire format in tests; the hot list endpoints do not
+# instantiate them per row but encode row tuples straight to JSON
+# (queries.row_dicts and json_response).
+
+T = TypeVar("T")
+
+RequestStatus = Literal["pending", "approved", "denied"]
+
+class TimeOffRequest(BaseModel):
+    id: Optional[int] = None
+    employee_name: str
+    employee_id: Optional[int] = None
+    start_date: date
+    end_date: date
+    reason: Optional[str] = None
+    manager_id: int
+    status: Optional[RequestStatus] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class Manager(BaseModel):
+    id: int
+    name: str
+    email: str
+
+class ManagerSession(Manager):
+    authenticated: bool
+
+class ApiResponse(BaseModel, Generic[T]):
+    success: bool
+    data: Optional[T] = None
+    error: Optional[str] = None
+    message: Optional[str] = None
+
+class RequestPage(ApiResponse[List[TimeOffRequest]]):
+    """GET /manager/requests; with ?fields= each item carries only those fields"""
+    next_cursor: Optional[str] = None
+
+class SearchPage(ApiResponse[List[TimeOffRequest]]):
+    """GET /manager/requests/search, best match first"""
+    next_offset: Optional[int] = None
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Encode with orjson directly, skipping FastAPI's recursive jsonable_encoder pass
+
+    orjson writes dates and datetimes as ISO 8601 and numpy scalars as numbers,
+    matching what the encoder produced.
+    """
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
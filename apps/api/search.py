@@ -0,0 +1,165 @@
+from typing import List, Optional
+
+from sqlalchemy import and_, case, column, event, func, literal_column, or_, select, table
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from database import TimeOffRequest
+from queries import REQUEST_COLUMNS
+
+# Full-text search over employee_name and reason. SQLite keeps an external-content
+# FTS5 table in sync with triggers; MySQL uses a FULLTEXT index. Both are
+# maintained by the database itself, so ORM and Core writers need no extra
+# bookkeeping. Other dialects fall back to unindexed LIKE scans.
+#
+# Every query is for one manager's requests, so the FTS5 rows also carry the
+# manager as a token (manager_key "m<id>"): the match then only walks that
+# manager's postings instead of every manager's. Prefix indexes make "smi" (for
+# "Smith") as cheap as a whole word. Results are ordered name matches first,
+# then newest first: bm25 would count each word's matches across the whole table
+# on every query, which costs more than the rest of the search combined and
+# hardly reorders results that must all contain every word anyway.
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Deep pages re-rank every match; past this, narrow the query instead
+MAX_SEARCH_OFFSET = 1000
+
+# Shorter words are dropped from the query; 2 is the smallest prefix index
+MIN_TERM_LENGTH = 2
+# Longest prefix index; longer words are matched whole (a longer prefix would
+# merge the postings of every indexed word it starts)
+MAX_PREFIX_LENGTH = 10
+MAX_SEARCH_TERMS = 8
+
+SEARCH_TABLE = "time_off_requests_fts"
+SEARCH_VIEW = "time_off_requests_search"
+FULLTEXT_INDEX = "ft_time_off_search"
+
+_PREFIX_INDEXES = " ".join(str(length) for length in range(MIN_TERM_LENGTH, MAX_PREFIX_LENGTH + 1))
+
+_SQLITE_SEARCH_DDL = (
+    # Content source for 'rebuild': the indexed columns plus the manager token
+    f"""CREATE VIEW IF NOT EXISTS {SEARCH_VIEW} AS
+    SELECT id, employee_name, reason, 'm' || manager_id AS manager_key FROM time_off_requests""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        employee_name, reason, manager_key,
+        content='{SEARCH_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='{_PREFIX_INDEXES}'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON time_off_requests BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, employee_name, reason, manager_key)
+        VALUES (new.id, new.employee_name, new.reason, 'm' || new.manager_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON time_off_requests BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, employee_name, reason, manager_key)
+        VALUES ('delete', old.id, old.employee_name, old.reason, 'm' || old.manager_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE OF employee_name, reason, manager_id
+    ON time_off_requests BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, employee_name, reason, manager_key)
+        VALUES ('delete', old.id, old.employee_name, old.reason, 'm' || old.manager_id);
+        INSERT INTO {SEARCH_TABLE} (rowid, employee_name, reason, manager_key)
+        VALUES (new.id, new.employee_name, new.reason, 'm' || new.manager_id);
+    END""",
+)
+
+def _has_fulltext_index(connection: Connection) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() "
+        f"AND TABLE_NAME = 'time_off_requests' AND INDEX_NAME = '{FULLTEXT_INDEX}' LIMIT 1").first() is not None
+
+def create_search_index(connection: Connection, rebuild: bool = True):
+    """Create the search index if missing; `rebuild` re-indexes existing requests (SQLite)"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for statement in _SQLITE_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        if rebuild:
+            connection.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+    elif dialect == "mysql":
+        if not _has_fulltext_index(connection):
+            connection.exec_driver_sql(
+                f"ALTER TABLE time_off_requests ADD FULLTEXT INDEX {FULLTEXT_INDEX} (employee_name, reason)")
+
+def drop_search_index(connection: Connection):
+    """Drop the SQLite search table and view (the triggers go with time_off_requests)"""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+        connection.exec_driver_sql(f"DROP VIEW IF EXISTS {SEARCH_VIEW}")
+
+@event.listens_for(TimeOffRequest.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    # Fresh table: nothing to re-index yet
+    create_search_index(connection, rebuild=False)
+
+@event.listens_for(TimeOffRequest.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
+
+def search_terms(q: str) -> List[str]:
+    """Words of a search box query that the index can match; raises ValueError if none"""
+    terms = [term for term in q.split() if len(term) >= MIN_TERM_LENGTH][:MAX_SEARCH_TERMS]
+    if not terms:
+        raise ValueError(f"q needs a word of at least {MIN_TERM_LENGTH} characters")
+    return terms
+
+def _fts5_match(manager_id: int, terms: List[str], columns: str = "employee_name reason") -> str:
+    # Each word a quoted phrase, so FTS5 syntax in user input is inert; every
+    # word must appear in one of the columns
+    words = " ".join(
+        '"' + term.replace('"', '""') + '"' + ("*" if len(term) <= MAX_PREFIX_LENGTH else "") for term in terms
+    )
+    return f'{{{columns}}} : ({words}) AND manager_key : "m{int(manager_id)}"'
+
+def _boolean_match(terms: List[str]) -> str:
+    # +word* per word: required, prefix-matched; boolean operators in user input are dropped
+    words = ["".join(ch for ch in term if ch.isalnum() or ch in "_'") for term in terms]
+    return " ".join(f"+{word}*" for word in words if word)
+
+def _like_all(columns, terms: List[str]):
+    # Every word a case-insensitive substring of one of the columns; LIKE wildcards in input are literal
+    patterns = [
+        "%" + term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for term in terms
+    ]
+    return and_(*(or_(*(func.lower(col).like(pattern, escape="\\") for col in columns)) for pattern in patterns))
+
+def search_requests_query(
+    dialect: str,
+    manager_id: int,
+    terms: List[str],
+    limit: int,
+    offset: int = 0,
+    status: Optional[str] = None,
+) -> Select:
+    """One page (plus one lookahead row) of the manager's requests matching every term, best match first"""
+    if dialect == "sqlite":
+        fts = table(SEARCH_TABLE, column("rowid"))
+        matches = literal_column(SEARCH_TABLE).op("MATCH")
+        # Built once per query; correlate(None) keeps its own FROM time_off_requests_fts
+        name_hits = select(fts.c.rowid).where(matches(_fts5_match(manager_id, terms, "employee_name"))).correlate(None)
+        query = (
+            select(*REQUEST_COLUMNS)
+            .select_from(fts.join(TimeOffRequest.__table__, TimeOffRequest.id == fts.c.rowid))
+            .where(matches(_fts5_match(manager_id, terms)))
+            .order_by(TimeOffRequest.id.not_in(name_hits), TimeOffRequest.start_date.desc(), TimeOffRequest.id.desc())
+        )
+    elif dialect == "mysql":
+        relevance = mysql.match(TimeOffRequest.employee_name, TimeOffRequest.reason,
+                                against=_boolean_match(terms)).in_boolean_mode()
+        query = select(*REQUEST_COLUMNS).where(relevance).order_by(
+            relevance.desc(), TimeOffRequest.start_date.desc(), TimeOffRequest.id.desc())
+    else:
+        name_hit = _like_all([TimeOffRequest.employee_name], terms)
+        query = (
+            select(*REQUEST_COLUMNS)
+            .where(_like_all([TimeOffRequest.employee_name, TimeOffRequest.reason], terms))
+            .order_by(case((name_hit, 0), else_=1), TimeOffRequest.start_date.desc(), TimeOffRequest.id.desc())
+        )
+
+    # Also on SQLite: the manager token narrows the match, the column is the authority
+    query = query.where(TimeOffRequest.manager_id == manager_id)
+    if status is not None:
+        query = query.where(TimeOffRequest.status == status)
+    return query.limit(limit + 1).offset(offset)
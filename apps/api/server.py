@@ -0,0 +1,70 @@
+"""
+Production entry point: runs the API under uvicorn with several worker processes
+
+    python server.py
+
+Configured from the environment (see DOCKER.md); `python main.py` remains the
+single-process development server.
+"""
+
+import importlib.util
+import os
+
+import uvicorn
+
+def worker_count() -> int:
+    """Workers to run: API_WORKERS, defaulting to the CPUs available to this process"""
+    configured = os.getenv("API_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    if hasattr(os, "sched_getaffinity"):
+        # Respects CPU pinning (e.g. docker --cpuset-cpus)
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+def running_workers() -> int:
+    """Workers serving this deployment: set by main() for its workers, 1 under `python main.py`"""
+    return int(os.getenv("API_RUNNING_WORKERS", "1"))
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def server_config(workers: int) -> dict:
+    """uvicorn settings, preferring uvloop/httptools when they are installed"""
+    return {
+        "host": os.getenv("API_HOST", "0.0.0.0"),
+        "port": int(os.getenv("API_LISTEN_PORT", "8000")),
+        "workers": workers,
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        # On SIGTERM stop accepting, then give in-flight requests this long to finish
+        "timeout_graceful_shutdown": int(os.getenv("API_GRACEFUL_TIMEOUT", "30")),
+        "timeout_keep_alive": int(os.getenv("API_KEEP_ALIVE", "5")),
+        "proxy_headers": True,
+        "log_level": os.getenv("API_LOG_LEVEL", "info"),
+    }
+
+def prepare_database():
+    """Migrate once in the supervisor so workers boot on the fast path"""
+    from database import get_engine, init_db
+    applied = init_db()
+    if applied:
+        print(f"Applied {applied} schema migrations")
+    # Workers open their own connections; keep none from the supervisor
+    get_engine().dispose()
+
+def main():
+    workers = worker_count()
+    # Inherited by the workers, which report it on /health
+    os.environ["API_RUNNING_WORKERS"] = str(workers)
+    prepare_database()
+
+    config = server_config(workers)
+    print(f"Starting {workers} worker(s) on {config['host']}:{config['port']} "
+          f"(loop={config['loop']}, http={config['http']})")
+    # uvicorn spawns (not forks) its workers, so each imports the app afresh;
+    # database.py also resets pools after fork for servers that do fork
+    uvicorn.run("main:app", **config)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from server import running_workers
+
+# Idle sessions expire after this many seconds; each use pushes expiry out again
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(8 * 60 * 60)))
+
+# Expired sessions are deleted in bulk this often, off the request path
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+
+def _token_key(token: str) -> str:
+    """Sessions are keyed by a digest so a leaked store holds no usable cookies"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class SessionStore:
+    """Storage interface for login sessions: opaque token -> ManagerSession dict"""
+
+    def create(self, manager: dict) -> str:
+        """Start a session for an authenticated manager; returns the cookie token"""
+        raise NotImplementedError
+
+    def get(self, token: str) -> Optional[dict]:
+        """The session's manager, extending its expiry, or None if unknown or expired"""
+        raise NotImplementedError
+
+    def delete(self, token: str):
+        raise NotImplementedError
+
+    def revoke_manager(self, manager_id: int) -> int:
+        """End every session of a manager (e.g. after a password change); returns sessions removed"""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Delete expired sessions; returns sessions removed"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+class MemorySessionStore(SessionStore):
+    """Thread-safe in-process sessions with sliding expiry (one worker, or sticky routing)"""
+
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._sessions: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def create(self, manager):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sessions[_token_key(token)] = (time.monotonic() + self.ttl, dict(manager))
+        return token
+
+    def get(self, token):
+        key = _token_key(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, manager = entry
+            if expires_at <= now:
+                del self._sessions[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._sessions[key] = (now + self.ttl, manager)
+            self.hits += 1
+            return manager
+
+    def delete(self, token):
+        with self._lock:
+            self._sessions.pop(_token_key(token), None)
+
+    def revoke_manager(self, manager_id):
+        with self._lock:
+            keys = [key for key, (_, manager) in self._sessions.items() if manager["id"] == manager_id]
+            for key in keys:
+                del self._sessions[key]
+            return len(keys)
+
+    def sweep(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._sessions.items() if expires_at <= now]
+            for key in expired:
+                del self._sessions[key]
+            self.expirations += len(expired)
+            return len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._sessions), "hits": self.hits, "misses": self.misses,
+                    "expirations": self.expirations}
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file shared by every worker on the host
+
+    A lookup is one primary-key read on this file, not a query on the application
+    database. Sliding expiry is written at most every `refresh_interval` seconds
+    per session so busy dashboards do not serialize on SQLite's write lock.
+    """
+
+    def __init__(self, path: str, ttl: float = SESSION_TTL_SECONDS, refresh_interval: float = 60.0):
+        self.path = path
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "token_hash TEXT PRIMARY KEY, manager_id INTEGER NOT NULL, name TEXT NOT NULL, "
+            "email TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_manager_id ON sessions (manager_id)")
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def create(self, manager):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            # Wall-clock expiry: it must mean the same thing in every worker process
+            self._conn.execute(
+                "INSERT INTO sessions (token_hash, manager_id, name, email, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (_token_key(token), manager["id"], manager["name"], manager["email"], time.time() + self.ttl))
+        return token
+
+    def get(self, token):
+        key = _token_key(token)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT manager_id, name, email, expires_at FROM sessions WHERE token_hash = ?", (key,)).fetchone()
+            if row is None or row[3] <= now:
+                self.misses += 1
+                return None
+            if row[3] - now < self.ttl - self.refresh_interval:
+                self._conn.execute("UPDATE sessions SET expires_at = ? WHERE token_hash = ?", (now + self.ttl, key))
+            self.hits += 1
+        return {"id": row[0], "name": row[1], "email": row[2], "authenticated": True}
+
+    def delete(self, token):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE token_hash = ?", (_token_key(token),))
+
+    def revoke_manager(self, manager_id):
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE manager_id = ?", (manager_id,)).rowcount
+
+    def sweep(self):
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+            self.expirations += removed
+            return removed
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "expirations": self.expirations}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class SessionSweeper:
+    """Deletes expired sessions in the background on a fixed interval"""
+
+    def __init__(self, store: SessionStore, interval: float = SESSION_SWEEP_INTERVAL):
+        self.store = store
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # The SQLite store's DELETE must not hold up the event loop
+                await asyncio.to_thread(self.store.sweep)
+            except Exception as e:
+                print(f"Session sweep failed: {e}")
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+def create_session_store(backend: Optional[str] = None, workers: Optional[int] = None) -> SessionStore:
+    """Store selected by SESSION_BACKEND (memory | sqlite)
+
+    Unset, it is sqlite when server.py runs several workers and memory
+    otherwise; memory with several workers is refused, since each worker would
+    reject the logins made on the others.
+    """
+    if workers is None:
+        workers = running_workers()
+    if backend is None:
+        backend = os.getenv("SESSION_BACKEND") or ("sqlite" if workers > 1 else "memory")
+    backend = backend.lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", "sessions.db"))
+    if workers > 1:
+        raise RuntimeError(f"SESSION_BACKEND={backend} cannot share logins between {workers} workers; use sqlite")
+    return MemorySessionStore()
+
+session_store = create_session_store()
@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, delete, event, insert, inspect, select, union_all, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Connection
+
+from database import StaffingCoverage, TimeOffRequest, TimeOffRequestArchive
+from overlap import expand_days
+
+# Longest range GET /manager/coverage will return
+MAX_COVERAGE_DAYS = 1096
+
+# Statuses that count toward coverage, mapped to their counter column
+COUNTED_STATUSES = {"approved": "approved_count", "pending": "pending_count"}
+
+Deltas = Dict[Tuple[int, date], List[int]]
+
+def add_request_deltas(
+    deltas: Deltas,
+    manager_id: int,
+    start_date: date,
+    end_date: date,
+    status: Optional[str],
+    sign: int,
+):
+    """Accumulate +1/-1 per covered day for one request's approved/pending contribution"""
+    if status not in COUNTED_STATUSES:
+        return
+    slot = 0 if status == "approved" else 1
+    for day in expand_days(start_date, end_date):
+        deltas[(manager_id, day)][slot] += sign
+
+def apply_deltas(connection: Connection, deltas: Deltas):
+    """Upsert accumulated deltas into staffing_coverage in one executemany"""
+    rows = [
+        {"manager_id": manager_id, "day": day, "approved_count": approved, "pending_count": pending}
+        for (manager_id, day), (approved, pending) in deltas.items()
+        if approved or pending
+    ]
+    if not rows:
+        return
+
+    table = StaffingCoverage.__table__
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.manager_id, table.c.day],
+            set_={
+                "approved_count": table.c.approved_count + stmt.excluded.approved_count,
+                "pending_count": table.c.pending_count + stmt.excluded.pending_count,
+            },
+        )
+    elif dialect == "mysql":
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            approved_count=table.c.approved_count + stmt.inserted.approved_count,
+            pending_count=table.c.pending_count + stmt.inserted.pending_count,
+        )
+    else:
+        _add_counts(connection, rows)
+        return
+    connection.execute(stmt, rows)
+
+def _add_counts(connection: Connection, rows: List[dict]):
+    """Portable upsert for other dialects: UPDATE each (manager, day), INSERT those that had no row"""
+    table = StaffingCoverage.__table__
+    stmt = (
+        update(table)
+        .where(and_(table.c.manager_id == bindparam("b_manager_id"), table.c.day == bindparam("b_day")))
+        .values(
+            approved_count=table.c.approved_count + bindparam("b_approved"),
+            pending_count=table.c.pending_count + bindparam("b_pending"),
+        )
+    )
+    missing = [
+        row for row in rows
+        if connection.execute(stmt, {"b_manager_id": row["manager_id"], "b_day": row["day"],
+                                     "b_approved": row["approved_count"], "b_pending": row["pending_count"]}).rowcount == 0
+    ]
+    if missing:
+        connection.execute(insert(table), missing)
+
+def add_requests_coverage(connection: Connection, requests: Iterable[Tuple[int, date, date, str]]):
+    """Count newly written (manager_id, start_date, end_date, status) requests"""
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    for manager_id, start_date, end_date, status in requests:
+        add_request_deltas(deltas, manager_id, start_date, end_date, status, +1)
+    apply_deltas(connection, deltas)
+
+def rebuild_coverage(connection: Connection) -> int:
+    """Recompute staffing_coverage from time_off_requests and its archive; returns rows written"""
+    connection.execute(delete(StaffingCoverage))
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    # Archived requests keep counting, so archiving never changes the calendar
+    requests = connection.execute(union_all(*(
+        select(table.c.manager_id, table.c.start_date, table.c.end_date, table.c.status)
+        .where(table.c.status.in_(COUNTED_STATUSES))
+        for table in (TimeOffRequest.__table__, TimeOffRequestArchive.__table__)
+    )))
+    for manager_id, start_date, end_date, status in requests:
+        add_request_deltas(deltas, manager_id, start_date, end_date, status, +1)
+    apply_deltas(connection, deltas)
+    return len(deltas)
+
+def coverage_query(manager_id: int, date_from: date, date_to: date):
+    return (
+        select(StaffingCoverage.day, StaffingCoverage.approved_count, StaffingCoverage.pending_count)
+        .where(StaffingCoverage.manager_id == manager_id, StaffingCoverage.day.between(date_from, date_to))
+    )
+
+def dense_coverage(rows, date_from: date, date_to: date) -> dict:
+    """Spread sparse (day, approved, pending) rows into per-day arrays indexed from date_from"""
+    length = (date_to - date_from).days + 1
+    approved = [0] * length
+    pending = [0] * length
+    for day, approved_count, pending_count in rows:
+        offset = (day - date_from).days
+        approved[offset] = approved_count
+        pending[offset] = pending_count
+    return {
+        "from": date_from,
+        "to": date_to,
+        "days": length,
+        "approved": approved,
+        "pending": pending,
+    }
+
+def _old_value(state, name):
+    history = state.attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(state.object, name)
+
+# Keep staffing_coverage in step with ORM writes to TimeOffRequest
+COVERAGE_FIELDS = ("manager_id", "start_date", "end_date", "status")
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """active_history loads the replaced value so its coverage can be subtracted"""
+
+for _field in COVERAGE_FIELDS:
+    event.listen(getattr(TimeOffRequest, _field), "set", _load_previous_value, active_history=True)
+
+@event.listens_for(TimeOffRequest, "after_insert")
+def _count_inserted_request(mapper, connection, target):
+    add_requests_coverage(connection, [(target.manager_id, target.start_date, target.end_date, target.status)])
+
+@event.listens_for(TimeOffRequest, "after_update")
+def _recount_updated_request(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in COVERAGE_FIELDS):
+        return
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    add_request_deltas(deltas, *(_old_value(state, name) for name in COVERAGE_FIELDS), -1)
+    add_request_deltas(deltas, target.manager_id, target.start_date, target.end_date, target.status, +1)
+    apply_deltas(connection, deltas)
+
+@event.listens_for(TimeOffRequest, "after_delete")
+def _uncount_deleted_request(mapper, connection, target):
+    state = inspect(target)
+    deltas: Deltas = defaultdict(lambda: [0, 0])
+    add_request_deltas(deltas, *(_old_value(state, name) for name in COVERAGE_FIELDS), -1)
+    apply_deltas(connection, deltas)
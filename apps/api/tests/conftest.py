@@ -0,0 +1,79 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from database import Base, Manager, create_db_engine, get_async_db, _set_sqlite_pragmas
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a throwaway SQLite database with the ORM schema and two managers"""
+    path = tmp_path / "api_test.db"
+    sync_engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    with sessionmaker(bind=sync_engine)() as session:
+        session.add_all([
+            Manager(id=1, name="John Manager", email="john.manager@company.com", password_hash="x"),
+            Manager(id=2, name="Sarah Supervisor", email="sarah.supervisor@company.com", password_hash="x"),
+        ])
+        session.commit()
+    sync_engine.dispose()
+    return path
+
+@pytest.fixture
+def sync_session(db_path):
+    """Sync ORM session on the test database, for seeding and assertions"""
+    sync_engine = create_db_engine(f"sqlite:///{db_path}")
+    session = sessionmaker(bind=sync_engine)()
+    yield session
+    session.close()
+    sync_engine.dispose()
+
+@pytest.fixture
+def async_sessions(db_path):
+    """Async session factory on the test database, wired into get_async_db"""
+    from main import app
+
+    # NullPool: TestClient may drive each request on a fresh event loop
+    test_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    event.listen(test_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    sessions = sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield sessions
+    app.dependency_overrides.pop(get_async_db, None)
+    asyncio.run(test_engine.dispose())
+
+@pytest.fixture(autouse=True)
+def clear_manager_cache():
+    """Start every test with an empty dashboard cache"""
+    from cache import manager_cache
+    manager_cache.backend.clear()
+    yield
+    manager_cache.backend.clear()
+
+@pytest.fixture
+def manager_from_query():
+    """Identify the manager from ?manager_id= so /manager route tests need no login"""
+    from fastapi import Query
+    from auth import get_current_manager_id
+    from main import app
+
+    async def override_get_current_manager_id(manager_id: int = Query(...)) -> int:
+        return manager_id
+
+    app.dependency_overrides[get_current_manager_id] = override_get_current_manager_id
+    yield
+    app.dependency_overrides.pop(get_current_manager_id, None)
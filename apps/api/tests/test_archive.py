@@ -0,0 +1,257 @@
+import pytest
+import asyncio
+import json
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, select
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from archive import archive_batch, archive_cutoff, archive_requests, needs_archive, read_with_archive
+from database import (ManagerRequestVersion, StaffingCoverage, TimeOffRequest, TimeOffRequestArchive,
+                      TimeOffRequestDay, create_db_engine)
+from migrations import migrate
+from overlap import overlapping_requests_query
+from staffing import rebuild_coverage
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+CUTOFF = date(2024, 1, 1)
+
+def add_request(session, start_date, end_date, status="approved", employee_name="Alice Smith", manager_id=1):
+    request = TimeOffRequest(employee_name=employee_name, start_date=start_date, end_date=end_date,
+                             reason="Vacation", manager_id=manager_id, status=status)
+    session.add(request)
+    session.commit()
+    return request.id
+
+def archive(db_path, cutoff=CUTOFF, **kwargs):
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    try:
+        with engine.connect() as conn:
+            return archive_requests(conn, cutoff, **kwargs)
+    finally:
+        engine.dispose()
+
+def coverage(session):
+    """Non-empty coverage rows of manager 1 as {day: (approved, pending)}"""
+    session.expire_all()
+    rows = session.execute(
+        select(StaffingCoverage.day, StaffingCoverage.approved_count, StaffingCoverage.pending_count)
+        .where(StaffingCoverage.manager_id == 1)
+    ).all()
+    return {day: (approved, pending) for day, approved, pending in rows if approved or pending}
+
+def ids(session, model):
+    session.expire_all()
+    return sorted(session.execute(select(model.id)).scalars())
+
+@pytest.fixture
+def history(async_sessions, sync_session, db_path):
+    """Alice's 2022 request archived next to a 2022 denial, a 2022 pending request and a 2025 request"""
+    archived = add_request(sync_session, date(2022, 3, 7), date(2022, 3, 9))
+    hot = add_request(sync_session, date(2025, 3, 3), date(2025, 3, 4))
+    denied = add_request(sync_session, date(2022, 5, 2), date(2022, 5, 2), status="denied", employee_name="Bob Johnson")
+    pending = add_request(sync_session, date(2022, 6, 1), date(2022, 6, 1), status="pending")
+    archive(db_path)
+    employee_id = sync_session.get(TimeOffRequest, hot).employee_id
+    return {"archived": archived, "denied": denied, "hot": hot, "pending": pending, "employee_id": employee_id}
+
+class TestArchiveBatches:
+    """Test suite for moving requests into time_off_requests_archive"""
+
+    def test_moves_only_old_closed_requests(self, sync_session, db_path):
+        """Test approved and denied requests that ended before the cutoff move; the rest stay"""
+        # Arrange
+        approved = add_request(sync_session, date(2022, 3, 7), date(2022, 3, 9))
+        denied = add_request(sync_session, date(2023, 5, 2), date(2023, 5, 2), status="denied")
+        pending = add_request(sync_session, date(2022, 6, 1), date(2022, 6, 1), status="pending")
+        straddling = add_request(sync_session, date(2023, 12, 29), date(2024, 1, 2))
+        recent = add_request(sync_session, date(2025, 3, 3), date(2025, 3, 4))
+
+        # Act
+        moved = archive(db_path)
+
+        # Assert
+        assert moved == 2
+        assert ids(sync_session, TimeOffRequestArchive) == [approved, denied]
+        assert ids(sync_session, TimeOffRequest) == [pending, straddling, recent]
+        row = sync_session.get(TimeOffRequestArchive, approved)
+        assert (row.employee_name, row.start_date, row.status) == ("Alice Smith", date(2022, 3, 7), "approved")
+        assert row.created_at is not None and row.archived_at is not None
+
+    def test_bounded_batches(self, sync_session, db_path):
+        """Test batch_size and max_batches bound each run, and a later run finishes the job"""
+        # Arrange
+        for day in range(1, 6):
+            add_request(sync_session, date(2022, 3, day), date(2022, 3, day))
+
+        # Act / Assert
+        assert archive(db_path, batch_size=2, max_batches=2) == 4
+        assert archive(db_path, batch_size=2) == 1
+        assert archive(db_path, batch_size=2) == 0
+        assert len(ids(sync_session, TimeOffRequestArchive)) == 5
+
+    def test_derived_tables(self, async_sessions, sync_session, db_path):
+        """Test archiving drops the day index and search rows, bumps the version, keeps coverage"""
+        # Arrange
+        request_id = add_request(sync_session, date(2022, 3, 7), date(2022, 3, 9))
+        before = coverage(sync_session)
+        version = sync_session.get(ManagerRequestVersion, 1).version
+
+        # Act
+        archive(db_path)
+
+        # Assert
+        sync_session.expire_all()
+        assert sync_session.execute(select(TimeOffRequestDay).where(TimeOffRequestDay.request_id == request_id)).all() == []
+        assert sync_session.get(ManagerRequestVersion, 1).version == version + 1
+        assert coverage(sync_session) == before
+        search = client.get("/manager/requests/search", params={"q": "alice", "manager_id": 1}).json()
+        assert search["data"] == []
+
+    def test_rebuild_coverage_counts_archive(self, sync_session, db_path):
+        """Test rebuilding staffing_coverage still counts archived requests"""
+        # Arrange
+        add_request(sync_session, date(2022, 3, 7), date(2022, 3, 9))
+        archive(db_path)
+        before = coverage(sync_session)
+        engine = create_db_engine(f"sqlite:///{db_path}")
+
+        # Act
+        with engine.begin() as conn:
+            rebuild_coverage(conn)
+        engine.dispose()
+
+        # Assert
+        sync_session.expire_all()
+        assert coverage(sync_session) == before == {date(2022, 3, day): (1, 0) for day in (7, 8, 9)}
+
+    def test_cutoff(self):
+        """Test the cutoff is today minus the archive age"""
+        assert archive_cutoff(date(2026, 1, 31), age_days=30) == date(2026, 1, 1)
+
+class TestArchiveReads:
+    """Test suite for reads that reach back into the archive"""
+
+    def test_unbounded_reads_stay_hot(self, history):
+        """Test the dashboard list without a range returns only hot requests"""
+        data = client.get("/manager/requests", params={"manager_id": 1}).json()["data"]
+        assert [row["id"] for row in data] == [history["pending"], history["hot"]]
+
+    def test_manager_list_pages_across_archive(self, history):
+        """Test a ranged list merges archived and hot requests in keyset order, page by page"""
+        # Act
+        seen, cursor = [], None
+        while True:
+            params = {"manager_id": 1, "from": "2022-01-01", "limit": 1, **({"cursor": cursor} if cursor else {})}
+            body = client.get("/manager/requests", params=params).json()
+            seen += [row["id"] for row in body["data"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        # Assert
+        assert seen == [history["archived"], history["denied"], history["pending"], history["hot"]]
+
+    def test_overlapping_and_export(self, history):
+        """Test overlap queries and ranged exports over archived dates find archived requests"""
+        # Act
+        overlapping = client.get("/requests/overlapping", params={"from": "2022-03-08", "to": "2022-06-01",
+                                                                            "manager_id": 1}).json()
+        export = client.get("/manager/requests/export", params={"manager_id": 1, "format": "ndjson",
+                                                                "from": "2022-01-01", "to": "2022-12-31"})
+
+        # Assert
+        assert [row["id"] for row in overlapping["data"]] == [history["archived"], history["denied"],
+                                                              history["pending"]]
+        exported = [json.loads(line)["id"] for line in export.text.splitlines()]
+        assert exported == [history["archived"], history["denied"], history["pending"]]
+
+    def test_employee_history(self, history):
+        """Test an employee's history with an old 'from' lists archived requests, newest first"""
+        # Act
+        url = f"/employees/{history['employee_id']}/requests"
+        ranged = client.get(url, params={"manager_id": 1, "from": "2022-01-01"}).json()["data"]
+        unbounded = client.get(url, params={"manager_id": 1}).json()["data"]
+
+        # Assert
+        assert [row["id"] for row in ranged] == [history["hot"], history["pending"], history["archived"]]
+        assert [row["id"] for row in unbounded] == [history["hot"], history["pending"]]
+
+    def test_past_year_balances(self, history):
+        """Test balances for an archived year still count the archived days"""
+        # Act
+        team = client.get("/balances", params={"year": 2022, "manager_id": 1}).json()["data"]["employees"]
+        own = client.get(f"/employees/{history['employee_id']}/balances", params={"year": 2022, "manager_id": 1}).json()["data"]
+
+        # Assert - Mar 7-9 approved, Jun 1 pending
+        alice = next(row for row in team if row["employee_name"] == "Alice Smith")
+        assert (alice["used_days"], alice["pending_days"]) == (3, 1)
+        assert (own["used_days"], own["pending_days"]) == (3, 1)
+
+    def test_batch_between_decision_and_query(self, async_sessions, sync_session, db_path):
+        """Test a batch committed after the archive decision cannot hide rows from the query"""
+        # Arrange - the archive ends in March 2022, so a 2023 range reads the hot table only
+        add_request(sync_session, date(2022, 3, 7), date(2022, 3, 9))
+        request_id = add_request(sync_session, date(2023, 6, 1), date(2023, 6, 2))
+        archive(db_path, cutoff=date(2023, 1, 1))
+
+        async def scenario():
+            async with async_sessions() as db:
+                query = await read_with_archive(
+                    db, overlapping_requests_query(date(2023, 1, 1), date(2023, 12, 31), 1),
+                    date(2023, 1, 1), date(2023, 12, 31), order_by=("start_date", "id"), manager_id=1)
+                # Act - the 2023 request moves to the archive in between
+                archive(db_path)
+                return (await db.execute(query)).scalars().all()
+
+        # Assert - the query still reads the snapshot the decision was made in
+        assert asyncio.run(scenario()) == [request_id]
+        assert ids(sync_session, TimeOffRequestArchive)[-1] == request_id
+
+    @pytest.mark.parametrize("date_from,date_to,expected", [
+        (None, None, False),
+        (date(2023, 1, 1), None, True),
+        (date(2023, 6, 2), date(2023, 12, 31), False),
+        (None, date(2020, 1, 1), True),
+    ])
+    def test_needs_archive(self, date_from, date_to, expected):
+        """Test only ranges reaching back to the archived end dates read the archive"""
+        assert needs_archive(date(2023, 6, 1), date_from, date_to) is expected
+
+    def test_empty_archive_never_read(self):
+        """Test nothing reads an empty archive"""
+        assert needs_archive(None, date(2000, 1, 1), None) is False
+
+class TestArchiveMigration:
+    """Test suite for adding the archive table to existing databases"""
+
+    def test_migration_creates_table(self, tmp_path):
+        """Test migrating a database without the archive table creates it and its indexes"""
+        # Arrange
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "database"))
+        from create_sqlite_db import create_database
+        create_database(tmp_path / "script.db")
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'script.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE time_off_requests_archive")
+
+        # Act
+        with engine.begin() as conn:
+            migrate(conn)
+        with engine.connect() as conn:
+            moved = archive_batch(conn, CUTOFF)
+
+        # Assert
+        indexes = {index["name"] for index in inspect(engine).get_indexes("time_off_requests_archive")}
+        engine.dispose()
+        assert moved == 0
+        assert {"idx_time_off_archive_manager_end", "idx_time_off_archive_end"} <= indexes
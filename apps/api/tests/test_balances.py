@@ -0,0 +1,126 @@
+import numpy as np
+from datetime import date
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest
+from balances import BusinessCalendar, load_holidays, request_business_days, yearly_balances
+
+client = TestClient(app)
+
+class TestBusinessDays:
+    """Test suite for vectorized business-day counting"""
+
+    def test_weekends_excluded(self):
+        """Test a Friday-to-Monday request uses two business days"""
+        # Arrange - 2025-09-26 is a Friday
+        calendar = BusinessCalendar()
+
+        # Act / Assert
+        assert request_business_days(date(2025, 9, 26), date(2025, 9, 29), calendar) == 2
+
+    def test_holidays_excluded_in_batch(self):
+        """Test holidays are skipped and each range is counted independently"""
+        # Arrange
+        calendar = BusinessCalendar(holidays=["2025-12-25", "2025-12-26"])
+        starts = np.array(["2025-12-22", "2025-12-25", "2025-12-27"], dtype="datetime64[D]")
+        ends = np.array(["2025-12-26", "2025-12-26", "2025-12-28"], dtype="datetime64[D]")
+
+        # Act
+        days = calendar.business_days(starts, ends)
+
+        # Assert
+        assert days.tolist() == [3, 0, 0]
+
+    def test_load_holidays_from_env_and_file(self, tmp_path):
+        """Test holiday dates are merged from the list and the file"""
+        # Arrange
+        holiday_file = tmp_path / "holidays.txt"
+        holiday_file.write_text("2025-12-25  # Christmas\n\n2025-01-01\n")
+
+        # Act
+        holidays = load_holidays("2025-07-04, 2025-01-01", str(holiday_file))
+
+        # Assert
+        assert [str(day) for day in holidays] == ["2025-01-01", "2025-07-04", "2025-12-25"]
+
+class TestYearlyBalances:
+    """Test suite for per-employee balance aggregation"""
+
+    def test_aggregates_per_employee(self):
+        """Test approved days are used, pending days are reported separately"""
+        # Arrange
+        rows = [
+            ("Alice", date(2025, 9, 22), date(2025, 9, 26), "approved"),
+            ("Alice", date(2025, 10, 6), date(2025, 10, 7), "pending"),
+            ("Bob", date(2025, 9, 29), date(2025, 9, 29), "approved"),
+        ]
+
+        # Act
+        balances = yearly_balances(rows, 2025, allowance=20, calendar=BusinessCalendar())
+
+        # Assert
+        assert balances == [
+            {"employee_name": "Alice", "used_days": 5, "pending_days": 2, "remaining_days": 15.0},
+            {"employee_name": "Bob", "used_days": 1, "pending_days": 0, "remaining_days": 19.0},
+        ]
+
+    def test_request_spanning_new_year_is_clipped(self):
+        """Test only the days inside the year count toward that year"""
+        # Arrange - 2025-12-29 is a Monday, 2026-01-02 a Friday
+        rows = [("Alice", date(2025, 12, 29), date(2026, 1, 2), "approved")]
+
+        # Act
+        balances_2025 = yearly_balances(rows, 2025, calendar=BusinessCalendar())
+        balances_2026 = yearly_balances(rows, 2026, calendar=BusinessCalendar())
+
+        # Assert
+        assert balances_2025[0]["used_days"] == 3
+        assert balances_2026[0]["used_days"] == 2
+
+class TestBalancesEndpoint:
+    """Test suite for GET /balances; the manager comes from ?manager_id= here"""
+
+    def test_balances_for_year(self, async_sessions, sync_session, manager_from_query):
+        """Test the endpoint aggregates the year's approved and pending requests"""
+        # Arrange
+        sync_session.add_all([
+            TimeOffRequest(employee_name="Alice", start_date=date(2025, 9, 22), end_date=date(2025, 9, 26),
+                           manager_id=1, status="approved"),
+            TimeOffRequest(employee_name="Alice", start_date=date(2025, 9, 29), end_date=date(2025, 9, 29),
+                           manager_id=1, status="denied"),
+            TimeOffRequest(employee_name="Bob", start_date=date(2024, 9, 23), end_date=date(2024, 9, 23),
+                           manager_id=2, status="approved"),
+        ])
+        sync_session.commit()
+
+        # Act
+        response = client.get("/balances", params={"year": 2025, "manager_id": 1})
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["year"] == 2025
+        assert [(e["employee_name"], e["used_days"]) for e in data["employees"]] == [("Alice", 5)]
+
+    def test_only_own_team(self, async_sessions, sync_session, manager_from_query):
+        """Test the balances cover only the logged-in manager's requests"""
+        # Arrange
+        sync_session.add(TimeOffRequest(employee_name="Bob", start_date=date(2025, 9, 23),
+                                        end_date=date(2025, 9, 23), manager_id=2, status="pending"))
+        sync_session.commit()
+
+        # Act
+        response = client.get("/balances", params={"year": 2025, "manager_id": 1})
+
+        # Assert
+        assert response.json()["data"]["employees"] == []
+
+    def test_requires_login(self, async_sessions):
+        """Test anonymous callers cannot read balances"""
+        assert client.get("/balances", params={"year": 2025}).status_code == 401
@@ -0,0 +1,63 @@
+import pytest
+import sqlite3
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import compare, percentile, run_benchmark
+from benchmarks.seed import seed_database
+
+class TestSeed:
+    """Test suite for the benchmark database seeder"""
+
+    def test_seed_volumes(self, tmp_path):
+        """Test managers x requests x years rows are written and day-indexed"""
+        # Act
+        volumes = seed_database(tmp_path / "bench.db", managers=3, requests_per_year=4, years=2)
+
+        # Assert
+        conn = sqlite3.connect(tmp_path / "bench.db")
+        assert conn.execute("SELECT COUNT(*) FROM managers").fetchone()[0] == 3
+        assert conn.execute("SELECT COUNT(*) FROM time_off_requests").fetchone()[0] == volumes["requests"] == 24
+        assert conn.execute("SELECT COUNT(DISTINCT request_id) FROM time_off_request_days").fetchone()[0] == 24
+        conn.close()
+
+class TestRunner:
+    """Test suite for the benchmark runner"""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 95) == 0.0
+
+    def test_in_process_run_reports_every_endpoint(self, tmp_path):
+        """Test a tiny in-process run produces percentiles and query timings"""
+        # Act
+        result = run_benchmark(managers=2, requests_per_year=5, years=1, requests_per_endpoint=5,
+                               concurrency=2, db_path=tmp_path / "bench.db")
+
+        # Assert
+        endpoints = result["modes"]["inprocess"]["endpoints"]
+        assert set(endpoints) >= {"health", "manager_requests", "overlapping", "export_ndjson"}
+        for stats in endpoints.values():
+            assert stats["requests"] == 5
+            assert stats["errors"] == 0
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert result["modes"]["inprocess"]["queries"]
+
+    def test_compare_reports_deltas(self):
+        """Test compare lines show before, after and percentage change"""
+        # Arrange
+        stats = {"p50_ms": 10.0, "p95_ms": 20.0, "throughput_rps": 100.0}
+        baseline = {"modes": {"inprocess": {"endpoints": {"health": stats}}}}
+        candidate = {"modes": {"inprocess": {"endpoints": {"health": {**stats, "p50_ms": 5.0}}}}}
+
+        # Act
+        lines = compare(baseline, candidate)
+
+        # Assert
+        assert "(-50%)" in lines[1]
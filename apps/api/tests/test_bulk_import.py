@@ -0,0 +1,302 @@
+import pytest
+import asyncio
+import json
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest, TimeOffRequestDay, create_db_engine
+from bulk_import import BulkImport, import_lines, iter_lines, validate_row, write_batch
+
+client = TestClient(app)
+
+def jsonl(*records):
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+def request_record(name="Alice Smith", start="2025-09-25", end="2025-09-27", manager_id=1, **extra):
+    return {"employee_name": name, "start_date": start, "end_date": end, "manager_id": manager_id, **extra}
+
+def count(session, column):
+    return session.execute(select(func.count(column))).scalar()
+
+class TestValidateRow:
+    """Test suite for per-row validation"""
+
+    def test_valid_row(self):
+        """Test a valid record is normalized for insertion"""
+        # Act
+        row = validate_row(request_record(reason="  Vacation ", status="Approved"), {1})
+
+        # Assert
+        assert row == {
+            "employee_name": "Alice Smith",
+            "start_date": date(2025, 9, 25),
+            "end_date": date(2025, 9, 27),
+            "reason": "Vacation",
+            "manager_id": 1,
+            "status": "approved",
+        }
+
+    @pytest.mark.parametrize("record, message", [
+        (request_record(name=""), "employee_name is required"),
+        (request_record(start="25/09/2025"), "ISO dates"),
+        (request_record(start="2025-09-28"), "on or after start_date"),
+        (request_record(manager_id="abc"), "manager_id must be an integer"),
+        (request_record(manager_id=7), "does not exist"),
+        (request_record(status="maybe"), "status must be one of"),
+        (request_record(start="2000-01-01", end="2030-12-31"), "at most 366 days"),
+    ])
+    def test_invalid_rows(self, record, message):
+        """Test invalid records raise a descriptive ValueError"""
+        with pytest.raises(ValueError, match=message):
+            validate_row(record, {1})
+
+    def test_max_days_boundary(self):
+        """Test a request may cover exactly max_days days but not one more"""
+        assert validate_row(request_record(start="2025-01-01", end="2025-01-10"), {1}, max_days=10)
+        with pytest.raises(ValueError):
+            validate_row(request_record(start="2025-01-01", end="2025-01-11"), {1}, max_days=10)
+
+class TestBulkImport:
+    """Test suite for incremental batching"""
+
+    def test_batches_are_emitted_at_batch_size(self):
+        """Test feed_line hands back a batch once batch_size rows are valid"""
+        # Arrange
+        importer = BulkImport("jsonl", {1}, batch_size=2)
+
+        # Act
+        first = importer.feed_line(1, json.dumps(request_record()))
+        second = importer.feed_line(2, json.dumps(request_record(name="Bob")))
+
+        # Assert
+        assert first is None
+        assert [line_no for line_no, _ in second] == [1, 2]
+        assert importer.take_batch() == []
+
+    def test_csv_header_and_bad_lines(self):
+        """Test CSV uses the header row and reports malformed lines"""
+        # Arrange
+        importer = BulkImport("csv", {1}, batch_size=10)
+
+        # Act
+        importer.feed_line(1, "employee_name,start_date,end_date,manager_id")
+        importer.feed_line(2, "Alice Smith,2025-09-25,2025-09-27,1")
+        importer.feed_line(3, "Bob,2025-09-25")
+
+        # Assert
+        assert len(importer.take_batch()) == 1
+        assert importer.report()["errors"] == [{"line": 3, "error": "expected 4 columns, got 2"}]
+
+    def test_csv_quoted_line_breaks(self):
+        """Test a quoted CSV field may span lines and an unterminated one is reported at the end"""
+        # Arrange
+        importer = BulkImport("csv", {1}, batch_size=10)
+        lines = [
+            "employee_name,start_date,end_date,reason,manager_id\r\n",
+            'Alice Smith,2025-09-25,2025-09-27,"Flight ""home""\r\n', "\r\n", 'back Monday",1\r\n',
+            "Bob,2025-09-25,2025-09-25,,1\r\n",
+            'Carol,2025-09-25,2025-09-25,"never closed,1\r\n',
+        ]
+
+        # Act
+        for line_no, line in enumerate(lines, start=1):
+            importer.feed_line(line_no, line)
+        batch = importer.finish()
+
+        # Assert - a record is numbered by its first line
+        assert [(line_no, row["reason"]) for line_no, row in batch] == [
+            (2, 'Flight "home"\r\n\r\nback Monday'), (5, None),
+        ]
+        assert importer.report()["errors"] == [{"line": 6, "error": "unterminated quoted field"}]
+
+    def test_iter_lines_decodes_across_chunks(self):
+        """Test characters split between chunks decode intact and line endings are kept"""
+        # Arrange - the BOM and "é" are each cut in two
+        body = "\ufeffname\r\nRené\nlast".encode("utf-8")
+        chunks = [body[:2], body[2:13], body[13:]]
+
+        async def collect():
+            async def stream():
+                for chunk in chunks:
+                    yield chunk
+            return [item async for item in iter_lines(stream())]
+
+        # Act / Assert
+        assert asyncio.run(collect()) == [(1, "name\r\n"), (2, "René\n"), (3, "last")]
+
+class TestWriteBatch:
+    """Test suite for chunked transactional writes"""
+
+    def test_batch_insert_indexes_days(self, db_path, sync_session):
+        """Test a batch is inserted and its days indexed"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        batch = [(1, validate_row(request_record(), {1})), (2, validate_row(request_record(name="Bob"), {1}))]
+
+        # Act
+        with engine.connect() as conn:
+            failures = write_batch(conn, batch)
+        engine.dispose()
+
+        # Assert
+        assert failures == []
+        assert count(sync_session, TimeOffRequest.id) == 2
+        assert count(sync_session, TimeOffRequestDay.day) == 6
+
+    def test_failed_row_does_not_abort_batch(self, db_path, sync_session):
+        """Test a row rejected by the database is isolated and the rest are kept"""
+        # Arrange - manager 99 passes validation but violates the foreign key
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        batch = [
+            (1, validate_row(request_record(), {1, 99})),
+            (2, validate_row(request_record(name="Ghost", manager_id=99), {1, 99})),
+            (3, validate_row(request_record(name="Carol"), {1, 99})),
+        ]
+
+        # Act
+        with engine.connect() as conn:
+            failures = write_batch(conn, batch)
+        engine.dispose()
+
+        # Assert
+        assert [line_no for line_no, _ in failures] == [2]
+        names = sync_session.execute(select(TimeOffRequest.employee_name).order_by(TimeOffRequest.id)).scalars().all()
+        assert names == ["Alice Smith", "Carol"]
+        assert count(sync_session, TimeOffRequestDay.day) == 6
+
+    def test_import_lines_reports_totals(self, db_path, sync_session):
+        """Test a full import reports received, inserted and failed counts"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        lines = jsonl(request_record(), request_record(end="2025-01-01"), request_record(name="Bob")).splitlines()
+
+        # Act
+        with engine.connect() as conn:
+            report = import_lines(conn, lines, BulkImport("jsonl", {1}, batch_size=1))
+        engine.dispose()
+
+        # Assert
+        assert report["received"] == 3
+        assert report["inserted"] == 2
+        assert report["failed"] == 1
+        assert report["errors"][0]["line"] == 2
+
+class TestBulkImportEndpoint:
+    """Test suite for POST /requests/bulk"""
+
+    def test_jsonl_import(self, async_sessions, sync_session, manager_from_query):
+        """Test JSON Lines bodies are imported in batches"""
+        # Arrange
+        body = jsonl(*(request_record(name=f"Employee {i}") for i in range(5)), request_record(manager_id=42))
+
+        # Act
+        response = client.post("/requests/bulk?batch_size=2&manager_id=1", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["received"] == 6
+        assert data["inserted"] == 5
+        assert data["failed"] == 1
+        assert data["errors"][0]["line"] == 6
+        assert count(sync_session, TimeOffRequest.id) == 5
+        assert count(sync_session, TimeOffRequestDay.day) == 15
+
+    def test_csv_import_detected_from_content_type(self, async_sessions, sync_session, manager_from_query):
+        """Test CSV bodies are detected from the Content-Type header"""
+        # Arrange
+        body = "﻿employee_name,start_date,end_date,reason,manager_id\nAlice Smith,2025-09-25,2025-09-25,\"Vacation, beach\",1\n"
+
+        # Act
+        response = client.post("/requests/bulk", params={"manager_id": 1}, content=body.encode("utf-8"),
+                               headers={"Content-Type": "text/csv"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["data"]["inserted"] == 1
+        assert sync_session.execute(select(TimeOffRequest.reason)).scalar() == "Vacation, beach"
+
+    def test_reimports_export(self, async_sessions, sync_session, manager_from_query):
+        """Test a CSV export whose reasons contain line breaks imports back unchanged"""
+        # Arrange
+        reason = "Surgery\nthen recovery, \"light duty\""
+        sync_session.add(TimeOffRequest(employee_name="Alice Smith", start_date=date(2025, 9, 25),
+                                        end_date=date(2025, 9, 26), reason=reason, manager_id=1))
+        sync_session.commit()
+        export = client.get("/manager/requests/export", params={"manager_id": 1, "format": "csv"})
+
+        # Act
+        response = client.post("/requests/bulk", params={"manager_id": 1, "format": "csv"}, content=export.content)
+
+        # Assert
+        assert response.json()["data"] == {"received": 1, "inserted": 1, "failed": 0, "errors": []}
+        sync_session.expire_all()
+        assert sync_session.execute(select(TimeOffRequest.reason)).scalars().all() == [reason, reason]
+
+    def test_only_own_requests(self, async_sessions, sync_session, manager_from_query):
+        """Test rows for another manager are rejected and rows without one are the caller's"""
+        # Arrange
+        unassigned = request_record()
+        del unassigned["manager_id"]
+        body = jsonl(unassigned, request_record(name="Bob Johnson", manager_id=2))
+
+        # Act
+        response = client.post("/requests/bulk", params={"manager_id": 1}, content=body)
+
+        # Assert
+        data = response.json()["data"]
+        assert (data["inserted"], data["failed"]) == (1, 1)
+        assert data["errors"] == [{"line": 2, "error": "manager_id must be your own (1)"}]
+        assert sync_session.execute(select(TimeOffRequest.manager_id)).scalars().all() == [1]
+
+    def test_long_request_rejected(self, async_sessions, sync_session, manager_from_query):
+        """Test an over-long range is a row error that writes no day index or coverage rows"""
+        # Act
+        response = client.post("/requests/bulk", params={"manager_id": 1},
+                               content=jsonl(request_record(start="0001-01-01", end="9999-12-31")))
+
+        # Assert
+        assert response.json()["data"]["errors"] == [{"line": 1, "error": "a request may cover at most 366 days"}]
+        assert count(sync_session, TimeOffRequestDay.day) == 0
+
+    def test_requires_login(self, async_sessions, sync_session):
+        """Test anonymous imports are refused before any row is written"""
+        # Act
+        response = client.post("/requests/bulk", content=jsonl(request_record(status="approved")))
+
+        # Assert
+        assert response.status_code == 401
+        assert count(sync_session, TimeOffRequest.id) == 0
+
+    def test_unknown_format_rejected(self, async_sessions, manager_from_query):
+        """Test an unsupported format is a client error"""
+        # Act
+        response = client.post("/requests/bulk?format=xml&manager_id=1", content="<requests/>")
+
+        # Assert
+        assert response.status_code == 400
+
+class TestImportCli:
+    """Test suite for database/import_requests.py"""
+
+    def test_cli_imports_file(self, db_path, sync_session, tmp_path):
+        """Test the CLI imports a JSON Lines file into the given database"""
+        # Arrange
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "database"))
+        from import_requests import import_requests
+        source = tmp_path / "requests.jsonl"
+        source.write_text(jsonl(request_record(), request_record(name="Bob")))
+
+        # Act
+        report = import_requests(source, batch_size=1, database_url=f"sqlite:///{db_path}")
+
+        # Assert
+        assert report["inserted"] == 2
+        assert count(sync_session, TimeOffRequest.id) == 2
@@ -0,0 +1,198 @@
+import pytest
+import json
+from datetime import date
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest
+from cache import ManagerRequestCache, MemoryLRUCache, NullCache, manager_cache
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+class TestMemoryLRUCache:
+    """Test suite for the in-process cache backend"""
+
+    def test_hit_and_miss_counters(self):
+        """Test gets are counted as hits or misses"""
+        # Arrange
+        cache = MemoryLRUCache()
+        cache.set("a", 1, ttl=60)
+
+        # Act
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+        # Assert
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the LRU entry is evicted once max_entries is exceeded"""
+        # Arrange
+        cache = MemoryLRUCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+
+        # Act
+        cache.set("c", 3, ttl=60)
+
+        # Assert
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entries_miss(self):
+        """Test entries past their TTL are dropped on read"""
+        # Arrange
+        cache = MemoryLRUCache()
+        cache.set("a", 1, ttl=0)
+
+        # Act & Assert
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_invalidate_tag_removes_only_tagged(self):
+        """Test tag invalidation removes exactly the tagged entries"""
+        # Arrange
+        cache = MemoryLRUCache()
+        cache.set("a", 1, ttl=60, tags=("manager:1",))
+        cache.set("b", 2, ttl=60, tags=("manager:2",))
+
+        # Act
+        removed = cache.invalidate_tag("manager:1")
+
+        # Assert
+        assert removed == 1
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    def test_null_cache_never_hits(self):
+        """Test the null backend disables caching"""
+        cache = ManagerRequestCache(NullCache())
+        cache.set("k", 1, {"x": 1})
+        assert cache.get("k") is None
+
+class TestManagerRequestCache:
+    """Test suite for read-through caching of GET /manager/requests"""
+
+    @pytest.fixture
+    def seeded(self, sync_session, async_sessions):
+        request = TimeOffRequest(employee_name="Alice Smith", start_date=date(2025, 9, 25),
+                                 end_date=date(2025, 9, 27), manager_id=1)
+        sync_session.add(request)
+        sync_session.commit()
+        manager_cache.backend.clear()
+        return request
+
+    def list_names(self, manager_id=1):
+        response = client.get("/manager/requests", params={"manager_id": manager_id})
+        return [row["employee_name"] for row in response.json()["data"]]
+
+    def test_repeat_request_is_served_from_cache(self, seeded):
+        """Test the second identical request does not query the database"""
+        # Arrange
+        self.list_names()
+        hits_before = manager_cache.stats()["hits"]
+
+        # Act
+        with patch("main.manager_page_query") as query:
+            names = self.list_names()
+
+        # Assert
+        query.assert_not_called()
+        assert names == ["Alice Smith"]
+        assert manager_cache.stats()["hits"] == hits_before + 1
+
+    def test_insert_invalidates_manager(self, seeded, sync_session):
+        """Test inserting a request for the manager drops their cached pages"""
+        # Arrange
+        self.list_names()
+
+        # Act
+        sync_session.add(TimeOffRequest(employee_name="Bob Johnson", start_date=date(2025, 10, 1),
+                                        end_date=date(2025, 10, 1), manager_id=1))
+        sync_session.commit()
+
+        # Assert
+        assert self.list_names() == ["Alice Smith", "Bob Johnson"]
+
+    def test_status_change_invalidates_manager(self, seeded, sync_session):
+        """Test approving a request drops the manager's cached pages"""
+        # Arrange
+        client.get("/manager/requests", params={"manager_id": 1, "status": "pending"})
+
+        # Act
+        seeded.status = "approved"
+        sync_session.commit()
+        response = client.get("/manager/requests", params={"manager_id": 1, "status": "pending"})
+
+        # Assert
+        assert response.json()["data"] == []
+
+    def test_other_managers_stay_cached(self, seeded, sync_session):
+        """Test a write only invalidates the affected manager"""
+        # Arrange
+        self.list_names(manager_id=2)
+        hits_before = manager_cache.stats()["hits"]
+
+        # Act
+        sync_session.add(TimeOffRequest(employee_name="Bob Johnson", start_date=date(2025, 10, 1),
+                                        end_date=date(2025, 10, 1), manager_id=1))
+        sync_session.commit()
+        self.list_names(manager_id=2)
+
+        # Assert
+        assert manager_cache.stats()["hits"] == hits_before + 1
+
+    def test_reassignment_invalidates_both_managers(self, seeded, sync_session):
+        """Test moving a request to another manager invalidates old and new manager"""
+        # Arrange
+        self.list_names(manager_id=1)
+        self.list_names(manager_id=2)
+
+        # Act
+        seeded.manager_id = 2
+        sync_session.commit()
+
+        # Assert
+        assert self.list_names(manager_id=1) == []
+        assert self.list_names(manager_id=2) == ["Alice Smith"]
+
+    def test_bulk_import_invalidates_manager(self, seeded):
+        """Test Core bulk inserts also invalidate the manager's pages"""
+        # Arrange
+        self.list_names()
+        body = json.dumps({"employee_name": "Bulk Bob", "start_date": "2025-11-01",
+                           "end_date": "2025-11-01", "manager_id": 1}) + "\n"
+
+        # Act
+        client.post("/requests/bulk", params={"manager_id": 1}, content=body)
+
+        # Assert
+        assert self.list_names() == ["Alice Smith", "Bulk Bob"]
+
+    def test_stats_endpoint(self, seeded):
+        """Test counters are exposed for sizing the cache"""
+        # Arrange
+        self.list_names()
+        self.list_names()
+
+        # Act
+        response = client.get("/cache/stats")
+
+        # Assert
+        stats = response.json()["data"]
+        assert stats["hits"] >= 1
+        assert stats["misses"] >= 1
+        assert {"entries", "evictions", "expirations", "invalidations"} <= set(stats)
@@ -0,0 +1,271 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+import compression
+import live
+from database import ManagerRequestVersion, TimeOffRequest, create_db_engine
+from compression import accepted_encodings
+from versions import bump_versions, etag_matches, request_etag
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+@pytest.fixture
+def requests(async_sessions, sync_session):
+    """Pending requests for both managers"""
+    rows = [
+        TimeOffRequest(employee_name=f"Employee {n}", start_date=date(2025, 12, 1 + n), end_date=date(2025, 12, 1 + n),
+                       manager_id=1 + n % 2)
+        for n in range(6)
+    ]
+    sync_session.add_all(rows)
+    sync_session.commit()
+    return [row.id for row in rows]
+
+def get_requests(etag=None, manager_id=1, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/manager/requests", params={"manager_id": manager_id, **params}, headers=headers)
+
+def version(sync_session, manager_id):
+    sync_session.expire_all()
+    row = sync_session.get(ManagerRequestVersion, manager_id)
+    return row.version if row else 0
+
+class TestRequestListETag:
+    """Test suite for conditional GET /manager/requests"""
+
+    def test_unchanged_list_is_304(self, requests):
+        """Test repeating a load with its ETag returns 304 and no body"""
+        # Arrange
+        first = get_requests()
+
+        # Act
+        second = get_requests(first.headers["ETag"])
+
+        # Assert
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    def test_304_skips_the_main_query(self, requests):
+        """Test a revalidation costs one version lookup, not the list query"""
+        # Arrange
+        etag = get_requests().headers["ETag"]
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            response = get_requests(etag)
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+        # Assert
+        assert response.status_code == 304
+        assert len(statements) == 1
+        assert "manager_request_versions" in statements[0]
+
+    def test_change_invalidates(self, requests, sync_session):
+        """Test a status change produces a new ETag and fresh data"""
+        # Arrange
+        etag = get_requests().headers["ETag"]
+        sync_session.get(TimeOffRequest, requests[0]).status = "approved"
+        sync_session.commit()
+
+        # Act
+        response = get_requests(etag)
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert {row["id"]: row["status"] for row in response.json()["data"]}[requests[0]] == "approved"
+
+    def test_other_manager_changes_keep_etag(self, requests, sync_session):
+        """Test versions are per manager"""
+        # Arrange
+        etag = get_requests().headers["ETag"]
+        sync_session.get(TimeOffRequest, requests[1]).status = "denied"
+        sync_session.commit()
+
+        # Act / Assert
+        assert get_requests(etag).status_code == 304
+
+    def test_parameters_get_their_own_etag(self, requests):
+        """Test another page or filter of the same data does not match"""
+        etag = get_requests().headers["ETag"]
+        assert get_requests(etag, status="approved").status_code == 200
+        assert get_requests(etag, limit=1).status_code == 200
+
+class TestVersionBumps:
+    """Test suite for versions maintained alongside writes"""
+
+    def test_submission_bumps(self, async_sessions, sync_session):
+        """Test ORM inserts bump the manager's version"""
+        client.post("/requests", json={"employee_name": "Alice Smith", "start_date": "2025-12-01",
+                                       "end_date": "2025-12-01", "manager_id": 1})
+        assert (version(sync_session, 1), version(sync_session, 2)) == (1, 0)
+
+    def test_bulk_decisions_bump(self, requests, sync_session):
+        """Test Core decisions bump once per chunk"""
+        # Arrange
+        before = version(sync_session, 1)
+
+        # Act
+        client.post("/manager/requests/decisions", params={"manager_id": 1},
+                    json={"decisions": [{"id": requests[0], "status": "approved"},
+                                        {"id": requests[2], "status": "approved"}]})
+
+        # Assert
+        assert version(sync_session, 1) == before + 1
+
+    def test_bulk_import_bumps(self, async_sessions, sync_session):
+        """Test Core bulk inserts bump each touched manager"""
+        body = '{"employee_name": "Bob Johnson", "start_date": "2025-12-01", "end_date": "2025-12-01", "manager_id": 2}'
+        client.post("/requests/bulk", params={"manager_id": 2}, content=body)
+        assert (version(sync_session, 1), version(sync_session, 2)) == (0, 1)
+
+    def test_reassignment_bumps_both(self, requests, sync_session):
+        """Test moving a request changes both managers' lists"""
+        # Arrange
+        before = (version(sync_session, 1), version(sync_session, 2))
+
+        # Act
+        sync_session.get(TimeOffRequest, requests[0]).manager_id = 2
+        sync_session.commit()
+
+        # Assert
+        assert (version(sync_session, 1), version(sync_session, 2)) == (before[0] + 1, before[1] + 1)
+
+    def test_portable_bump(self, db_path, sync_session):
+        """Test dialects without an upsert statement bump existing versions and insert new ones"""
+        # Arrange - SQLite standing in for a dialect with no upsert branch
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        engine.dialect.name = "postgresql"
+        with engine.begin() as conn:
+            bump_versions(conn, [1])
+
+        # Act
+        with engine.begin() as conn:
+            bump_versions(conn, [1, 2, 1])
+        engine.dispose()
+
+        # Assert
+        assert (version(sync_session, 1), version(sync_session, 2)) == (2, 1)
+
+class TestCoverageETag:
+    """Test suite for conditional GET /manager/coverage"""
+
+    def test_calendar_revalidates(self, requests, sync_session):
+        """Test the calendar is 304 until the team's requests change"""
+        # Arrange
+        params = {"manager_id": 1, "from": "2025-12-01", "to": "2025-12-31"}
+        etag = client.get("/manager/coverage", params=params).headers["ETag"]
+
+        # Act
+        unchanged = client.get("/manager/coverage", params=params, headers={"If-None-Match": etag})
+        sync_session.get(TimeOffRequest, requests[0]).status = "approved"
+        sync_session.commit()
+        changed = client.get("/manager/coverage", params=params, headers={"If-None-Match": etag})
+
+        # Assert
+        assert unchanged.status_code == 304
+        assert changed.status_code == 200
+
+class TestCompression:
+    """Test suite for gzip of large responses"""
+
+    def test_large_list_is_gzipped(self, async_sessions, sync_session):
+        """Test a list above GZIP_MIN_SIZE is compressed for clients that accept gzip"""
+        # Arrange
+        sync_session.add_all([
+            TimeOffRequest(employee_name=f"Employee {n}", start_date=date(2025, 1, 1 + n % 28),
+                           end_date=date(2025, 1, 1 + n % 28), reason="Vacation", manager_id=1)
+            for n in range(40)
+        ])
+        sync_session.commit()
+
+        # Act
+        response = client.get("/manager/requests", params={"manager_id": 1, "limit": 40},
+                              headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["data"]) == 40
+
+    def test_brotli_preferred_when_offered(self, async_sessions, sync_session):
+        """Test clients offering br get brotli, and gzip when the brotli package is missing"""
+        pytest.importorskip("brotli")
+        # Arrange
+        sync_session.add_all([
+            TimeOffRequest(employee_name=f"Employee {n}", start_date=date(2025, 1, 1 + n % 28),
+                           end_date=date(2025, 1, 1 + n % 28), reason="Vacation", manager_id=1)
+            for n in range(40)
+        ])
+        sync_session.commit()
+        params = {"manager_id": 1, "limit": 40}
+        headers = {"Accept-Encoding": "gzip, br"}
+
+        # Act
+        br = client.get("/manager/requests", params=params, headers=headers)
+        with patch.object(compression, "brotli", None):
+            fallback = client.get("/manager/requests", params=params, headers=headers)
+
+        # Assert
+        assert br.headers["content-encoding"] == "br"
+        assert "Accept-Encoding" in br.headers["vary"]
+        assert fallback.headers["content-encoding"] == "gzip"
+        assert br.json() == fallback.json()
+
+    def test_small_response_uncompressed(self, async_sessions):
+        """Test tiny bodies are sent as is"""
+        assert "content-encoding" not in client.get("/health/live").headers
+
+    def test_event_stream_never_compressed(self, async_sessions):
+        """Test the SSE stream bypasses the compressor"""
+        with patch.object(live, "LIVE_MAX_STREAM_SECONDS", 0.05), patch.object(live, "LIVE_HEARTBEAT_SECONDS", 0.01):
+            response = client.get("/manager/requests/stream", params={"manager_id": 1})
+        assert "content-encoding" not in response.headers
+
+class TestAcceptEncoding:
+    """Test suite for reading Accept-Encoding"""
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br", {"gzip", "deflate", "br"}),
+        ("br;q=0, GZIP;q=0.5", {"gzip"}),
+        ("identity", {"identity"}),
+        ("gzip;q=x, br", {"br"}),
+        ("", set()),
+    ])
+    def test_codings(self, header, expected):
+        """Test codings with q=0 or an unreadable q are left out"""
+        assert accepted_encodings(header) == expected
+
+class TestETagMatching:
+    """Test suite for If-None-Match parsing"""
+
+    def test_weak_comparison(self):
+        """Test lists, W/ prefixes and * match as RFC 9110 weak comparison requires"""
+        etag = request_etag(1, 3, "requests")
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", {etag[2:]}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(request_etag(1, 4, "requests"), etag)
+        assert not etag_matches(None, etag)
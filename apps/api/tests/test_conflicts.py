@@ -0,0 +1,162 @@
+import pytest
+import asyncio
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import StaffingCoverage, TimeOffRequest, TimeOffRequestDay
+from conflicts import SubmissionConflict, submit_request
+
+client = TestClient(app)
+
+def submission(employee_name="Alice Smith", start_date="2025-12-22", end_date="2025-12-24", manager_id=1):
+    return {
+        "employee_name": employee_name,
+        "start_date": start_date,
+        "end_date": end_date,
+        "reason": "Holidays",
+        "manager_id": manager_id,
+    }
+
+def row(employee_name, start_date=date(2025, 12, 24), end_date=date(2025, 12, 24)):
+    return {"employee_name": employee_name, "start_date": start_date, "end_date": end_date,
+            "reason": None, "manager_id": 1, "status": "pending"}
+
+class TestCreateRequest:
+    """Test suite for POST /requests"""
+
+    def test_creates_pending_request(self, async_sessions, sync_session):
+        """Test a valid submission is stored as pending with its day index and coverage"""
+        # Act
+        response = client.post("/requests", json={**submission(), "status": "approved"})
+
+        # Assert
+        assert response.status_code == 201
+        data = response.json()["data"]
+        assert data["status"] == "pending"
+        assert data["created_at"] is not None
+        assert sync_session.execute(select(func.count()).select_from(TimeOffRequestDay)).scalar() == 3
+        assert sync_session.execute(select(func.sum(StaffingCoverage.pending_count))).scalar() == 3
+
+    @pytest.mark.parametrize("payload", [
+        submission(employee_name=""),
+        submission(end_date="2025-12-01"),
+        submission(manager_id=99),
+        submission(manager_id="abc"),
+        submission(start_date="2000-01-01", end_date="2030-12-31"),
+        submission(start_date="0001-01-01", end_date="9999-12-31"),
+    ])
+    def test_invalid_submission(self, async_sessions, payload):
+        """Test malformed submissions are rejected before touching the database"""
+        # Act
+        response = client.post("/requests", json=payload)
+
+        # Assert
+        assert response.status_code == 400
+
+    def test_overlapping_request_for_same_employee(self, async_sessions, sync_session):
+        """Test an employee cannot submit overlapping requests, but others can"""
+        # Arrange
+        client.post("/requests", json=submission())
+
+        # Act
+        overlapping = client.post("/requests", json=submission(start_date="2025-12-24", end_date="2025-12-26"))
+        other_employee = client.post("/requests", json=submission(employee_name="Bob Johnson"))
+
+        # Assert
+        assert overlapping.status_code == 409
+        assert "overlapping" in overlapping.json()["detail"]
+        assert other_employee.status_code == 201
+
+    def test_overlap_across_name_spellings(self, async_sessions):
+        """Test spellings of one name are one employee for the overlap check"""
+        # Arrange
+        client.post("/requests", json=submission(employee_name="Carol Davis", start_date="2040-01-01", end_date="2040-01-05"))
+
+        # Act
+        response = client.post("/requests", json=submission(employee_name="carol  davis", start_date="2040-01-02",
+                                                              end_date="2040-01-03"))
+
+        # Assert
+        assert response.status_code == 409
+        assert "overlapping" in response.json()["detail"]
+
+    def test_denied_request_does_not_block(self, async_sessions, sync_session):
+        """Test a denied request frees its dates for a new submission"""
+        # Arrange
+        created = client.post("/requests", json=submission()).json()["data"]
+        request = sync_session.get(TimeOffRequest, created["id"])
+        request.status = "denied"
+        sync_session.commit()
+
+        # Act
+        response = client.post("/requests", json=submission())
+
+        # Assert
+        assert response.status_code == 201
+
+    def test_team_limit(self, async_sessions, monkeypatch):
+        """Test submissions beyond the manager's concurrent absence limit are rejected"""
+        # Arrange
+        monkeypatch.setattr("conflicts.MAX_CONCURRENT_ABSENCES", 1)
+        client.post("/requests", json=submission(employee_name="Alice Smith"))
+
+        # Act
+        same_team = client.post("/requests", json=submission(employee_name="Bob Johnson", start_date="2025-12-24"))
+        other_team = client.post("/requests", json=submission(employee_name="Bob Johnson", manager_id=2))
+
+        # Assert
+        assert same_team.status_code == 409
+        assert "2025-12-24" in same_team.json()["detail"]
+        assert other_team.status_code == 201
+
+class TestConcurrentSubmission:
+    """Test suite for racing submissions"""
+
+    def test_limit_holds_under_concurrent_submissions(self, async_sessions, sync_session):
+        """Test only `limit` of many simultaneous submissions for the same day succeed"""
+        # Arrange
+        async def submit(employee_name):
+            async with async_sessions() as db:
+                try:
+                    await submit_request(db, row(employee_name), limit=2)
+                    return True
+                except SubmissionConflict:
+                    return False
+
+        async def burst():
+            return await asyncio.gather(*(submit(f"Employee {i}") for i in range(8)))
+
+        # Act
+        results = asyncio.run(burst())
+
+        # Assert
+        assert results.count(True) == 2
+        assert sync_session.execute(select(StaffingCoverage.pending_count)).scalar() == 2
+
+    def test_new_employee_spellings_race(self, async_sessions, sync_session):
+        """Test two first submissions spelling one new name differently cannot both be stored"""
+        # Arrange
+        async def submit(employee_name):
+            async with async_sessions() as db:
+                try:
+                    await submit_request(db, row(employee_name), limit=0)
+                    return True
+                except SubmissionConflict:
+                    return False
+
+        async def burst():
+            return await asyncio.gather(submit("Carol Davis"), submit("carol  davis"))
+
+        # Act
+        results = asyncio.run(burst())
+
+        # Assert
+        assert sorted(results) == [False, True]
+        assert sync_session.execute(select(func.count()).select_from(TimeOffRequest)).scalar() == 1
@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import patch, MagicMock
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
 from sqlalchemy.exc import OperationalError
 import sys
 import os
@@ -9,8 +10,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import (
     init_db, 
+    init_async_db,
     test_db_connection, 
+    check_async_db_connection,
     get_db, 
+    get_async_db,
+    _async_database_url,
+    _sync_database_url,
+    _engine_options,
+    create_db_engine,
+    create_async_db_engine,
     Manager, 
     TimeOffRequest,
     SessionLocal,
@@ -52,6 +61,76 @@ class TestDatabaseConnection:
         # Session should be closed even when exception occurs
         mock_session.close.assert_called()
 
+class TestAsyncDatabaseConnection:
+    """Test suite for async database connectivity"""
+
+    @patch('database.AsyncSessionLocal')
+    def test_async_db_connection_success(self, mock_session_local):
+        """Test successful async database connection"""
+        # Arrange
+        mock_session = AsyncMock()
+        mock_session_local.return_value.__aenter__.return_value = mock_session
+
+        # Act
+        result = asyncio.run(check_async_db_connection())
+
+        # Assert
+        assert result is True
+        mock_session.execute.assert_awaited_once()
+
+    @patch('database.AsyncSessionLocal')
+    def test_async_db_connection_failure(self, mock_session_local):
+        """Test async database connection failure"""
+        # Arrange
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = OperationalError("Connection failed", None, None)
+        mock_session_local.return_value.__aenter__.return_value = mock_session
+
+        # Act
+        result = asyncio.run(check_async_db_connection())
+
+        # Assert
+        assert result is False
+        # Session context should be exited even when exception occurs
+        mock_session_local.return_value.__aexit__.assert_awaited()
+
+    def test_async_db_connection_real_sqlite(self, tmp_path):
+        """Test async engine round-trip against a real aiosqlite database"""
+        # Arrange
+        from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+        from sqlalchemy.orm import sessionmaker
+        test_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        test_sessions = sessionmaker(bind=test_engine, class_=AsyncSession)
+
+        # Act
+        with patch('database.AsyncSessionLocal', test_sessions):
+            result = asyncio.run(check_async_db_connection())
+
+        # Assert
+        assert result is True
+
+class TestAsyncDatabaseUrl:
+    """Test suite for deriving the async driver URL"""
+
+    def test_sqlite_url_uses_aiosqlite(self):
+        """Test SQLite URLs are mapped onto aiosqlite"""
+        assert _async_database_url("sqlite:///./database/time_off_system.db") == \
+            "sqlite+aiosqlite:///./database/time_off_system.db"
+
+    def test_mysql_url_uses_aiomysql(self):
+        """Test MySQL URLs are mapped onto aiomysql"""
+        assert _async_database_url("mysql://user:pw@mysql:3306/db") == \
+            "mysql+aiomysql://user:pw@mysql:3306/db"
+
+    def test_mysql_sync_url_uses_pymysql(self):
+        """Test driverless MySQL URLs use the pinned PyMySQL driver for the sync engine"""
+        assert _sync_database_url("mysql://user:pw@mysql:3306/db") == "mysql+pymysql://user:pw@mysql:3306/db"
+        assert _sync_database_url("sqlite:///x.db") == "sqlite:///x.db"
+
+    def test_async_url_is_unchanged(self):
+        """Test URLs that already name an async driver pass through"""
+        assert _async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
 class TestDatabaseSession:
     """Test suite for database session management"""
     
@@ -77,6 +156,27 @@ class TestDatabaseSession:
         
         mock_session.close.assert_called_once()
 
+    @patch('database.AsyncSessionLocal')
+    def test_get_async_db_yields_session(self, mock_session_local):
+        """Test that get_async_db yields an async database session"""
+        # Arrange
+        mock_session = AsyncMock()
+        mock_session_local.return_value.__aenter__.return_value = mock_session
+
+        async def consume():
+            db_generator = get_async_db()
+            session = await db_generator.__anext__()
+            with pytest.raises(StopAsyncIteration):
+                await db_generator.__anext__()
+            return session
+
+        # Act
+        session = asyncio.run(consume())
+
+        # Assert
+        assert session == mock_session
+        mock_session_local.return_value.__aexit__.assert_awaited_once()
+
 class TestDatabaseModels:
     """Test suite for database models"""
     
@@ -110,14 +210,131 @@ class TestDatabaseModels:
 class TestDatabaseInitialization:
     """Test suite for database initialization"""
     
-    @patch('database.Base.metadata.create_all')
-    def test_init_db_creates_tables(self, mock_create_all):
-        """Test that init_db creates all tables"""
+    def test_init_db_creates_tables(self, tmp_path):
+        """Test that init_db migrates an empty database to the ORM schema"""
+        # Arrange
+        from sqlalchemy import inspect
+        test_engine = create_db_engine(f"sqlite:///{tmp_path / 'init.db'}")
+
         # Act
-        init_db()
-        
+        applied = init_db(test_engine)
+        tables = inspect(test_engine).get_table_names()
+        test_engine.dispose()
+
+        # Assert
+        assert applied > 0
+        assert "managers" in tables
+        assert "time_off_requests" in tables
+        assert "schema_version" in tables
+
+    def test_init_async_db_creates_tables(self, tmp_path):
+        """Test that init_async_db creates all tables through the async engine"""
+        # Arrange
+        from sqlalchemy import inspect
+        from sqlalchemy.ext.asyncio import create_async_engine
+        test_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'init.db'}")
+
+        async def create_and_inspect():
+            await init_async_db(test_engine)
+            async with test_engine.connect() as conn:
+                tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+            await test_engine.dispose()
+            return tables
+
+        # Act
+        tables = asyncio.run(create_and_inspect())
+
+        # Assert
+        assert "managers" in tables
+        assert "time_off_requests" in tables
+
+    def test_engines_are_created_lazily(self):
+        """Test importing the module builds no engine and loads no async driver"""
+        # Arrange
+        import subprocess
+        script = (
+            "import sys, database; "
+            "print(database._engine is None, database._async_engine is None, 'aiosqlite' in sys.modules)"
+        )
+
+        # Act
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        # Assert
+        assert result.stdout.split() == ["True", "True", "False"]
+
+class TestEngineConfiguration:
+    """Test suite for the engine factory and SQLite tuning"""
+
+    @patch.dict(os.environ, {
+        'DB_POOL_SIZE': '7',
+        'DB_MAX_OVERFLOW': '3',
+        'DB_POOL_PRE_PING': 'false',
+        'DB_POOL_RECYCLE': '120',
+        'DB_ECHO': 'true',
+    })
+    def test_engine_options_from_environment(self):
+        """Test pool and echo settings are read from the environment"""
+        # Act
+        options = _engine_options("mysql://user:pw@mysql/db")
+
+        # Assert
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["pool_pre_ping"] is False
+        assert options["pool_recycle"] == 120
+        assert options["echo"] is True
+
+    def test_echo_disabled_by_default(self):
+        """Test SQL echo is off unless requested"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert _engine_options("sqlite:///x.db")["echo"] is False
+
+    def test_memory_sqlite_keeps_default_pool(self):
+        """Test in-memory SQLite does not receive pool sizing"""
+        options = _engine_options("sqlite://")
+        assert "pool_size" not in options
+        assert "poolclass" not in options
+
+    @patch.dict(os.environ, {'SQLITE_BUSY_TIMEOUT_MS': '1234'})
+    def test_sqlite_pragmas_applied_on_connect(self, tmp_path):
+        """Test WAL and related pragmas are set on every SQLite connection"""
+        # Arrange
+        test_engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+
+        # Act
+        with test_engine.connect() as conn:
+            journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        test_engine.dispose()
+
+        # Assert
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout == 1234
+        assert foreign_keys == 1
+
+    def test_sqlite_pragmas_applied_on_async_connect(self, tmp_path):
+        """Test the async engine applies the same SQLite pragmas"""
+        # Arrange
+        test_engine = create_async_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}")
+
+        async def read_pragmas():
+            async with test_engine.connect() as conn:
+                journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+                foreign_keys = (await conn.exec_driver_sql("PRAGMA foreign_keys")).scalar()
+            await test_engine.dispose()
+            return journal_mode, foreign_keys
+
+        # Act
+        journal_mode, foreign_keys = asyncio.run(read_pragmas())
+
         # Assert
-        mock_create_all.assert_called_once_with(bind=engine)
+        assert journal_mode == "wal"
+        assert foreign_keys == 1
 
 class TestEnvironmentConfiguration:
     """Test suite for environment configuration"""
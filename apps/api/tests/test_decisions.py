@@ -0,0 +1,161 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import OutboxEvent, StaffingCoverage, TimeOffRequest
+import decisions
+import events
+from decisions import decision_chunks, parse_decisions
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+@pytest.fixture
+def requests(async_sessions, sync_session):
+    """Five pending requests for manager 1, one approved, and one pending for manager 2"""
+    rows = [
+        TimeOffRequest(employee_name=f"Employee {n}", start_date=date(2025, 12, 1 + n), end_date=date(2025, 12, 1 + n),
+                       manager_id=1, status="pending")
+        for n in range(5)
+    ] + [
+        TimeOffRequest(employee_name="Already Approved", start_date=date(2025, 12, 20), end_date=date(2025, 12, 20),
+                       manager_id=1, status="approved"),
+        TimeOffRequest(employee_name="Other Team", start_date=date(2025, 12, 1), end_date=date(2025, 12, 1),
+                       manager_id=2, status="pending"),
+    ]
+    sync_session.add_all(rows)
+    sync_session.commit()
+    return [row.id for row in rows]
+
+def decide(items):
+    return client.post("/manager/requests/decisions", params={"manager_id": 1}, json={"decisions": items})
+
+def statuses(sync_session, ids):
+    sync_session.expire_all()
+    return [sync_session.get(TimeOffRequest, request_id).status for request_id in ids]
+
+class TestDecisionsEndpoint:
+    """Test suite for POST /manager/requests/decisions"""
+
+    def test_approves_and_denies(self, requests, sync_session):
+        """Test each pending request gets its decision and an outcome"""
+        # Act
+        response = decide([{"id": requests[0], "status": "approved"}, {"id": requests[1], "status": "denied"},
+                           {"id": requests[2], "status": "approved"}])
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["updated"] == 3
+        assert data["results"] == [{"id": requests[0], "outcome": "approved"},
+                                   {"id": requests[1], "outcome": "denied"},
+                                   {"id": requests[2], "outcome": "approved"}]
+        assert statuses(sync_session, requests[:4]) == ["approved", "denied", "approved", "pending"]
+
+    def test_only_own_pending_requests_change(self, requests, sync_session):
+        """Test decided, foreign and unknown ids are reported and left alone"""
+        # Act
+        data = decide([{"id": requests[5], "status": "denied"}, {"id": requests[6], "status": "approved"},
+                       {"id": 9999, "status": "approved"}]).json()["data"]
+
+        # Assert
+        assert data["updated"] == 0
+        assert [result["outcome"] for result in data["results"]] == ["not_pending", "not_found", "not_found"]
+        assert statuses(sync_session, requests[5:]) == ["approved", "pending"]
+
+    def test_coverage_moves_from_pending(self, requests, sync_session):
+        """Test staffing_coverage follows the Core update"""
+        # Act
+        decide([{"id": requests[0], "status": "approved"}, {"id": requests[1], "status": "denied"}])
+
+        # Assert
+        counts = sync_session.execute(
+            select(StaffingCoverage.day, StaffingCoverage.approved_count, StaffingCoverage.pending_count)
+            .where(StaffingCoverage.manager_id == 1, StaffingCoverage.day.in_([date(2025, 12, 1), date(2025, 12, 2)]))
+            .order_by(StaffingCoverage.day)
+        ).all()
+        assert [(approved, pending) for _, approved, pending in counts] == [(1, 0), (0, 0)]
+
+    def test_set_based_in_chunks(self, requests):
+        """Test ids are updated a chunk at a time, not row by row"""
+        # Arrange
+        updates = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.startswith("UPDATE time_off_requests"):
+                updates.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            with patch.object(decisions, "DECISION_CHUNK_SIZE", 2):
+                response = decide([{"id": request_id, "status": "approved"} for request_id in requests[:5]])
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+        # Assert
+        assert response.json()["data"]["updated"] == 5
+        assert len(updates) == 3
+
+    def test_dashboard_cache_invalidated(self, requests):
+        """Test the manager's cached request list reflects the decisions"""
+        # Arrange
+        client.get("/manager/requests", params={"manager_id": 1})
+
+        # Act
+        decide([{"id": requests[0], "status": "approved"}])
+        page = client.get("/manager/requests", params={"manager_id": 1}).json()["data"]
+
+        # Assert
+        assert {row["id"]: row["status"] for row in page}[requests[0]] == "approved"
+
+    def test_writes_status_events(self, requests, sync_session):
+        """Test each decision lands in the outbox in the same transaction"""
+        # Act
+        with patch.object(events, "EVENT_WEBHOOK_URL", "http://example.invalid/hook"):
+            decide([{"id": requests[0], "status": "approved"}, {"id": requests[5], "status": "denied"}])
+
+        # Assert
+        rows = sync_session.execute(select(OutboxEvent)).scalars().all()
+        assert [(row.event_type, row.request_id) for row in rows] == [(events.STATUS_CHANGED, requests[0])]
+
+    @pytest.mark.parametrize("items", [
+        [],
+        [{"id": 1, "status": "pending"}],
+        [{"id": "1", "status": "approved"}],
+        [{"id": 1, "status": "approved"}, {"id": 1, "status": "denied"}],
+    ])
+    def test_invalid_payload(self, requests, items):
+        """Test malformed decision lists are rejected before touching the database"""
+        assert decide(items).status_code == 400
+
+class TestDecisionHelpers:
+    """Test suite for decision parsing and chunking"""
+
+    def test_duplicates_collapse(self):
+        """Test repeating the same decision for an id is harmless"""
+        payload = {"decisions": [{"id": 1, "status": "Approved"}, {"id": 1, "status": "approved"}]}
+        assert parse_decisions(payload) == {1: "approved"}
+
+    def test_too_many(self):
+        """Test the per-call cap"""
+        with patch.object(decisions, "MAX_DECISIONS", 2):
+            with pytest.raises(ValueError):
+                parse_decisions({"decisions": [{"id": n, "status": "approved"} for n in range(3)]})
+
+    def test_chunks_group_by_status(self):
+        """Test each chunk targets one status and holds at most chunk_size ids"""
+        chunks = decision_chunks({1: "approved", 2: "denied", 3: "approved", 4: "approved"}, chunk_size=2)
+        assert chunks == [("approved", [1, 3]), ("approved", [4]), ("denied", [2])]
@@ -0,0 +1,230 @@
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import Employee, TimeOffRequest, create_db_engine
+from employees import ensure_employees, link_request_employees, normalize_name
+from migrations import migrate
+
+client = TestClient(app)
+
+def submission(employee_name, start_date, end_date, manager_id=1):
+    return {"employee_name": employee_name, "start_date": start_date, "end_date": end_date,
+            "reason": "Vacation", "manager_id": manager_id}
+
+def employees(sync_session):
+    sync_session.expire_all()
+    return sync_session.execute(select(Employee).order_by(Employee.id)).scalars().all()
+
+class TestEmployeeLinking:
+    """Test suite for linking requests to de-duplicated employees"""
+
+    def test_submission_links_employee(self, async_sessions, sync_session):
+        """Test a submitted request gets an employee_id and creates the employee once"""
+        # Act
+        first = client.post("/requests", json=submission("Alice Smith", "2025-12-01", "2025-12-01")).json()["data"]
+        second = client.post("/requests", json=submission("  alice   SMITH ", "2025-12-08", "2025-12-08")).json()["data"]
+
+        # Assert
+        rows = employees(sync_session)
+        assert [(row.name, row.normalized_name, row.manager_id) for row in rows] == [("Alice Smith", "alice smith", 1)]
+        assert first["employee_id"] == second["employee_id"] == rows[0].id
+
+    def test_rename_relinks(self, async_sessions, sync_session):
+        """Test changing employee_name moves the request to that employee"""
+        # Arrange
+        created = client.post("/requests", json=submission("Alice Smith", "2025-12-01", "2025-12-01")).json()["data"]
+
+        # Act
+        request = sync_session.get(TimeOffRequest, created["id"])
+        request.employee_name = "Bob Johnson"
+        sync_session.commit()
+
+        # Assert
+        bob = [row for row in employees(sync_session) if row.name == "Bob Johnson"][0]
+        assert sync_session.get(TimeOffRequest, created["id"]).employee_id == bob.id
+
+    def test_bulk_import_links_employees(self, async_sessions, sync_session, manager_from_query):
+        """Test Core batch inserts resolve employees for the whole batch"""
+        # Arrange
+        body = "\n".join([
+            '{"employee_name": "Carol Davis", "start_date": "2025-12-01", "end_date": "2025-12-01", "manager_id": 1}',
+            '{"employee_name": "carol davis", "start_date": "2025-12-03", "end_date": "2025-12-03", "manager_id": 1}',
+            '{"employee_name": "Dan Brown", "start_date": "2025-12-01", "end_date": "2025-12-01", "manager_id": 1}',
+        ])
+
+        # Act
+        client.post("/requests/bulk", params={"manager_id": 1}, content=body)
+
+        # Assert
+        rows = sync_session.execute(
+            select(TimeOffRequest.employee_name, Employee.name)
+            .join(Employee, Employee.id == TimeOffRequest.employee_id).order_by(TimeOffRequest.id)
+        ).all()
+        assert [name for _, name in rows] == ["Carol Davis", "Carol Davis", "Dan Brown"]
+
+    def test_ensure_employees_batches(self, db_path):
+        """Test many names resolve with one lookup and one insert per batch"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        people = [(f"Employee {n}", 1) for n in range(1200)] + [("EMPLOYEE 7", 2)]
+
+        # Act
+        with engine.begin() as conn:
+            ids = ensure_employees(conn, people)
+            again = ensure_employees(conn, [("employee 7", 1)])
+
+        # Assert
+        engine.dispose()
+        assert len(ids) == 1200
+        assert again == {"employee 7": ids["employee 7"]}
+
+    def test_normalize_name(self):
+        """Test case and whitespace differences collapse to one key"""
+        assert normalize_name("  Zoë\tMÜLLER ") == normalize_name("zoë müller") == "zoë müller"
+
+class TestEmployeeBackfill:
+    """Test suite for the link_employees migration"""
+
+    def test_existing_names_deduplicated(self, db_path):
+        """Test unlinked requests get one employee per normalized name, latest manager winning"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO time_off_requests (employee_name, start_date, end_date, manager_id, status) VALUES "
+                "('Alice Smith', '2025-01-06', '2025-01-06', 1, 'approved'), "
+                "('alice  smith', '2025-02-03', '2025-02-03', 2, 'pending'), "
+                "('Bob Johnson', '2025-03-03', '2025-03-03', 1, 'pending')")
+
+        # Act
+        with engine.begin() as conn:
+            linked = link_request_employees(conn)
+            relinked = link_request_employees(conn)
+
+        # Assert
+        with engine.connect() as conn:
+            people = conn.execute(select(Employee.normalized_name, Employee.manager_id).order_by(Employee.id)).all()
+            unlinked = conn.execute(select(TimeOffRequest.id).where(TimeOffRequest.employee_id.is_(None))).all()
+        engine.dispose()
+        assert (linked, relinked) == (3, 0)
+        assert people == [("alice smith", 2), ("bob johnson", 1)]
+        assert unlinked == []
+
+    def test_migration_adds_column(self, tmp_path):
+        """Test a pre-employee database gains the column, the index and the links"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE TABLE managers (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, email VARCHAR NOT NULL, "
+                "password_hash VARCHAR NOT NULL, created_at DATETIME, updated_at DATETIME)")
+            conn.exec_driver_sql(
+                "CREATE TABLE time_off_requests (id INTEGER PRIMARY KEY AUTOINCREMENT, employee_name TEXT NOT NULL, "
+                "start_date DATE NOT NULL, end_date DATE NOT NULL, reason TEXT, manager_id INTEGER NOT NULL, "
+                "status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'denied')), "
+                "created_at TIMESTAMP, updated_at TIMESTAMP)")
+            conn.exec_driver_sql("INSERT INTO managers (id, name, email, password_hash) VALUES (1, 'M', 'm@x', 'x')")
+            conn.exec_driver_sql(
+                "INSERT INTO time_off_requests (employee_name, start_date, end_date, manager_id) "
+                "VALUES ('Alice Smith', '2025-01-06', '2025-01-06', 1)")
+
+        # Act
+        with engine.begin() as conn:
+            migrate(conn)
+
+        # Assert
+        with engine.connect() as conn:
+            employee_id = conn.exec_driver_sql("SELECT employee_id FROM time_off_requests").scalar()
+            indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(time_off_requests)")}
+        engine.dispose()
+        assert employee_id == 1
+        assert "idx_time_off_employee_id_start" in indexes
+
+@pytest.fixture
+def history(async_sessions):
+    """Alice's requests across two years plus one for another employee"""
+    for employee_name, start_date, end_date in [
+        ("Alice Smith", "2024-12-30", "2025-01-02"),
+        ("Alice Smith", "2025-03-03", "2025-03-07"),
+        ("alice smith", "2025-06-02", "2025-06-03"),
+        ("Bob Johnson", "2025-03-03", "2025-03-03"),
+    ]:
+        client.post("/requests", json=submission(employee_name, start_date, end_date))
+    return client.post("/requests", json=submission("Alice Smith", "2025-08-04", "2025-08-04")).json()["data"]
+
+# The employee routes identify the manager from ?manager_id= in these tests
+AS_MANAGER = {"manager_id": 1}
+
+@pytest.mark.usefixtures("manager_from_query")
+class TestEmployeeEndpoints:
+    """Test suite for employee-scoped endpoints"""
+
+    def test_history_newest_first(self, history):
+        """Test the employee's requests come back newest first, whatever the spelling"""
+        # Act
+        response = client.get(f"/employees/{history['employee_id']}/requests", params=AS_MANAGER)
+
+        # Assert
+        assert response.status_code == 200
+        body = response.json()
+        assert body["employee"]["name"] == "Alice Smith"
+        assert [row["start_date"] for row in body["data"]] == ["2025-08-04", "2025-06-02", "2025-03-03", "2024-12-30"]
+
+    def test_history_filters(self, history):
+        """Test date range, status and limit narrow the history"""
+        # Act
+        in_range = client.get(f"/employees/{history['employee_id']}/requests",
+                              params={**AS_MANAGER, "from": "2025-01-01", "to": "2025-06-30"}).json()["data"]
+        limited = client.get(f"/employees/{history['employee_id']}/requests", params={**AS_MANAGER, "limit": 1}).json()["data"]
+
+        # Assert
+        assert [row["start_date"] for row in in_range] == ["2025-06-02", "2025-03-03", "2024-12-30"]
+        assert len(limited) == 1
+
+    def test_balance(self, history):
+        """Test the balance counts only this employee's 2025 business days"""
+        # Act
+        data = client.get(f"/employees/{history['employee_id']}/balances", params={**AS_MANAGER, "year": 2025}).json()["data"]
+
+        # Assert - 2 (Jan 1-2) + 5 + 2 + 1 pending business days
+        assert (data["employee_name"], data["used_days"], data["pending_days"]) == ("Alice Smith", 0, 10)
+
+    def test_unknown_employee(self, async_sessions):
+        """Test a missing employee is a 404"""
+        assert client.get("/employees/999/requests", params=AS_MANAGER).status_code == 404
+        assert client.get("/employees/999/balances", params=AS_MANAGER).status_code == 404
+
+    def test_other_managers_employee(self, history):
+        """Test another manager's employee is a 404, like an unknown one"""
+        # Act
+        requests = client.get(f"/employees/{history['employee_id']}/requests", params={"manager_id": 2})
+        balances = client.get(f"/employees/{history['employee_id']}/balances", params={"manager_id": 2})
+
+        # Assert
+        assert requests.status_code == balances.status_code == 404
+        assert "Vacation" not in requests.text
+
+    def test_invalid_status(self, history):
+        """Test an unknown status filter is rejected"""
+        response = client.get(f"/employees/{history['employee_id']}/requests", params={**AS_MANAGER, "status": "maybe"})
+        assert response.status_code == 400
+
+class TestEmployeeAuth:
+    """Test suite for the login the employee routes require"""
+
+    def test_requires_login(self, history):
+        """Test anonymous callers cannot read an employee's history or balance"""
+        # Act
+        requests = client.get(f"/employees/{history['employee_id']}/requests")
+        balances = client.get(f"/employees/{history['employee_id']}/balances")
+
+        # Assert
+        assert requests.status_code == balances.status_code == 401
@@ -0,0 +1,310 @@
+import pytest
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import OutboxEvent, TimeOffRequest
+import events
+from events import STATUS_CHANGED, SUBMITTED, OutboxDispatcher, retry_delay
+
+client = TestClient(app)
+
+class StubWebhook:
+    """Local HTTP server recording POSTed batches and answering with queued status codes"""
+
+    def __init__(self):
+        self.batches = []
+        self.statuses = []
+        # Seconds to hold each response after the batch is received
+        self.delay = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.batches.append(json.loads(body))
+                time.sleep(stub.delay)
+                self.send_response(stub.statuses.pop(0) if stub.statuses else 200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhook"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def webhook(async_sessions):
+    """Stub webhook with the outbox enabled and pointed at it"""
+    stub = StubWebhook()
+    with patch.object(events, "EVENT_WEBHOOK_URL", stub.url):
+        yield stub
+    stub.close()
+
+def dispatcher_for(async_sessions, url, **kwargs):
+    engine = async_sessions.kw["bind"]
+    return OutboxDispatcher(lambda: engine, url, **kwargs)
+
+def submission(employee_name="Alice Smith"):
+    return {"employee_name": employee_name, "start_date": "2025-12-22", "end_date": "2025-12-24",
+            "reason": "Holidays", "manager_id": 1}
+
+def outbox(sync_session):
+    sync_session.expire_all()
+    return sync_session.execute(select(OutboxEvent).order_by(OutboxEvent.id)).scalars().all()
+
+class TestOutboxWrites:
+    """Test suite for events written alongside request changes"""
+
+    def test_submission_writes_event(self, webhook, sync_session):
+        """Test POST /requests records a submitted event in the same commit"""
+        # Act
+        created = client.post("/requests", json=submission()).json()["data"]
+
+        # Assert
+        rows = outbox(sync_session)
+        assert [(row.event_type, row.request_id, row.status) for row in rows] == [(SUBMITTED, created["id"], "pending")]
+        assert json.loads(rows[0].payload)["employee_name"] == "Alice Smith"
+
+    def test_status_change_writes_event(self, webhook, sync_session):
+        """Test a status change records the old and new status"""
+        # Arrange
+        created = client.post("/requests", json=submission()).json()["data"]
+
+        # Act
+        request = sync_session.get(TimeOffRequest, created["id"])
+        request.status = "approved"
+        sync_session.commit()
+
+        # Assert
+        rows = outbox(sync_session)
+        assert rows[-1].event_type == STATUS_CHANGED
+        payload = json.loads(rows[-1].payload)
+        assert (payload["previous_status"], payload["status"]) == ("pending", "approved")
+
+    def test_rolled_back_change_writes_nothing(self, webhook, sync_session):
+        """Test the event shares the transaction of the change it describes"""
+        # Arrange
+        created = client.post("/requests", json=submission()).json()["data"]
+
+        # Act
+        request = sync_session.get(TimeOffRequest, created["id"])
+        request.status = "denied"
+        sync_session.flush()
+        sync_session.rollback()
+
+        # Assert
+        assert [row.event_type for row in outbox(sync_session)] == [SUBMITTED]
+
+    def test_other_updates_write_nothing(self, webhook, sync_session):
+        """Test edits that keep the status do not emit status_changed"""
+        created = client.post("/requests", json=submission()).json()["data"]
+        sync_session.get(TimeOffRequest, created["id"]).reason = "Family"
+        sync_session.commit()
+        assert len(outbox(sync_session)) == 1
+
+    def test_disabled_without_webhook(self, async_sessions, sync_session):
+        """Test no events accumulate when EVENT_WEBHOOK_URL is unset"""
+        with patch.object(events, "EVENT_WEBHOOK_URL", ""):
+            client.post("/requests", json=submission())
+        assert outbox(sync_session) == []
+
+class TestOutboxDispatcher:
+    """Test suite for batched delivery to the webhook"""
+
+    def test_delivers_batch(self, webhook, async_sessions, sync_session):
+        """Test pending events go out in one POST and are marked delivered"""
+        # Arrange
+        for name in ("Alice Smith", "Bob Johnson", "Carol White"):
+            client.post("/requests", json=submission(name))
+        dispatcher = dispatcher_for(async_sessions, webhook.url)
+
+        async def scenario():
+            handled = await dispatcher.run_once()
+            await dispatcher.stop()
+            return handled
+
+        # Act
+        handled = asyncio.run(scenario())
+
+        # Assert
+        assert handled == 3
+        assert len(webhook.batches) == 1
+        batch = webhook.batches[0]["events"]
+        assert [event["data"]["employee_name"] for event in batch] == ["Alice Smith", "Bob Johnson", "Carol White"]
+        assert {event["type"] for event in batch} == {SUBMITTED}
+        assert all(row.status == "delivered" and row.delivered_at for row in outbox(sync_session))
+
+    def test_batches_are_bounded(self, webhook, async_sessions):
+        """Test a backlog is sent batch_size events at a time"""
+        # Arrange
+        for name in ("Alice Smith", "Bob Johnson", "Carol White"):
+            client.post("/requests", json=submission(name))
+        dispatcher = dispatcher_for(async_sessions, webhook.url, batch_size=2)
+
+        async def scenario():
+            handled = [await dispatcher.run_once() for _ in range(3)]
+            await dispatcher.stop()
+            return handled
+
+        # Act / Assert
+        assert asyncio.run(scenario()) == [2, 1, 0]
+        assert [len(batch["events"]) for batch in webhook.batches] == [2, 1]
+
+    def test_failed_delivery_is_retried_later(self, webhook, async_sessions, sync_session):
+        """Test a 5xx keeps the event pending with a backed-off next attempt"""
+        # Arrange
+        client.post("/requests", json=submission())
+        webhook.statuses = [503]
+        dispatcher = dispatcher_for(async_sessions, webhook.url)
+
+        async def scenario():
+            first = await dispatcher.run_once()
+            # Not due again yet
+            second = await dispatcher.run_once()
+            await dispatcher.stop()
+            return first, second
+
+        # Act
+        first, second = asyncio.run(scenario())
+
+        # Assert
+        row = outbox(sync_session)[0]
+        assert (first, second) == (1, 0)
+        assert (row.status, row.attempts, row.last_error) == ("pending", 1, "HTTP 503")
+        assert row.next_attempt_at > datetime.utcnow()
+        assert row.claim_token is None
+
+    def test_gives_up_after_max_attempts(self, webhook, async_sessions, sync_session):
+        """Test an event that keeps failing is marked failed, not retried forever"""
+        # Arrange
+        client.post("/requests", json=submission())
+        webhook.statuses = [500, 500]
+        dispatcher = dispatcher_for(async_sessions, webhook.url, max_attempts=2)
+
+        async def scenario():
+            await dispatcher.run_once()
+            # Make it due again immediately
+            async with async_sessions() as db:
+                await db.execute(update(OutboxEvent).values(next_attempt_at=datetime(2000, 1, 1)))
+                await db.commit()
+            await dispatcher.run_once()
+            await dispatcher.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        row = outbox(sync_session)[0]
+        assert (row.status, row.attempts) == ("failed", 2)
+        assert dispatcher.stats()["failed"] == 1
+
+    def test_unreachable_webhook(self, webhook, async_sessions, sync_session):
+        """Test connection errors count as a failed attempt"""
+        # Arrange
+        client.post("/requests", json=submission())
+        webhook.close()
+        dispatcher = dispatcher_for(async_sessions, webhook.url, timeout=1)
+
+        async def scenario():
+            await dispatcher.run_once()
+            await dispatcher.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        row = outbox(sync_session)[0]
+        assert row.status == "pending" and row.attempts == 1
+        assert "ConnectError" in row.last_error
+
+    def test_concurrent_dispatchers_never_share_events(self, webhook, async_sessions):
+        """Test two workers' claims are disjoint"""
+        # Arrange
+        for name in ("Alice Smith", "Bob Johnson", "Carol White", "Dan Brown"):
+            client.post("/requests", json=submission(name))
+        engine = async_sessions.kw["bind"]
+        first = dispatcher_for(async_sessions, webhook.url, batch_size=3)
+        second = dispatcher_for(async_sessions, webhook.url, batch_size=3)
+
+        # Act
+        async def scenario():
+            return await asyncio.gather(first.claim(engine), second.claim(engine))
+
+        claims = asyncio.run(scenario())
+
+        # Assert
+        ids = [row.id for rows in claims for row in rows]
+        assert len(ids) == len(set(ids)) == 4
+
+    def test_background_delivery(self, webhook, async_sessions, sync_session):
+        """Test the started dispatcher delivers without being called"""
+        # Arrange
+        client.post("/requests", json=submission())
+        dispatcher = dispatcher_for(async_sessions, webhook.url, poll_interval=0.02)
+
+        async def scenario():
+            await dispatcher.start()
+            # The outcome is recorded after the webhook has the batch
+            for _ in range(100):
+                if outbox(sync_session)[0].status == "delivered":
+                    break
+                await asyncio.sleep(0.02)
+            await dispatcher.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert len(webhook.batches) == 1
+        assert outbox(sync_session)[0].status == "delivered"
+
+    def test_stop_records_batch_in_flight(self, webhook, async_sessions, sync_session):
+        """Test stopping mid-POST waits for the outcome instead of leaving the batch claimed"""
+        # Arrange
+        client.post("/requests", json=submission())
+        webhook.delay = 0.3
+        dispatcher = dispatcher_for(async_sessions, webhook.url, poll_interval=0.02)
+
+        async def scenario():
+            await dispatcher.start()
+            for _ in range(100):
+                if webhook.batches:
+                    break
+                await asyncio.sleep(0.02)
+            await dispatcher.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        event = outbox(sync_session)[0]
+        assert (event.status, event.claim_token) == ("delivered", None)
+
+class TestRetryDelay:
+    """Test suite for retry backoff"""
+
+    def test_exponential_with_cap(self):
+        """Test delays double per attempt, stay jittered and never exceed the cap"""
+        assert 1 <= retry_delay(1, base=2, cap=300) <= 2
+        assert 4 <= retry_delay(3, base=2, cap=300) <= 8
+        assert 150 <= retry_delay(20, base=2, cap=300) <= 300
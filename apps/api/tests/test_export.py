@@ -0,0 +1,91 @@
+import pytest
+import csv
+import io
+import json
+from datetime import date
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest
+from export import EXPORT_FIELDS
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+@pytest.fixture
+def seeded(sync_session, async_sessions):
+    sync_session.add_all([
+        TimeOffRequest(employee_name="Alice Smith", start_date=date(2025, 9, 25), end_date=date(2025, 9, 27),
+                       reason="Vacation, beach", manager_id=1, status="approved"),
+        TimeOffRequest(employee_name="Bob Johnson", start_date=date(2025, 10, 1), end_date=date(2025, 10, 3),
+                       reason="Personal time", manager_id=2),
+        TimeOffRequest(employee_name="Carol Davis", start_date=date(2026, 1, 5), end_date=date(2026, 1, 5),
+                       reason=None, manager_id=1),
+    ])
+    sync_session.commit()
+
+class TestExportEndpoint:
+    """Test suite for GET /manager/requests/export"""
+
+    def test_csv_export(self, seeded):
+        """Test CSV export has a header and only the manager's rows"""
+        # Act
+        response = client.get("/manager/requests/export", params={"manager_id": 1, "format": "csv"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert list(rows[0].keys()) == EXPORT_FIELDS
+        assert [row["employee_name"] for row in rows] == ["Alice Smith", "Carol Davis"]
+        assert rows[0]["reason"] == "Vacation, beach"
+        assert rows[0]["start_date"] == "2025-09-25"
+        assert rows[1]["reason"] == ""
+
+    def test_ndjson_export(self, seeded):
+        """Test NDJSON export writes one JSON object per line"""
+        # Act
+        response = client.get("/manager/requests/export", params={"manager_id": 1, "format": "ndjson"})
+
+        # Assert
+        assert response.status_code == 200
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["employee_name"] for record in records] == ["Alice Smith", "Carol Davis"]
+        assert records[1]["reason"] is None
+
+    def test_export_filters_by_date_range_and_status(self, seeded):
+        """Test the year range and status filters"""
+        # Act
+        in_2025 = client.get("/manager/requests/export", params={"manager_id": 1, "format": "ndjson", "from": "2025-01-01", "to": "2025-12-31"})
+        pending = client.get("/manager/requests/export", params={"manager_id": 1, "format": "ndjson", "status": "pending"})
+
+        # Assert
+        assert [json.loads(line)["employee_name"] for line in in_2025.text.splitlines()] == ["Alice Smith"]
+        assert [json.loads(line)["employee_name"] for line in pending.text.splitlines()] == ["Carol Davis"]
+
+    def test_export_streams_in_chunks(self, seeded):
+        """Test rows are fetched in yield_per-sized partitions"""
+        # Act
+        with patch("export.EXPORT_CHUNK_SIZE", 1), patch("export._ndjson_chunk", wraps=__import__("export")._ndjson_chunk) as chunk:
+            response = client.get("/manager/requests/export", params={"manager_id": 1, "format": "ndjson"})
+
+        # Assert
+        assert len(response.text.splitlines()) == 2
+        assert chunk.call_count == 2
+
+    def test_unknown_format_rejected(self, async_sessions):
+        """Test an unsupported format is a client error"""
+        # Act
+        response = client.get("/manager/requests/export", params={"manager_id": 1, "format": "xlsx"})
+
+        # Assert
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from health import HealthMonitor
+
+class TestHealthMonitor:
+    """Test suite for the background database health monitor"""
+
+    def test_initial_state_is_unknown(self):
+        """Test a monitor that has never probed is not ready"""
+        # Arrange
+        monitor = HealthMonitor(AsyncMock(return_value=True))
+
+        # Act
+        snapshot = monitor.snapshot()
+
+        # Assert
+        assert snapshot["database"] == "unknown"
+        assert snapshot["stale"] is True
+        assert monitor.ready is False
+
+    def test_probe_once_records_success(self):
+        """Test a successful probe is cached with latency and timestamp"""
+        # Arrange
+        probe = AsyncMock(return_value=True)
+        monitor = HealthMonitor(probe)
+
+        # Act
+        result = asyncio.run(monitor.probe_once())
+
+        # Assert
+        assert result is True
+        assert monitor.ready is True
+        snapshot = monitor.snapshot()
+        assert snapshot["database"] == "connected"
+        assert snapshot["database_latency_ms"] >= 0
+        assert snapshot["checked_at"] is not None
+        probe.assert_awaited_once()
+
+    def test_probe_exception_is_recorded_as_unhealthy(self):
+        """Test a probe that raises marks the database disconnected"""
+        # Arrange
+        monitor = HealthMonitor(AsyncMock(side_effect=RuntimeError("boom")))
+
+        # Act
+        result = asyncio.run(monitor.probe_once())
+
+        # Assert
+        assert result is False
+        assert monitor.snapshot()["database"] == "disconnected"
+        assert monitor.ready is False
+
+    def test_stale_result_is_not_ready(self):
+        """Test a healthy result older than the threshold is not ready"""
+        # Arrange
+        monitor = HealthMonitor(AsyncMock(return_value=True), stale_after=0)
+        monitor.record(True, 1.0)
+
+        # Act & Assert
+        assert monitor.stale is True
+        assert monitor.ready is False
+
+    def test_background_task_probes_on_interval(self):
+        """Test start() probes immediately and keeps probing until stopped"""
+        # Arrange
+        probe = AsyncMock(return_value=True)
+        monitor = HealthMonitor(probe, interval=0.01)
+
+        async def run_briefly():
+            await monitor.start()
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        # Act
+        asyncio.run(run_briefly())
+
+        # Assert
+        assert probe.await_count >= 3
+        assert monitor._task is None
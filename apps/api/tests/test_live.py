@@ -0,0 +1,281 @@
+import pytest
+import asyncio
+import json
+from datetime import date
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest
+import live
+from events import STATUS_CHANGED, SUBMITTED
+from live import CHANGED, RESET, RequestEventHub, TooManyStreams, VersionWatcher, live_hub, stream_events
+
+client = TestClient(app)
+
+def parse_frames(body: str):
+    """(id, event, data) for every event in an SSE body, skipping comments and retry hints"""
+    frames = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":") and ": " in line)
+        if "event" in fields:
+            frames.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return frames
+
+async def collect(hub, subscriber, **kwargs):
+    return "".join([chunk async for chunk in stream_events(hub, subscriber, **kwargs)])
+
+def submission(employee_name="Alice Smith", start_date="2025-12-01", manager_id=1):
+    return {"employee_name": employee_name, "start_date": start_date, "end_date": start_date, "manager_id": manager_id}
+
+class TestRequestEventHub:
+    """Test suite for in-process fan-out, replay and backpressure"""
+
+    def test_fans_out_per_manager(self):
+        """Test each stream receives only its own manager's events"""
+        # Arrange
+        hub = RequestEventHub()
+
+        async def scenario():
+            first = hub.subscribe(1)
+            second = hub.subscribe(2)
+            hub.publish(1, SUBMITTED, {"id": 10})
+            hub.publish(2, SUBMITTED, {"id": 20})
+            return await asyncio.gather(collect(hub, first, max_seconds=0.05), collect(hub, second, max_seconds=0.05))
+
+        # Act
+        first, second = asyncio.run(scenario())
+
+        # Assert
+        assert [data["id"] for _, _, data in parse_frames(first)] == [10]
+        assert [data["id"] for _, _, data in parse_frames(second)] == [20]
+        assert hub.stats()["connections"] == 0
+
+    def test_resumes_from_last_event_id(self):
+        """Test a reconnect replays exactly the events it missed"""
+        # Arrange
+        hub = RequestEventHub()
+        for request_id in range(5):
+            hub.publish(1, SUBMITTED, {"id": request_id})
+
+        async def scenario():
+            # Sequences start at 1: the client last saw request 2
+            subscriber = hub.subscribe(1, f"{hub.epoch}-3")
+            return await collect(hub, subscriber, max_seconds=0.05)
+
+        # Act
+        frames = parse_frames(asyncio.run(scenario()))
+
+        # Assert
+        assert [(event_id, data["id"]) for event_id, _, data in frames] == [(f"{hub.epoch}-4", 3), (f"{hub.epoch}-5", 4)]
+
+    @pytest.mark.parametrize("last_event_id", ["otherworker-3", "garbage"])
+    def test_unresumable_id_resets(self, last_event_id):
+        """Test an id from another process is answered with a reset"""
+        # Arrange
+        hub = RequestEventHub()
+        hub.publish(1, SUBMITTED, {"id": 1})
+
+        async def scenario():
+            return await collect(hub, hub.subscribe(1, last_event_id), max_seconds=0.05)
+
+        # Act / Assert
+        assert [event for _, event, _ in parse_frames(asyncio.run(scenario()))] == [RESET]
+
+    def test_evicted_events_reset(self):
+        """Test falling behind the ring buffer asks for a refetch"""
+        # Arrange
+        hub = RequestEventHub(buffer_size=3)
+        for request_id in range(10):
+            hub.publish(1, SUBMITTED, {"id": request_id})
+
+        async def scenario():
+            return await collect(hub, hub.subscribe(1, f"{hub.epoch}-2"), max_seconds=0.05)
+
+        # Act / Assert
+        assert [event for _, event, _ in parse_frames(asyncio.run(scenario()))] == [RESET]
+
+    def test_slow_client_is_dropped(self):
+        """Test a stream whose queue fills ends with an overflow event instead of buffering without bound"""
+        # Arrange
+        hub = RequestEventHub(max_queue=3)
+
+        async def scenario():
+            subscriber = hub.subscribe(1)
+            for request_id in range(5):
+                hub.publish(1, SUBMITTED, {"id": request_id})
+            # Let the thread-safe deliveries run before the stream is read
+            await asyncio.sleep(0)
+            return await collect(hub, subscriber, max_seconds=1)
+
+        # Act
+        frames = parse_frames(asyncio.run(scenario()))
+
+        # Assert
+        assert [event for _, event, _ in frames] == ["overflow"]
+        assert hub.stats()["dropped"] == 1
+
+    def test_idle_stream_heartbeats(self):
+        """Test an idle stream sends keep-alive comments"""
+        # Arrange
+        hub = RequestEventHub()
+
+        async def scenario():
+            return await collect(hub, hub.subscribe(1), heartbeat=0.02, max_seconds=0.1)
+
+        # Act / Assert
+        assert asyncio.run(scenario()).count(": ping") >= 2
+
+    def test_connection_limit(self):
+        """Test streams beyond the per-worker limit are refused"""
+        hub = RequestEventHub(max_connections=1)
+
+        async def scenario():
+            hub.subscribe(1)
+            with pytest.raises(TooManyStreams):
+                hub.subscribe(2)
+
+        asyncio.run(scenario())
+
+    def test_publish_from_another_thread(self):
+        """Test writers outside the event loop (sync sessions, run_sync) reach the stream"""
+        # Arrange
+        hub = RequestEventHub()
+
+        async def scenario():
+            subscriber = hub.subscribe(1)
+            await asyncio.to_thread(hub.publish, 1, SUBMITTED, {"id": 7})
+            return await collect(hub, subscriber, max_seconds=0.05)
+
+        # Act / Assert
+        assert [data["id"] for _, _, data in parse_frames(asyncio.run(scenario()))] == [7]
+
+def events_since(last_event_id):
+    """Events published to manager 1 since last_event_id, read through the endpoint"""
+    with patch.object(live, "LIVE_MAX_STREAM_SECONDS", 0.05):
+        response = client.get("/manager/requests/stream", params={"manager_id": 1},
+                              headers={"Last-Event-ID": last_event_id})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_frames(response.text)
+
+@pytest.fixture
+def mark(async_sessions, manager_from_query):
+    """Last-Event-ID of the newest event so far, so tests see only their own events"""
+    live_hub.publish(1, "test.mark", {})
+    return f"{live_hub.epoch}-{live_hub.stats()['published']}"
+
+class TestPublishedChanges:
+    """Test suite for request writes reaching the stream"""
+
+    def test_submission_published_after_commit(self, mark):
+        """Test a committed submission is streamed with its request fields"""
+        # Act
+        created = client.post("/requests", json=submission()).json()["data"]
+
+        # Assert
+        frames = events_since(mark)
+        assert [(event, data["id"], data["status"]) for _, event, data in frames] == [(SUBMITTED, created["id"], "pending")]
+
+    def test_rejected_submission_not_published(self, mark):
+        """Test a flushed-then-rolled-back request never reaches dashboards"""
+        # Arrange
+        client.post("/requests", json=submission())
+
+        # Act
+        response = client.post("/requests", json=submission())
+
+        # Assert
+        assert response.status_code == 409
+        assert len(events_since(mark)) == 1
+
+    def test_orm_status_change(self, mark, sync_session):
+        """Test a status change through the ORM carries the previous status"""
+        # Arrange
+        created = client.post("/requests", json=submission()).json()["data"]
+
+        # Act
+        sync_session.get(TimeOffRequest, created["id"]).status = "approved"
+        sync_session.commit()
+
+        # Assert
+        _, event, data = events_since(mark)[-1]
+        assert (event, data["status"], data["previous_status"]) == (STATUS_CHANGED, "approved", "pending")
+
+    def test_bulk_decisions(self, mark):
+        """Test Core bulk decisions publish one event per decided request"""
+        # Arrange
+        ids = [client.post("/requests", json=submission(f"Employee {n}")).json()["data"]["id"] for n in range(3)]
+
+        # Act
+        client.post("/manager/requests/decisions", params={"manager_id": 1},
+                    json={"decisions": [{"id": request_id, "status": "denied"} for request_id in ids]})
+
+        # Assert
+        changes = [data["id"] for _, event, data in events_since(mark) if event == STATUS_CHANGED]
+        assert sorted(changes) == ids
+
+    def test_bulk_import_summarized(self, mark):
+        """Test a bulk import batch publishes one event per manager, not per row"""
+        # Arrange
+        body = "\n".join(json.dumps(submission(f"Employee {n}", f"2025-12-{n + 1:02d}")) for n in range(4))
+
+        # Act
+        client.post("/requests/bulk", params={"manager_id": 1}, content=body)
+
+        # Assert
+        assert [(event, data) for _, event, data in events_since(mark)] == [(live.IMPORTED, {"count": 4})]
+
+class TestVersionWatcher:
+    """Test suite for announcing changes made on other workers"""
+
+    def test_announces_changes_from_other_workers(self, async_sessions, sync_session):
+        """Test a version bump the hub never heard about reaches the manager's stream once"""
+        # Arrange - a separate hub stands in for this worker; the ORM write below is another worker's
+        hub = RequestEventHub()
+        watcher = VersionWatcher(hub, lambda: async_sessions.kw["bind"])
+
+        async def scenario():
+            subscriber = hub.subscribe(1)
+            other = hub.subscribe(2)
+            watcher.watch(1, 0)
+            await watcher.poll()
+            sync_session.add(TimeOffRequest(employee_name="Alice Smith", start_date=date(2025, 12, 1),
+                                            end_date=date(2025, 12, 1), manager_id=1))
+            sync_session.commit()
+            # Act
+            await watcher.poll()
+            await watcher.poll()
+            return await asyncio.gather(collect(hub, subscriber, max_seconds=0.05), collect(hub, other, max_seconds=0.05))
+
+        first, second = asyncio.run(scenario())
+
+        # Assert
+        assert [(event, data) for _, event, data in parse_frames(first)] == [(CHANGED, {"version": 1})]
+        assert parse_frames(second) == []
+        assert watcher.stats() == {"polls": 3, "changes": 1}
+
+    def test_forgets_closed_streams(self, async_sessions):
+        """Test managers without open streams are no longer polled"""
+        # Arrange
+        hub = RequestEventHub()
+        watcher = VersionWatcher(hub, lambda: async_sessions.kw["bind"])
+
+        async def scenario():
+            subscriber = hub.subscribe(1)
+            watcher.watch(1, 0)
+            hub.unsubscribe(subscriber)
+            await watcher.poll()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert - nothing to poll, so no query either
+        assert watcher.stats()["polls"] == 0
+        assert watcher._versions == {}
+
@@ -0,0 +1,282 @@
+import pytest
+import asyncio
+import time
+from unittest.mock import patch
+import bcrypt
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import Manager
+import auth
+from passwords import HasherBusy, PasswordHasher, hash_rounds
+from ratelimit import RateLimiter
+
+client = TestClient(app)
+
+EMAIL = "john.manager@company.com"
+PASSWORD = "admin123"
+
+@pytest.fixture
+def login_setup(async_sessions, sync_session):
+    """Cheap bcrypt cost, a known password for manager 1 and fresh rate limits"""
+    hasher = PasswordHasher(rounds=4, workers=2, max_queue=4, queue_timeout=5)
+    manager = sync_session.get(Manager, 1)
+    manager.password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)).decode()
+    sync_session.commit()
+    with patch.object(auth, "password_hasher", hasher), \
+         patch.object(auth, "ip_limiter", RateLimiter(20, 60)), \
+         patch.object(auth, "email_limiter", RateLimiter(3, 60)):
+        yield hasher
+    hasher.shutdown()
+
+def login(email=EMAIL, password=PASSWORD):
+    return client.post("/manager/login", json={"email": email, "password": password})
+
+class TestManagerLogin:
+    """Test suite for POST /manager/login"""
+
+    def test_valid_credentials(self, login_setup):
+        """Test a correct password returns the ManagerSession fields"""
+        # Act
+        response = login()
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["data"] == {
+            "id": 1, "name": "John Manager", "email": EMAIL, "authenticated": True}
+
+    def test_wrong_password_and_unknown_email_look_alike(self, login_setup):
+        """Test both failures return the same 401"""
+        # Act
+        wrong_password = login(password="nope")
+        unknown_email = login(email="nobody@company.com")
+
+        # Assert
+        assert wrong_password.status_code == unknown_email.status_code == 401
+        assert wrong_password.json() == unknown_email.json()
+
+    @pytest.mark.parametrize("payload", [{}, {"email": EMAIL}, {"email": EMAIL, "password": 123}])
+    def test_missing_fields(self, login_setup, payload):
+        """Test malformed bodies are rejected before any hashing"""
+        assert client.post("/manager/login", json=payload).status_code == 400
+
+    def test_rehash_when_cost_changes(self, login_setup, sync_session):
+        """Test a hash at an old cost is replaced on successful login"""
+        # Arrange
+        login_setup.rounds = 5
+
+        # Act
+        response = login()
+
+        # Assert
+        assert response.status_code == 200
+        sync_session.expire_all()
+        new_hash = sync_session.get(Manager, 1).password_hash
+        assert hash_rounds(new_hash) == 5
+        assert bcrypt.checkpw(PASSWORD.encode(), new_hash.encode())
+
+    def test_failed_login_keeps_hash(self, login_setup, sync_session):
+        """Test a wrong password never triggers a rehash"""
+        # Arrange
+        login_setup.rounds = 5
+        old_hash = sync_session.get(Manager, 1).password_hash
+
+        # Act
+        login(password="nope")
+
+        # Assert
+        sync_session.expire_all()
+        assert sync_session.get(Manager, 1).password_hash == old_hash
+
+class TestLoginRateLimits:
+    """Test suite for per-IP and per-email login throttling"""
+
+    def test_email_limit(self, login_setup):
+        """Test repeated attempts for one email get 429 with Retry-After"""
+        # Arrange
+        for _ in range(3):
+            login(password="nope")
+
+        # Act
+        response = login()
+
+        # Assert
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_email_case_ignored(self, login_setup, sync_session):
+        """Test an email matches whatever its case, at login and in the throttle"""
+        # Arrange - a stored address with capitals
+        sync_session.get(Manager, 1).email = "John.Manager@Company.com"
+        sync_session.commit()
+
+        # Act
+        logins = [login(email="  JOHN.manager@company.COM "), login(email="john.manager@company.com")]
+        for email in ("john.manager@company.com", "JOHN.MANAGER@COMPANY.COM", "John.Manager@Company.com"):
+            login(email=email, password="nope")
+        throttled = login(email="john.manager@COMPANY.com")
+
+        # Assert
+        assert [r.status_code for r in logins] == [200, 200]
+        assert logins[0].json()["data"]["email"] == "John.Manager@Company.com"
+        assert throttled.status_code == 429
+
+    def test_success_resets_email_limit(self, login_setup):
+        """Test a successful login clears the failures counted for that email"""
+        # Arrange
+        login(password="nope")
+        login(password="nope")
+        login()
+
+        # Act
+        responses = [login(password="nope") for _ in range(3)]
+
+        # Assert
+        assert [r.status_code for r in responses] == [401, 401, 401]
+
+    def test_ip_limit(self, login_setup):
+        """Test one client spraying many emails is throttled by IP"""
+        # Arrange
+        with patch.object(auth, "ip_limiter", RateLimiter(2, 60)):
+            login(email="a@company.com")
+            login(email="b@company.com")
+
+            # Act
+            response = login()
+
+        # Assert
+        assert response.status_code == 429
+
+    def test_hasher_busy_returns_503(self, login_setup):
+        """Test a saturated hashing pool answers 503 instead of queueing forever"""
+        # Arrange
+        async def busy(*args):
+            raise HasherBusy("Too many logins in progress, try again shortly", 5)
+
+        # Act
+        with patch.object(login_setup, "verify", busy):
+            response = login()
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+class TestPasswordHasher:
+    """Test suite for the bounded bcrypt pool"""
+
+    def test_hash_and_verify(self):
+        """Test hashes use the configured cost and verify"""
+        # Arrange
+        hasher = PasswordHasher(rounds=4)
+
+        async def scenario():
+            password_hash = await hasher.hash("secret")
+            return password_hash, await hasher.verify("secret", password_hash), await hasher.verify("other", password_hash)
+
+        # Act
+        password_hash, good, bad = asyncio.run(scenario())
+
+        # Assert
+        assert hash_rounds(password_hash) == 4
+        assert (good, bad) == (True, False)
+        assert not hasher.needs_rehash(password_hash)
+        hasher.shutdown()
+
+    def test_malformed_hash_fails_closed(self):
+        """Test a non-bcrypt stored hash simply does not verify"""
+        hasher = PasswordHasher(rounds=4)
+        assert asyncio.run(hasher.verify("secret", "x")) is False
+        assert hasher.needs_rehash("x")
+        hasher.shutdown()
+
+    def test_rejects_beyond_queue(self):
+        """Test jobs beyond workers + queue are refused immediately"""
+        # Arrange
+        hasher = PasswordHasher(rounds=4, workers=1, max_queue=1)
+
+        async def scenario():
+            return await asyncio.gather(*(hasher._run(time.sleep, 0.1) for _ in range(3)), return_exceptions=True)
+
+        # Act
+        results = asyncio.run(scenario())
+
+        # Assert
+        assert sum(isinstance(result, HasherBusy) for result in results) == 1
+        assert hasher.stats()["rejected"] == 1
+        hasher.shutdown()
+
+    def test_queue_timeout(self):
+        """Test a job that waited too long for a thread is dropped unrun"""
+        # Arrange
+        hasher = PasswordHasher(rounds=4, workers=1, max_queue=1, queue_timeout=0.05)
+        ran = []
+
+        async def scenario():
+            return await asyncio.gather(hasher._run(time.sleep, 0.2), hasher._run(ran.append, 1),
+                                        return_exceptions=True)
+
+        # Act
+        results = asyncio.run(scenario())
+
+        # Assert
+        assert isinstance(results[1], HasherBusy)
+        assert ran == []
+        assert hasher.stats() == {"in_flight": 0, "completed": 2, "rejected": 0, "timed_out": 1}
+        hasher.shutdown()
+
+    def test_event_loop_keeps_running(self):
+        """Test the loop serves other work while a hash is in progress"""
+        # Arrange
+        hasher = PasswordHasher(rounds=4)
+        ticks = []
+
+        async def ticker():
+            for _ in range(10):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(hasher._run(time.sleep, 0.2), ticker())
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert len(ticks) == 10
+        assert ticks[-1] - ticks[0] < 0.2
+        hasher.shutdown()
+
+class TestRateLimiter:
+    """Test suite for the token-bucket limiter"""
+
+    def test_refills_over_time(self):
+        """Test the bucket empties, reports a wait, then refills"""
+        # Arrange
+        limiter = RateLimiter(1, 0.05)
+
+        # Act
+        first, second = limiter.hit("ip"), limiter.hit("ip")
+        time.sleep(0.06)
+        third = limiter.hit("ip")
+
+        # Assert
+        assert first == 0 and third == 0
+        assert 0 < second <= 0.05
+
+    def test_keys_are_bounded(self):
+        """Test the least recently seen keys are forgotten past max_keys"""
+        limiter = RateLimiter(1, 60, max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.hit(key)
+        assert limiter.stats()["keys"] == 2
+        assert limiter.hit("a") == 0
+
+    def test_zero_limit_disables(self):
+        """Test a limit of 0 never throttles"""
+        limiter = RateLimiter(0, 60)
+        assert all(limiter.hit("ip") == 0 for _ in range(100))
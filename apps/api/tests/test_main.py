@@ -1,24 +1,23 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import sys
 import os
 
 # Add the parent directory to the path so we can import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import app
+from main import app, health_monitor
 
 client = TestClient(app)
 
 class TestHealthEndpoint:
     """Test suite for the health check endpoint"""
     
-    @patch('main.test_db_connection')
-    def test_health_check_healthy_database(self, mock_db_test):
+    def test_health_check_healthy_database(self):
         """Test health endpoint when database is healthy"""
         # Arrange
-        mock_db_test.return_value = True
+        health_monitor.record(True, 1.5)
         
         # Act
         response = client.get("/health")
@@ -30,13 +29,13 @@ class TestHealthEndpoint:
         assert data["service"] == "time-off-api"
         assert data["version"] == "1.0.0"
         assert data["database"] == "connected"
-        mock_db_test.assert_called_once()
+        assert data["database_latency_ms"] == 1.5
+        assert data["checked_at"] is not None
     
-    @patch('main.test_db_connection')
-    def test_health_check_unhealthy_database(self, mock_db_test):
+    def test_health_check_unhealthy_database(self):
         """Test health endpoint when database is unhealthy"""
         # Arrange
-        mock_db_test.return_value = False
+        health_monitor.record(False, 2.0)
         
         # Act
         response = client.get("/health")
@@ -48,7 +47,72 @@ class TestHealthEndpoint:
         assert data["service"] == "time-off-api"
         assert data["version"] == "1.0.0"
         assert data["database"] == "disconnected"
-        mock_db_test.assert_called_once()
+
+    @patch('main.check_async_db_connection', new_callable=AsyncMock)
+    def test_health_check_does_not_query_database(self, mock_db_test):
+        """Test health endpoint answers from the cached probe"""
+        # Arrange
+        health_monitor.record(True, 1.0)
+        
+        # Act
+        for _ in range(3):
+            client.get("/health")
+        
+        # Assert
+        mock_db_test.assert_not_awaited()
+
+    def test_health_check_stale_probe_is_unhealthy(self):
+        """Test health endpoint reports unhealthy when the probe is stale"""
+        # Arrange
+        health_monitor.record(True, 1.0)
+        
+        # Act
+        with patch.object(health_monitor, 'stale_after', -1):
+            response = client.get("/health")
+        
+        # Assert
+        data = response.json()
+        assert data["status"] == "unhealthy"
+        assert data["stale"] is True
+
+class TestProbeEndpoints:
+    """Test suite for liveness and readiness endpoints"""
+
+    def test_liveness(self):
+        """Test liveness always answers while the process is up"""
+        # Arrange
+        health_monitor.record(False, 1.0)
+
+        # Act
+        response = client.get("/health/live")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+
+    def test_readiness_when_database_healthy(self):
+        """Test readiness is 200 with a fresh healthy probe"""
+        # Arrange
+        health_monitor.record(True, 1.0)
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    def test_readiness_when_database_unhealthy(self):
+        """Test readiness is 503 when the probe failed"""
+        # Arrange
+        health_monitor.record(False, 1.0)
+
+        # Act
+        response = client.get("/health/ready")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json()["status"] == "not ready"
 
 class TestRootEndpoint:
     """Test suite for the root endpoint"""
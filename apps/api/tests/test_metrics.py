@@ -0,0 +1,133 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from metrics import CounterMetric, Histogram, MetricsRegistry, RequestStats, metrics
+
+client = TestClient(app)
+
+class TestHistogram:
+    """Test suite for the Prometheus histogram"""
+
+    def test_render_cumulative_buckets(self):
+        """Test buckets are cumulative and include +Inf, sum and count"""
+        # Arrange
+        histogram = Histogram("latency_seconds", "Latency", (0.1, 1.0))
+
+        # Act
+        histogram.observe(0.05, (("route", "/a"),))
+        histogram.observe(0.5, (("route", "/a"),))
+        histogram.observe(5.0, (("route", "/a"),))
+        lines = histogram.render()
+
+        # Assert
+        assert '# TYPE latency_seconds histogram' in lines
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{route="/a"} 3' in lines
+        assert 'latency_seconds_sum{route="/a"} 5.550000' in lines
+
+    def test_label_values_are_escaped(self):
+        """Test quotes in label values are escaped"""
+        counter = CounterMetric("c_total", "Counter")
+        counter.inc((("route", 'a"b'),))
+        assert 'c_total{route="a\\"b"} 1' in counter.render()
+
+class TestRegistry:
+    """Test suite for request and SQL observations"""
+
+    def test_n_plus_one_flagged(self):
+        """Test a statement repeated past the threshold is flagged"""
+        # Arrange
+        registry = MetricsRegistry()
+        stats = RequestStats()
+        for _ in range(12):
+            stats.statements["SELECT * FROM managers WHERE id = ?"] += 1
+        stats.queries = 12
+
+        # Act
+        registry.observe_request("GET", "/manager/requests", 200, 0.01, stats)
+
+        # Assert
+        assert registry.n_plus_one.value((("method", "GET"), ("route", "/manager/requests"))) == 1
+
+    def test_distinct_statements_not_flagged(self):
+        """Test a few different statements are not an N+1"""
+        # Arrange
+        registry = MetricsRegistry()
+        stats = RequestStats()
+        stats.statements.update(["SELECT 1", "SELECT 2", "SELECT 3"])
+
+        # Act
+        registry.observe_request("GET", "/", 200, 0.01, stats)
+
+        # Assert
+        assert registry.n_plus_one.value((("method", "GET"), ("route", "/"))) == 0
+
+    def test_slow_query_counted(self):
+        """Test statements over the threshold are counted"""
+        # Arrange
+        registry = MetricsRegistry()
+
+        # Act
+        with patch("metrics.SLOW_QUERY_MS", 50):
+            registry.observe_query("SELECT 1", 0.01, "/fast")
+            registry.observe_query("SELECT 2", 0.2, "/slow")
+
+        # Assert
+        assert registry.slow_queries.value() == 1
+
+class TestMetricsMiddleware:
+    """Test suite for the ASGI middleware and /metrics endpoint"""
+
+    def test_route_template_is_labelled(self, async_sessions, manager_from_query):
+        """Test requests are labelled by route template with status"""
+        # Act
+        client.get("/requests/overlapping", params={"from": "2025-01-01", "to": "2025-01-02", "manager_id": 1})
+        body = client.get("/metrics").text
+
+        # Assert
+        assert 'http_requests_total{method="GET",route="/requests/overlapping",status="200"}' in body
+        assert 'http_request_duration_seconds_count{method="GET",route="/requests/overlapping"}' in body
+
+    def test_queries_counted_per_request(self, async_sessions, manager_from_query):
+        """Test SQL statements issued by a request are attributed to its route"""
+        # Arrange
+        labels = (("method", "GET"), ("route", "/manager/requests"))
+        before = metrics.request_queries._series.get(labels, [0.0] * 20)[-2]
+
+        # Act
+        client.get("/manager/requests", params={"manager_id": 1})
+
+        # Assert
+        after = metrics.request_queries._series[labels][-2]
+        assert after - before >= 1
+
+    def test_unmatched_routes_share_a_label(self):
+        """Test unknown paths do not create one series per path"""
+        # Act
+        client.get("/no/such/path/123")
+        body = client.get("/metrics").text
+
+        # Assert
+        assert 'route="unmatched",status="404"' in body
+        assert "/no/such/path/123" not in body
+
+    def test_metrics_endpoint_format(self):
+        """Test /metrics serves Prometheus text including cache counters"""
+        # Act
+        response = client.get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "# TYPE db_query_duration_seconds histogram" in response.text
+        assert "time_off_cache_hits_total" in response.text
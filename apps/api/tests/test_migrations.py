@@ -0,0 +1,135 @@
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_engine
+from migrations import LATEST_VERSION, current_version, migrate
+
+# Schema as the ORM created it before versioning: no status CHECK, ix_* indexes,
+# and no derived tables
+LEGACY_SCHEMA = [
+    """CREATE TABLE managers (
+        id INTEGER NOT NULL, name VARCHAR NOT NULL, email VARCHAR NOT NULL, password_hash VARCHAR NOT NULL,
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+        PRIMARY KEY (id))""",
+    "CREATE UNIQUE INDEX ix_managers_email ON managers (email)",
+    "CREATE INDEX ix_managers_id ON managers (id)",
+    """CREATE TABLE time_off_requests (
+        id INTEGER NOT NULL, employee_name VARCHAR NOT NULL, start_date DATE NOT NULL, end_date DATE NOT NULL,
+        reason VARCHAR, manager_id INTEGER NOT NULL, status VARCHAR,
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+        PRIMARY KEY (id), FOREIGN KEY(manager_id) REFERENCES managers (id))""",
+    "CREATE INDEX ix_time_off_requests_id ON time_off_requests (id)",
+    "CREATE INDEX ix_time_off_requests_start_date ON time_off_requests (start_date)",
+    "CREATE INDEX ix_time_off_requests_end_date ON time_off_requests (end_date)",
+    "CREATE INDEX ix_time_off_requests_manager_id ON time_off_requests (manager_id)",
+    "INSERT INTO managers (id, name, email, password_hash) VALUES (1, 'John Manager', 'john@example.com', 'x')",
+    """INSERT INTO time_off_requests (employee_name, start_date, end_date, manager_id, status) VALUES
+        ('Alice Smith', '2025-09-25', '2025-09-27', 1, 'pending'),
+        ('Bob Johnson', '2025-10-01', '2025-10-01', 1, 'approved')""",
+]
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.exec_driver_sql(statement)
+    yield engine
+    engine.dispose()
+
+def run_migrate(engine) -> int:
+    with engine.begin() as conn:
+        return migrate(conn)
+
+class TestLegacyDatabase:
+    """Test suite for migrating a database created by the pre-versioning ORM"""
+
+    def test_migrates_to_latest(self, legacy_engine):
+        """Test every migration runs once and the version is recorded"""
+        # Act
+        applied = run_migrate(legacy_engine)
+
+        # Assert
+        assert applied == LATEST_VERSION
+        with legacy_engine.connect() as conn:
+            assert current_version(conn) == LATEST_VERSION
+
+    def test_status_is_constrained(self, legacy_engine):
+        """Test the rebuilt table rejects unknown statuses and keeps the data"""
+        # Act
+        run_migrate(legacy_engine)
+
+        # Assert
+        with legacy_engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT COUNT(*) FROM time_off_requests").scalar() == 2
+        with pytest.raises(IntegrityError):
+            with legacy_engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "INSERT INTO time_off_requests (employee_name, start_date, end_date, manager_id, status) "
+                    "VALUES ('Eve', '2025-01-01', '2025-01-01', 1, 'maybe')")
+
+    def test_indexes_renamed(self, legacy_engine):
+        """Test ix_* indexes are replaced by the names the SQL scripts use"""
+        # Act
+        run_migrate(legacy_engine)
+
+        # Assert
+        names = {index["name"] for index in inspect(legacy_engine).get_indexes("time_off_requests")}
+        assert {"idx_time_off_manager_id", "idx_time_off_dates", "idx_time_off_manager_start"} <= names
+        assert not any(name.startswith("ix_") for name in names)
+
+    def test_derived_tables_backfilled(self, legacy_engine):
+        """Test the day index and staffing coverage are created and filled"""
+        # Act
+        run_migrate(legacy_engine)
+
+        # Assert
+        with legacy_engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT COUNT(*) FROM time_off_request_days").scalar() == 4
+            assert conn.exec_driver_sql(
+                "SELECT SUM(pending_count), SUM(approved_count) FROM staffing_coverage").one() == (3, 1)
+
+class TestScriptDatabase:
+    """Test suite for databases created by database/create_sqlite_db.py"""
+
+    def test_only_stamps_version(self, tmp_path):
+        """Test an up-to-date schema is stamped without changing its data"""
+        # Arrange
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "database"))
+        from create_sqlite_db import create_database
+        create_database(tmp_path / "script.db")
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'script.db'}")
+
+        # Act
+        applied = run_migrate(engine)
+
+        # Assert
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT COUNT(*) FROM time_off_requests").scalar() == 3
+            assert conn.exec_driver_sql("SELECT COUNT(*) FROM time_off_request_days").scalar() == 7
+        engine.dispose()
+        assert applied == LATEST_VERSION
+
+class TestFastPath:
+    """Test suite for booting against an already migrated database"""
+
+    def test_second_run_only_checks_version(self, legacy_engine):
+        """Test a migrated database costs a version lookup and nothing else"""
+        # Arrange
+        run_migrate(legacy_engine)
+        statements = []
+        event.listen(legacy_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act
+        applied = run_migrate(legacy_engine)
+
+        # Assert
+        assert applied == 0
+        assert len(statements) <= 2
@@ -0,0 +1,175 @@
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest, TimeOffRequestDay
+from overlap import expand_days, rebuild_request_days
+
+client = TestClient(app)
+
+def add_request(session, employee_name, start_date, end_date, manager_id=1, status="pending"):
+    request = TimeOffRequest(
+        employee_name=employee_name,
+        start_date=start_date,
+        end_date=end_date,
+        reason="Vacation",
+        manager_id=manager_id,
+        status=status,
+    )
+    session.add(request)
+    session.commit()
+    return request
+
+def indexed_days(session, request_id):
+    return session.execute(
+        select(TimeOffRequestDay.day).where(TimeOffRequestDay.request_id == request_id).order_by(TimeOffRequestDay.day)
+    ).scalars().all()
+
+class TestExpandDays:
+    """Test suite for date range expansion"""
+
+    def test_single_day(self):
+        """Test a one-day request covers exactly that day"""
+        assert expand_days(date(2025, 10, 15), date(2025, 10, 15)) == [date(2025, 10, 15)]
+
+    def test_range_crosses_month(self):
+        """Test ranges are inclusive and cross month boundaries"""
+        days = expand_days(date(2025, 9, 29), date(2025, 10, 2))
+        assert days == [date(2025, 9, 29), date(2025, 9, 30), date(2025, 10, 1), date(2025, 10, 2)]
+
+class TestDayIndexMaintenance:
+    """Test suite for keeping time_off_request_days in sync with writes"""
+
+    def test_insert_indexes_every_day(self, sync_session):
+        """Test inserting a request writes one row per covered day"""
+        # Act
+        request = add_request(sync_session, "Alice Smith", date(2025, 9, 25), date(2025, 9, 27))
+
+        # Assert
+        assert indexed_days(sync_session, request.id) == [date(2025, 9, 25), date(2025, 9, 26), date(2025, 9, 27)]
+
+    def test_date_change_reindexes(self, sync_session):
+        """Test changing the dates replaces the indexed days"""
+        # Arrange
+        request = add_request(sync_session, "Alice Smith", date(2025, 9, 25), date(2025, 9, 27))
+
+        # Act
+        request.end_date = date(2025, 9, 25)
+        sync_session.commit()
+
+        # Assert
+        assert indexed_days(sync_session, request.id) == [date(2025, 9, 25)]
+
+    def test_status_change_keeps_index(self, sync_session):
+        """Test updates that do not touch dates leave the index alone"""
+        # Arrange
+        request = add_request(sync_session, "Alice Smith", date(2025, 9, 25), date(2025, 9, 26))
+
+        # Act
+        request.status = "approved"
+        sync_session.commit()
+
+        # Assert
+        assert len(indexed_days(sync_session, request.id)) == 2
+
+    def test_delete_unindexes(self, sync_session):
+        """Test deleting a request removes its indexed days"""
+        # Arrange
+        request = add_request(sync_session, "Alice Smith", date(2025, 9, 25), date(2025, 9, 26))
+        request_id = request.id
+
+        # Act
+        sync_session.delete(request)
+        sync_session.commit()
+
+        # Assert
+        assert indexed_days(sync_session, request_id) == []
+
+    def test_rebuild_repairs_index(self, sync_session):
+        """Test a rebuild restores rows removed behind the ORM's back"""
+        # Arrange
+        request = add_request(sync_session, "Alice Smith", date(2025, 9, 25), date(2025, 9, 26))
+        sync_session.execute(TimeOffRequestDay.__table__.delete())
+        sync_session.commit()
+
+        # Act
+        with sync_session.bind.begin() as connection:
+            rebuilt = rebuild_request_days(connection)
+
+        # Assert
+        assert rebuilt == 1
+        assert len(indexed_days(sync_session, request.id)) == 2
+
+@pytest.mark.usefixtures("manager_from_query")
+class TestOverlappingEndpoint:
+    """Test suite for GET /requests/overlapping; the manager comes from ?manager_id= here"""
+
+    @pytest.fixture
+    def seeded(self, sync_session, async_sessions):
+        add_request(sync_session, "Alice Smith", date(2025, 9, 25), date(2025, 9, 27), manager_id=1)
+        add_request(sync_session, "Bob Johnson", date(2025, 10, 1), date(2025, 10, 3), manager_id=2, status="approved")
+        add_request(sync_session, "Carol Davis", date(2025, 10, 15), date(2025, 10, 15), manager_id=1)
+        add_request(sync_session, "Dan Long", date(2025, 9, 1), date(2025, 10, 31), manager_id=1)
+
+    def names(self, response):
+        return [row["employee_name"] for row in response.json()["data"]]
+
+    def test_returns_requests_overlapping_range(self, seeded):
+        """Test partial, contained and enclosing overlaps are all returned"""
+        # Act
+        response = client.get("/requests/overlapping", params={"from": "2025-09-27", "to": "2025-10-01", "manager_id": 1})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["success"] is True
+        assert self.names(response) == ["Dan Long", "Alice Smith"]
+
+    def test_excludes_non_overlapping(self, seeded):
+        """Test requests entirely outside the range are excluded"""
+        # Act
+        response = client.get("/requests/overlapping", params={"from": "2025-10-04", "to": "2025-10-14", "manager_id": 1})
+
+        # Assert
+        assert self.names(response) == ["Dan Long"]
+
+    def test_only_own_requests_and_status(self, seeded):
+        """Test only the manager's requests come back, narrowed by the status filter"""
+        # Act
+        other = client.get("/requests/overlapping", params={"from": "2025-09-01", "to": "2025-12-31", "manager_id": 2})
+        by_status = client.get("/requests/overlapping",
+                               params={"from": "2025-09-01", "to": "2025-12-31", "status": "approved", "manager_id": 1})
+
+        # Assert
+        assert self.names(other) == ["Bob Johnson"]
+        assert self.names(by_status) == []
+
+    def test_rejects_inverted_range(self, async_sessions):
+        """Test from after to is a client error"""
+        # Act
+        response = client.get("/requests/overlapping", params={"from": "2025-10-02", "to": "2025-10-01", "manager_id": 1})
+
+        # Assert
+        assert response.status_code == 400
+
+    def test_rejects_unknown_status(self, async_sessions):
+        """Test an unknown status is a client error"""
+        # Act
+        response = client.get("/requests/overlapping", params={"from": "2025-10-01", "to": "2025-10-02", "status": "maybe", "manager_id": 1})
+
+        # Assert
+        assert response.status_code == 400
+
+class TestOverlappingAuth:
+    """Test suite for the login GET /requests/overlapping requires"""
+
+    def test_requires_login(self, async_sessions):
+        """Test anonymous callers get a 401, not other teams' requests"""
+        response = client.get("/requests/overlapping", params={"from": "2025-10-01", "to": "2025-10-02"})
+        assert response.status_code == 401
@@ -0,0 +1,128 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest
+from pagination import decode_cursor, encode_cursor, parse_fields
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+@pytest.fixture
+def seeded(sync_session, async_sessions):
+    # Two requests share each start date so the id tiebreak is exercised
+    for i in range(10):
+        sync_session.add(TimeOffRequest(
+            employee_name=f"Employee {i}",
+            start_date=date(2025, 1, 1) + timedelta(days=i // 2),
+            end_date=date(2025, 1, 1) + timedelta(days=i // 2 + 1),
+            reason="Vacation",
+            manager_id=1,
+            status="approved" if i % 3 == 0 else "pending",
+        ))
+    sync_session.add(TimeOffRequest(employee_name="Other Team", start_date=date(2025, 1, 1),
+                                    end_date=date(2025, 1, 1), manager_id=2))
+    sync_session.commit()
+
+def fetch_all(params):
+    names, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/manager/requests", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        names += [row["employee_name"] for row in body["data"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return names, pages
+
+class TestCursor:
+    """Test suite for opaque cursor tokens"""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the position it encodes"""
+        assert decode_cursor(encode_cursor(date(2025, 1, 2), 17)) == (date(2025, 1, 2), 17)
+
+    @pytest.mark.parametrize("token", ["not-a-cursor", "", encode_cursor(date(2025, 1, 2), 1)[:-3]])
+    def test_malformed_cursor(self, token):
+        """Test malformed tokens raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(token)
+
+class TestParseFields:
+    """Test suite for fields= projection parsing"""
+
+    def test_defaults_to_all_fields(self):
+        assert "reason" in parse_fields(None)
+
+    def test_subset_keeps_order_and_dedupes(self):
+        assert parse_fields("id, employee_name,id") == ["id", "employee_name"]
+
+    def test_unknown_field_rejected(self):
+        with pytest.raises(ValueError, match="password_hash"):
+            parse_fields("id,password_hash")
+
+class TestManagerRequestList:
+    """Test suite for GET /manager/requests"""
+
+    def test_pages_cover_every_row_once(self, seeded):
+        """Test walking the cursor returns every row once in (start_date, id) order"""
+        # Act
+        names, pages = fetch_all({"manager_id": 1, "limit": 3})
+
+        # Assert
+        assert names == [f"Employee {i}" for i in range(10)]
+        assert pages == 4
+
+    def test_last_page_has_no_cursor(self, seeded):
+        """Test an exact final page does not advertise another page"""
+        # Act
+        response = client.get("/manager/requests", params={"manager_id": 1, "limit": 10})
+
+        # Assert
+        assert len(response.json()["data"]) == 10
+        assert response.json()["next_cursor"] is None
+
+    def test_projection_returns_only_requested_fields(self, seeded):
+        """Test fields= limits the columns returned"""
+        # Act
+        response = client.get("/manager/requests", params={"manager_id": 1, "limit": 2, "fields": "id,employee_name,status"})
+
+        # Assert
+        body = response.json()
+        assert all(set(row) == {"id", "employee_name", "status"} for row in body["data"])
+        assert body["next_cursor"] is not None
+
+    def test_status_and_date_filters(self, seeded):
+        """Test status and date range filters apply across pages"""
+        # Act
+        approved, _ = fetch_all({"manager_id": 1, "limit": 2, "status": "approved"})
+        january_3rd, _ = fetch_all({"manager_id": 1, "limit": 2, "from": "2025-01-03", "to": "2025-01-03"})
+
+        # Assert
+        assert approved == ["Employee 0", "Employee 3", "Employee 6", "Employee 9"]
+        assert january_3rd == ["Employee 2", "Employee 3", "Employee 4", "Employee 5"]
+
+    def test_invalid_cursor_rejected(self, async_sessions):
+        """Test a malformed cursor is a client error"""
+        # Act
+        response = client.get("/manager/requests", params={"manager_id": 1, "cursor": "bogus"})
+
+        # Assert
+        assert response.status_code == 400
+
+    def test_unknown_field_rejected(self, async_sessions):
+        """Test an unknown projection field is a client error"""
+        # Act
+        response = client.get("/manager/requests", params={"manager_id": 1, "fields": "password_hash"})
+
+        # Assert
+        assert response.status_code == 400
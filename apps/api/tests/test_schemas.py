@@ -0,0 +1,119 @@
+import pytest
+from datetime import date, datetime
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+import numpy as np
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+import schemas
+from benchmarks.serialization import run_serialization_benchmark, sample_rows
+from database import TimeOffRequest
+from queries import row_dicts
+
+client = TestClient(app)
+
+request_list = TypeAdapter(List[schemas.TimeOffRequest])
+
+@pytest.fixture
+def requests(async_sessions, sync_session):
+    """Requests for manager 1 in December 2025"""
+    rows = [
+        TimeOffRequest(employee_name=f"Employee {n}", start_date=date(2025, 12, 1 + n), end_date=date(2025, 12, 2 + n),
+                       reason="Vacation" if n % 2 else None, manager_id=1)
+        for n in range(3)
+    ]
+    sync_session.add_all(rows)
+    sync_session.commit()
+    return [row.id for row in rows]
+
+class TestResponseSchemas:
+    """Test suite for responses matching the documented models"""
+
+    def test_manager_list_validates(self, requests, manager_from_query):
+        """Test GET /manager/requests validates as a RequestPage"""
+        # Act
+        body = client.get("/manager/requests", params={"manager_id": 1}).json()
+
+        # Assert
+        page = schemas.RequestPage.model_validate(body)
+        assert sorted(item.id for item in page.data) == sorted(requests)
+        assert page.data[0].status == "pending"
+
+    def test_overlapping_validates(self, requests, manager_from_query):
+        """Test GET /requests/overlapping items validate as TimeOffRequest"""
+        # Act
+        body = client.get("/requests/overlapping", params={"from": "2025-12-01", "to": "2025-12-31",
+                                                          "manager_id": 1}).json()
+
+        # Assert
+        assert body["success"] is True
+        assert len(request_list.validate_python(body["data"])) == 3
+
+    def test_submission_validates(self, async_sessions):
+        """Test POST /requests returns an ApiResponse[TimeOffRequest]"""
+        # Act
+        response = client.post("/requests", json={"employee_name": "Alice Smith", "start_date": "2025-12-01",
+                                                  "end_date": "2025-12-01", "manager_id": 1})
+
+        # Assert
+        created = schemas.ApiResponse[schemas.TimeOffRequest].model_validate(response.json()).data
+        assert (created.employee_name, created.start_date, created.status) == ("Alice Smith", date(2025, 12, 1), "pending")
+
+    def test_openapi_documents_models(self):
+        """Test the OpenAPI document carries the response schemas"""
+        # Act
+        spec = client.get("/openapi.json").json()
+
+        # Assert
+        assert {"TimeOffRequest", "ManagerSession", "RequestPage"} <= set(spec["components"]["schemas"])
+        ok = spec["paths"]["/manager/requests"]["get"]["responses"]["200"]["content"]["application/json"]
+        assert ok["schema"]["$ref"].endswith("/RequestPage")
+
+class TestWireFormat:
+    """Test suite for orjson output matching the previous encoder"""
+
+    def test_rows_encode_like_jsonable_encoder(self):
+        """Test dates, datetimes and nulls are written exactly as before"""
+        # Arrange
+        rows = sample_rows(4)
+
+        # Act
+        fast = schemas.json_response({"data": row_dicts(rows)}).body
+
+        # Assert
+        assert TypeAdapter(dict).validate_json(fast) == jsonable_encoder({"data": [dict(row._mapping) for row in rows]})
+        assert b'"start_date":"2025-01-01"' in fast
+        assert b'"created_at":"2024-12-01T09:30:00"' in fast
+
+    def test_numpy_scalars_encode_as_numbers(self):
+        """Test numpy values from the coverage and balance math stay plain numbers"""
+        body = schemas.json_response({"count": np.int64(3), "days": np.array([1, 2])}).body
+        assert body == b'{"count":3,"days":[1,2]}'
+
+    def test_row_dicts_empty(self):
+        """Test no rows gives an empty list"""
+        assert row_dicts([]) == []
+
+    def test_datetime_microseconds_preserved(self):
+        """Test sub-second timestamps keep their precision"""
+        body = schemas.json_response({"at": datetime(2025, 1, 1, 9, 30, 0, 123456)}).body
+        assert body == b'{"at":"2025-01-01T09:30:00.123456"}'
+
+class TestSerializationBenchmark:
+    """Test suite for the serialization microbenchmark"""
+
+    def test_small_run_times_every_strategy(self):
+        """Test a tiny run checks parity and reports each strategy"""
+        # Act
+        results = run_serialization_benchmark(rows=20, repeat=1)
+
+        # Assert
+        assert set(results) == {"jsonable_encoder+json", "pydantic_models", "row_dicts+orjson"}
+        assert all(ms >= 0 for ms in results.values())
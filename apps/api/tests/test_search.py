@@ -0,0 +1,207 @@
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import TimeOffRequest, create_db_engine
+from migrations import migrate
+from search import SEARCH_TABLE, create_search_index, drop_search_index, search_requests_query, search_terms
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+def add_request(sync_session, employee_name, reason=None, start=date(2025, 12, 1), manager_id=1, **fields):
+    request = TimeOffRequest(employee_name=employee_name, start_date=start, end_date=start, reason=reason,
+                             manager_id=manager_id, **fields)
+    sync_session.add(request)
+    sync_session.commit()
+    return request.id
+
+def search(q, manager_id=1, **params):
+    return client.get("/manager/requests/search", params={"q": q, "manager_id": manager_id, **params})
+
+def found(q, **params):
+    response = search(q, **params)
+    assert response.status_code == 200
+    return [row["id"] for row in response.json()["data"]]
+
+class TestSearchMatching:
+    """Test suite for what a search query matches"""
+
+    def test_name_prefix_and_reason_word(self, async_sessions, sync_session):
+        """Test names match by prefix and reasons by word, ignoring case and accents"""
+        # Arrange
+        smith = add_request(sync_session, "Alice Smith", "Dentist")
+        jose = add_request(sync_session, "José Álvarez", "Family wedding")
+
+        # Act / Assert
+        assert found("smi") == [smith]
+        assert found("DENTIST") == [smith]
+        assert found("jose alv") == [jose]
+        assert found("wedd") == [jose]
+        assert found("nobody") == []
+
+    def test_every_word_required(self, async_sessions, sync_session):
+        """Test all words must appear, in the name or the reason"""
+        # Arrange
+        both = add_request(sync_session, "Alice Smith", "Vacation")
+        add_request(sync_session, "Alice Jones", "Conference")
+
+        # Act / Assert
+        assert found("alice vacation") == [both]
+        assert sorted(found("alice")) == sorted([both, both + 1])
+
+    def test_only_own_requests(self, async_sessions, sync_session):
+        """Test another manager's matching requests are not returned"""
+        # Arrange
+        own = add_request(sync_session, "Alice Smith", manager_id=1)
+        other = add_request(sync_session, "Alice Smith", manager_id=2)
+
+        # Act / Assert
+        assert found("alice", manager_id=1) == [own]
+        assert found("alice", manager_id=2) == [other]
+
+    def test_query_syntax_is_inert(self, async_sessions, sync_session):
+        """Test FTS operators and quotes in q are searched as text, not executed"""
+        add_request(sync_session, "Alice Smith")
+        for q in ['"alice', "alice OR bob", "NEAR(alice", "manager_key:m1", "alice*)"]:
+            assert search(q).status_code == 200
+
+class TestSearchRanking:
+    """Test suite for result order and pages"""
+
+    def test_name_matches_first_then_newest(self, async_sessions, sync_session):
+        """Test requests whose employee matches outrank ones that only mention the word"""
+        # Arrange
+        mention = add_request(sync_session, "Bob Jones", "Covering for Carol", start=date(2025, 12, 20))
+        older = add_request(sync_session, "Carol Davis", "Vacation", start=date(2025, 11, 1))
+        newer = add_request(sync_session, "Carol Davis", "Vacation", start=date(2025, 12, 1))
+
+        # Act / Assert
+        assert found("carol") == [newer, older, mention]
+
+    def test_offset_pages(self, async_sessions, sync_session):
+        """Test limit/offset pages and next_offset"""
+        # Arrange
+        ids = [add_request(sync_session, "Alice Smith", start=date(2025, 12, 1 + n)) for n in range(5)]
+
+        # Act
+        first = search("alice", limit=2).json()
+        last = search("alice", limit=2, offset=4).json()
+
+        # Assert
+        assert [row["id"] for row in first["data"]] == ids[::-1][:2]
+        assert first["next_offset"] == 2
+        assert [row["id"] for row in last["data"]] == [ids[0]]
+        assert last["next_offset"] is None
+
+    def test_status_filter(self, async_sessions, sync_session):
+        """Test status narrows the matches"""
+        approved = add_request(sync_session, "Alice Smith", status="approved")
+        add_request(sync_session, "Alice Smith")
+        assert found("alice", status="approved") == [approved]
+
+    def test_invalid_queries(self, async_sessions):
+        """Test one-letter queries and unknown statuses are rejected"""
+        assert search("a").status_code == 400
+        assert search("alice", status="cancelled").status_code == 400
+        assert search("alice", offset=100000).status_code == 422
+
+    def test_like_fallback(self, async_sessions, sync_session):
+        """Test dialects without a full-text index match every word with LIKE, name matches first"""
+        # Arrange
+        mention = add_request(sync_session, "Bob Jones", "Covering for Carol", start=date(2025, 12, 20))
+        carol = add_request(sync_session, "Carol Davis", "100% off", start=date(2025, 11, 1))
+        add_request(sync_session, "Carol Davis", "Vacation", manager_id=2)
+
+        def like_search(*terms):
+            return sync_session.execute(search_requests_query("postgresql", 1, list(terms), 10)).scalars().all()
+
+        # Act / Assert
+        assert like_search("CAROL") == [carol, mention]
+        assert like_search("carol", "100%") == [carol]
+        assert like_search("10_%") == []
+
+class TestSearchIndexSync:
+    """Test suite for the triggers keeping the index in step with time_off_requests"""
+
+    def test_update_and_delete(self, async_sessions, sync_session):
+        """Test renames, reassignments and deletions are reflected immediately"""
+        # Arrange
+        request_id = add_request(sync_session, "Alice Smith", "Vacation")
+        request = sync_session.get(TimeOffRequest, request_id)
+
+        # Act / Assert
+        request.employee_name = "Alice Brown"
+        sync_session.commit()
+        assert (found("smith"), found("brown")) == ([], [request_id])
+
+        request.manager_id = 2
+        sync_session.commit()
+        assert (found("brown", manager_id=1), found("brown", manager_id=2)) == ([], [request_id])
+
+        sync_session.delete(request)
+        sync_session.commit()
+        assert found("brown", manager_id=2) == []
+
+    def test_core_bulk_import_is_indexed(self, async_sessions):
+        """Test rows written by Core statements are searchable without extra bookkeeping"""
+        body = '{"employee_name": "Bob Johnson", "start_date": "2025-12-01", "end_date": "2025-12-01", "manager_id": 1}'
+        client.post("/requests/bulk", params={"manager_id": 1}, content=body)
+        assert len(found("johnson")) == 1
+
+    def test_create_search_index_backfills(self, db_path):
+        """Test the migration step indexes requests written before the index existed"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn:
+            drop_search_index(conn)
+            conn.execute(text("DROP TRIGGER IF EXISTS time_off_requests_fts_insert"))
+            conn.execute(text("INSERT INTO time_off_requests (employee_name, start_date, end_date, manager_id) "
+                              "VALUES ('Alice Smith', '2025-12-01', '2025-12-01', 1)"))
+
+        # Act
+        with engine.begin() as conn:
+            create_search_index(conn)
+
+        # Assert
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH 'alice'").scalars().all() == [1]
+        engine.dispose()
+
+    def test_script_database_is_searchable(self, tmp_path):
+        """Test database/create_sqlite_db.py creates the same index and triggers"""
+        # Arrange
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "database"))
+        from create_sqlite_db import create_database
+        create_database(tmp_path / "script.db")
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'script.db'}")
+
+        # Act
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.exec_driver_sql("UPDATE time_off_requests SET reason = 'Honeymoon' WHERE employee_name = 'Alice Smith'")
+            rows = conn.exec_driver_sql(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH 'honey* AND manager_key : m1'").all()
+
+        # Assert
+        assert len(rows) == 1
+        engine.dispose()
+
+class TestSearchTerms:
+    """Test suite for query parsing"""
+
+    def test_short_words_dropped(self):
+        """Test one-letter words are ignored and an all-short query is an error"""
+        assert search_terms("  a  smith j ") == ["smith"]
+        with pytest.raises(ValueError):
+            search_terms("a b")
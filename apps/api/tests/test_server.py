@@ -0,0 +1,118 @@
+import pytest
+import signal
+import socket
+import subprocess
+import time
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import httpx
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+import database
+from database import create_db_engine
+from server import running_workers, server_config, worker_count
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+client = TestClient(app)
+
+class TestServerConfig:
+    """Test suite for the production server settings"""
+
+    def test_worker_count_from_environment(self):
+        """Test API_WORKERS overrides the CPU-based default"""
+        with patch.dict(os.environ, {"API_WORKERS": "3"}):
+            assert worker_count() == 3
+
+    def test_worker_count_defaults_to_cpus(self):
+        """Test the default is the number of CPUs this process may use"""
+        with patch.dict(os.environ, {"API_WORKERS": ""}):
+            assert worker_count() == len(os.sched_getaffinity(0))
+
+    def test_prefers_uvloop_and_httptools(self):
+        """Test the fast loop and parser are chosen when installed"""
+        # Act
+        config = server_config(2)
+
+        # Assert
+        assert config["workers"] == 2
+        assert config["loop"] == "uvloop"
+        assert config["http"] == "httptools"
+
+    def test_health_reports_workers(self):
+        """Test /health reports the running worker count and pid"""
+        # Act
+        with patch.dict(os.environ, {"API_RUNNING_WORKERS": "4"}):
+            data = client.get("/health").json()
+
+        # Assert
+        assert data["workers"] == 4
+        assert data["pid"] == os.getpid()
+
+    def test_single_process_reports_one_worker(self):
+        """Test `python main.py` counts as one worker"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert running_workers() == 1
+
+class TestForkSafety:
+    """Test suite for connection pools across fork"""
+
+    def test_pools_replaced_after_fork(self, tmp_path):
+        """Test the child hook gives existing engines a fresh pool"""
+        # Arrange
+        test_engine = create_db_engine(f"sqlite:///{tmp_path / 'fork.db'}")
+        with test_engine.connect():
+            pass
+        parent_pool = test_engine.pool
+
+        # Act
+        with patch.object(database, "_engine", test_engine):
+            database._reset_pools_after_fork()
+
+        # Assert
+        assert test_engine.pool is not parent_pool
+        test_engine.dispose()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class TestServerProcess:
+    """Test suite for running server.py"""
+
+    def test_starts_workers_and_stops_on_sigterm(self, tmp_path):
+        """Test the server serves from several workers and exits cleanly on SIGTERM"""
+        # Arrange
+        port = free_port()
+        db_url = f"sqlite:///{tmp_path / 'server.db'}"
+        env = {**os.environ, "API_WORKERS": "2", "API_HOST": "127.0.0.1", "API_LISTEN_PORT": str(port),
+               "DATABASE_URL": db_url, "ASYNC_DATABASE_URL": db_url.replace("sqlite:", "sqlite+aiosqlite:"),
+               "SESSION_DB_PATH": str(tmp_path / "sessions.db"), "API_LOG_LEVEL": "warning"}
+        server = subprocess.Popen([sys.executable, "server.py"], cwd=API_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        try:
+            # Act
+            health = None
+            for _ in range(100):
+                try:
+                    health = httpx.get(f"http://127.0.0.1:{port}/health", timeout=2).json()
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            server.send_signal(signal.SIGTERM)
+            exit_code = server.wait(timeout=30)
+        finally:
+            if server.poll() is None:
+                server.kill()
+
+        # Assert
+        assert health is not None
+        assert health["workers"] == 2
+        assert exit_code == 0
@@ -0,0 +1,249 @@
+import pytest
+import asyncio
+import time
+from unittest.mock import patch
+import bcrypt
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import Manager
+import auth
+from auth import SESSION_COOKIE
+from passwords import PasswordHasher
+from sessions import MemorySessionStore, SessionSweeper, SQLiteSessionStore, create_session_store
+
+client = TestClient(app)
+
+MANAGER = {"id": 1, "name": "John Manager", "email": "john.manager@company.com", "authenticated": True}
+
+@pytest.fixture
+def logged_out(async_sessions, sync_session):
+    """Manager 1 with password admin123, a cheap bcrypt cost and no client cookies"""
+    manager = sync_session.get(Manager, 1)
+    manager.password_hash = bcrypt.hashpw(b"admin123", bcrypt.gensalt(4)).decode()
+    sync_session.commit()
+    hasher = PasswordHasher(rounds=4)
+    with patch.object(auth, "password_hasher", hasher):
+        yield
+    client.cookies.clear()
+    hasher.shutdown()
+
+def login():
+    return client.post("/manager/login", json={"email": MANAGER["email"], "password": "admin123"})
+
+class TestSessionCookie:
+    """Test suite for cookie sessions on the /manager routes"""
+
+    def test_login_sets_http_only_cookie(self, logged_out):
+        """Test login starts a session the browser cannot read from script"""
+        # Act
+        response = login()
+
+        # Assert
+        assert response.status_code == 200
+        assert SESSION_COOKIE in response.cookies
+        assert "httponly" in response.headers["set-cookie"].lower()
+
+    def test_session_endpoint(self, logged_out):
+        """Test the session returns the ManagerSession fields"""
+        # Arrange
+        login()
+
+        # Act
+        response = client.get("/manager/session")
+
+        # Assert
+        assert response.json()["data"] == MANAGER
+
+    def test_protected_route_requires_session(self, logged_out):
+        """Test /manager routes reject requests without a valid cookie"""
+        # Act
+        missing = client.get("/manager/requests")
+        client.cookies.set(SESSION_COOKIE, "forged")
+        forged = client.get("/manager/requests")
+
+        # Assert
+        assert missing.status_code == forged.status_code == 401
+
+    def test_authentication_runs_no_queries(self, logged_out):
+        """Test a protected request never loads the manager from the database"""
+        # Arrange
+        login()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            response = client.get("/manager/requests")
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+        # Assert
+        assert response.status_code == 200
+        assert statements
+        assert not any("FROM managers" in statement for statement in statements)
+
+    def test_logout_ends_session(self, logged_out):
+        """Test the cookie stops working after logout"""
+        # Arrange
+        login()
+        token = client.cookies[SESSION_COOKIE]
+
+        # Act
+        client.post("/manager/logout")
+        client.cookies.set(SESSION_COOKIE, token)
+        response = client.get("/manager/session")
+
+        # Assert
+        assert response.status_code == 401
+
+class TestMemorySessionStore:
+    """Test suite for the in-process session store"""
+
+    def test_sliding_expiry(self):
+        """Test each use pushes expiry out by the full TTL"""
+        # Arrange
+        store = MemorySessionStore(ttl=0.1)
+        token = store.create(MANAGER)
+
+        # Act
+        for _ in range(3):
+            time.sleep(0.05)
+            assert store.get(token) == MANAGER
+        time.sleep(0.12)
+
+        # Assert
+        assert store.get(token) is None
+
+    def test_sweep_removes_only_expired(self):
+        """Test a sweep deletes expired sessions and keeps live ones"""
+        # Arrange
+        store = MemorySessionStore(ttl=0.05)
+        store.create(MANAGER)
+        time.sleep(0.06)
+        store.ttl = 60
+        live = store.create(MANAGER)
+
+        # Act
+        removed = store.sweep()
+
+        # Assert
+        assert removed == 1
+        assert store.get(live) == MANAGER
+        assert store.stats()["entries"] == 1
+
+    def test_revoke_manager(self):
+        """Test every session of one manager can be ended at once"""
+        store = MemorySessionStore()
+        tokens = [store.create(MANAGER) for _ in range(2)]
+        other = store.create({**MANAGER, "id": 2})
+        assert store.revoke_manager(1) == 2
+        assert all(store.get(token) is None for token in tokens)
+        assert store.get(other) is not None
+
+    def test_tokens_are_not_stored(self):
+        """Test the store keys sessions by a digest of the cookie"""
+        store = MemorySessionStore()
+        token = store.create(MANAGER)
+        assert token not in store._sessions
+
+class TestSQLiteSessionStore:
+    """Test suite for the SQLite session store shared by workers"""
+
+    def test_shared_between_workers(self, tmp_path):
+        """Test a session created by one worker is visible to, and ended by, another"""
+        # Arrange
+        first = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        second = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+        # Act
+        token = first.create(MANAGER)
+        seen = second.get(token)
+        second.delete(token)
+
+        # Assert
+        assert seen == MANAGER
+        assert first.get(token) is None
+        first.close()
+        second.close()
+
+    def test_expiry_and_sweep(self, tmp_path):
+        """Test expired sessions are refused and swept in bulk"""
+        # Arrange
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=0.05, refresh_interval=0)
+        tokens = [store.create(MANAGER) for _ in range(3)]
+        time.sleep(0.06)
+
+        # Act
+        refused = store.get(tokens[0])
+        removed = store.sweep()
+
+        # Assert
+        assert refused is None
+        assert removed == 3
+        store.close()
+
+    def test_refresh_is_throttled(self, tmp_path):
+        """Test a fresh session is read without writing a new expiry"""
+        # Arrange
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=3600, refresh_interval=60)
+        token = store.create(MANAGER)
+        changes_before = store._conn.total_changes
+
+        # Act
+        store.get(token)
+
+        # Assert
+        assert store._conn.total_changes == changes_before
+        store.close()
+
+class TestSessionBackend:
+    """Test suite for choosing the session store"""
+
+    def test_default_follows_worker_count(self, tmp_path, monkeypatch):
+        """Test one worker keeps sessions in memory and several share the SQLite store"""
+        # Arrange
+        monkeypatch.delenv("SESSION_BACKEND", raising=False)
+        monkeypatch.setenv("SESSION_DB_PATH", str(tmp_path / "sessions.db"))
+
+        # Act / Assert
+        assert isinstance(create_session_store(workers=1), MemorySessionStore)
+        assert isinstance(create_session_store(workers=4), SQLiteSessionStore)
+
+    def test_memory_refused_with_several_workers(self):
+        """Test an explicit memory backend cannot be combined with several workers"""
+        with pytest.raises(RuntimeError):
+            create_session_store("memory", workers=2)
+
+class TestSessionSweeper:
+    """Test suite for background expiry sweeps"""
+
+    def test_sweeps_in_background(self):
+        """Test the sweeper removes expired sessions without any request"""
+        # Arrange
+        store = MemorySessionStore(ttl=0.01)
+        store.create(MANAGER)
+        sweeper = SessionSweeper(store, interval=0.02)
+
+        async def scenario():
+            await sweeper.start()
+            await asyncio.sleep(0.1)
+            await sweeper.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert store.stats()["entries"] == 0
+        assert store.stats()["expirations"] == 1
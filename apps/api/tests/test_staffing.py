@@ -0,0 +1,193 @@
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+import sys
+import os
+
+# Add the parent directory to the path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+from database import StaffingCoverage, TimeOffRequest, create_db_engine
+from bulk_import import validate_row, write_batch
+from staffing import add_requests_coverage, dense_coverage, rebuild_coverage
+
+client = TestClient(app)
+
+# /manager routes identify the manager from ?manager_id= in these tests
+pytestmark = pytest.mark.usefixtures("manager_from_query")
+
+def add_request(session, start_date, end_date, manager_id=1, status="pending"):
+    request = TimeOffRequest(
+        employee_name="Alice Smith",
+        start_date=start_date,
+        end_date=end_date,
+        reason="Vacation",
+        manager_id=manager_id,
+        status=status,
+    )
+    session.add(request)
+    session.commit()
+    return request
+
+def coverage(session, manager_id=1):
+    """Non-empty coverage rows as {day: (approved, pending)}"""
+    rows = session.execute(
+        select(StaffingCoverage.day, StaffingCoverage.approved_count, StaffingCoverage.pending_count)
+        .where(StaffingCoverage.manager_id == manager_id)
+    ).all()
+    return {day: (approved, pending) for day, approved, pending in rows if approved or pending}
+
+class TestCoverageMaintenance:
+    """Test suite for keeping staffing_coverage in sync with ORM writes"""
+
+    def test_insert_counts_each_day(self, sync_session):
+        """Test overlapping requests add up per day"""
+        # Act
+        add_request(sync_session, date(2025, 9, 25), date(2025, 9, 26))
+        add_request(sync_session, date(2025, 9, 26), date(2025, 9, 26), status="approved")
+
+        # Assert
+        assert coverage(sync_session) == {
+            date(2025, 9, 25): (0, 1),
+            date(2025, 9, 26): (1, 1),
+        }
+
+    def test_status_change_moves_count(self, sync_session):
+        """Test approving and then denying a request moves and removes its counts"""
+        # Arrange
+        request = add_request(sync_session, date(2025, 9, 25), date(2025, 9, 25))
+
+        # Act
+        request.status = "approved"
+        sync_session.commit()
+        approved = coverage(sync_session)
+        request.status = "denied"
+        sync_session.commit()
+
+        # Assert
+        assert approved == {date(2025, 9, 25): (1, 0)}
+        assert coverage(sync_session) == {}
+
+    def test_date_and_manager_change(self, sync_session):
+        """Test moving a request shifts its days and its manager"""
+        # Arrange
+        request = add_request(sync_session, date(2025, 9, 25), date(2025, 9, 26))
+
+        # Act
+        request.start_date = date(2025, 9, 26)
+        request.end_date = date(2025, 9, 27)
+        request.manager_id = 2
+        sync_session.commit()
+
+        # Assert
+        assert coverage(sync_session, manager_id=1) == {}
+        assert coverage(sync_session, manager_id=2) == {date(2025, 9, 26): (0, 1), date(2025, 9, 27): (0, 1)}
+
+    def test_delete_uncounts(self, sync_session):
+        """Test deleting a request removes its contribution"""
+        # Arrange
+        request = add_request(sync_session, date(2025, 9, 25), date(2025, 9, 27), status="approved")
+
+        # Act
+        sync_session.delete(request)
+        sync_session.commit()
+
+        # Assert
+        assert coverage(sync_session) == {}
+
+    def test_bulk_import_counts(self, db_path, sync_session):
+        """Test batched Core inserts maintain coverage too"""
+        # Arrange
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        record = {"employee_name": "Bob", "start_date": "2025-10-01", "end_date": "2025-10-02",
+                  "manager_id": 1, "status": "approved"}
+
+        # Act
+        with engine.connect() as conn:
+            write_batch(conn, [(1, validate_row(record, {1})), (2, validate_row(record, {1}))])
+        engine.dispose()
+
+        # Assert
+        assert coverage(sync_session) == {date(2025, 10, 1): (2, 0), date(2025, 10, 2): (2, 0)}
+
+    def test_rebuild_matches_incremental(self, db_path, sync_session):
+        """Test a full rebuild reproduces the incrementally maintained counts"""
+        # Arrange
+        add_request(sync_session, date(2025, 9, 25), date(2025, 9, 27))
+        add_request(sync_session, date(2025, 9, 26), date(2025, 9, 28), status="approved")
+        add_request(sync_session, date(2025, 9, 26), date(2025, 9, 26), status="denied")
+        expected = coverage(sync_session)
+        engine = create_db_engine(f"sqlite:///{db_path}")
+
+        # Act
+        with engine.begin() as conn:
+            rebuild_coverage(conn)
+        engine.dispose()
+        sync_session.expire_all()
+
+        # Assert
+        assert coverage(sync_session) == expected
+
+    def test_portable_upsert(self, db_path, sync_session):
+        """Test dialects without an upsert statement add to existing days and insert new ones"""
+        # Arrange - SQLite standing in for a dialect with no upsert branch
+        add_request(sync_session, date(2025, 9, 25), date(2025, 9, 26))
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        engine.dialect.name = "postgresql"
+
+        # Act
+        with engine.begin() as conn:
+            add_requests_coverage(conn, [(1, date(2025, 9, 26), date(2025, 9, 27), "approved"),
+                                         (1, date(2025, 9, 27), date(2025, 9, 27), "pending")])
+        engine.dispose()
+
+        # Assert
+        sync_session.expire_all()
+        assert coverage(sync_session) == {date(2025, 9, 25): (0, 1), date(2025, 9, 26): (1, 1), date(2025, 9, 27): (1, 1)}
+
+class TestDenseCoverage:
+    """Test suite for spreading sparse rows into per-day arrays"""
+
+    def test_missing_days_are_zero(self):
+        """Test days without rows are filled with zeros"""
+        # Act
+        result = dense_coverage([(date(2025, 1, 2), 1, 3)], date(2025, 1, 1), date(2025, 1, 3))
+
+        # Assert
+        assert result["days"] == 3
+        assert result["approved"] == [0, 1, 0]
+        assert result["pending"] == [0, 3, 0]
+
+class TestCoverageEndpoint:
+    """Test suite for GET /manager/coverage"""
+
+    def test_returns_dense_calendar(self, async_sessions, sync_session):
+        """Test the endpoint returns one entry per day for the manager only"""
+        # Arrange
+        add_request(sync_session, date(2025, 9, 25), date(2025, 9, 26), status="approved")
+        add_request(sync_session, date(2025, 9, 25), date(2025, 9, 25), manager_id=2)
+
+        # Act
+        response = client.get("/manager/coverage", params={"manager_id": 1, "from": "2025-09-24", "to": "2025-09-27"})
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["manager_id"] == 1
+        assert data["from"] == "2025-09-24"
+        assert data["approved"] == [0, 1, 1, 0]
+        assert data["pending"] == [0, 0, 0, 0]
+
+    @pytest.mark.parametrize("params", [
+        {"from": "2025-09-27", "to": "2025-09-24"},
+        {"from": "2020-01-01", "to": "2025-01-01"},
+    ])
+    def test_rejects_bad_ranges(self, async_sessions, params):
+        """Test reversed and oversized ranges are rejected"""
+        # Act
+        response = client.get("/manager/coverage", params={"manager_id": 1, **params})
+
+        # Assert
+        assert response.status_code == 400
@@ -0,0 +1,88 @@
+import hashlib
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import ManagerRequestVersion, TimeOffRequest
+
+# Every change to a manager's requests bumps manager_request_versions in the same
+# transaction, so "version N" means the same data on every worker and a
+# conditional GET can be answered with one primary-key lookup.
+
+def bump_versions(connection: Connection, manager_ids: Iterable[int]):
+    """Increment the managers' versions in the caller's transaction"""
+    rows = [{"manager_id": manager_id, "version": 1} for manager_id in sorted(set(manager_ids)) if manager_id is not None]
+    if not rows:
+        return
+
+    table = ManagerRequestVersion.__table__
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite.insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.manager_id], set_={"version": table.c.version + 1})
+    elif dialect == "mysql":
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update(version=table.c.version + 1)
+    else:
+        # Portable fallback for other dialects: bump existing rows, insert the rest
+        missing = [
+            row for row in rows
+            if connection.execute(
+                update(table).where(table.c.manager_id == row["manager_id"]).values(version=table.c.version + 1)
+            ).rowcount == 0
+        ]
+        if missing:
+            connection.execute(insert(table), missing)
+        return
+    connection.execute(stmt, rows)
+
+async def manager_version(db: AsyncSession, manager_id: int) -> int:
+    """Current version of the manager's requests (0 before their first change)"""
+    version = (await db.execute(
+        select(ManagerRequestVersion.version).where(ManagerRequestVersion.manager_id == manager_id)
+    )).scalar()
+    # Release the connection; a 304 needs nothing else from the database
+    await db.rollback()
+    return version or 0
+
+def request_etag(manager_id: int, version: int, *variant) -> str:
+    """Weak ETag for one representation (route and parameters) of a manager's data at a version"""
+    digest = hashlib.sha1(repr(variant).encode()).hexdigest()[:12]
+    # Weak: gzip and identity encodings of the same JSON share it
+    return f'W/"{manager_id}.{version}.{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, so W/ prefixes are ignored)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == wanted:
+            return True
+    return False
+
+def _touched_managers(target) -> Set[int]:
+    managers = {target.manager_id}
+    history = inspect(target).attrs.manager_id.history
+    managers.update(manager_id for manager_id in history.deleted if manager_id is not None)
+    return managers
+
+# ORM writes bump in the flush; Core writers (decisions, bulk_import) call bump_versions
+
+@event.listens_for(TimeOffRequest, "after_insert")
+def _bump_on_insert(mapper, connection, target):
+    bump_versions(connection, [target.manager_id])
+
+@event.listens_for(TimeOffRequest, "after_update")
+def _bump_on_update(mapper, connection, target):
+    bump_versions(connection, _touched_managers(target))
+
+@event.listens_for(TimeOffRequest, "after_delete")
+def _bump_on_delete(mapper, connection, target):
+    bump_versions(connection, _touched_managers(target))
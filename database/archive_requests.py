@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Request Archiver for Time Off System
+Moves approved and denied requests that ended long ago from time_off_requests
+into time_off_requests_archive, in small batches; run it e.g. nightly from cron
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Reuse the API's models and maintenance helpers
+sys.path.insert(0, str(Path(__file__).parent.parent / "apps" / "api"))
+
+from archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_cutoff, archive_requests
+from database import create_db_engine
+
+def archive_old_requests(database_url=None, age_days=None, batch_size=None):
+    """Archive closed requests that ended more than age_days ago; returns requests moved"""
+
+    if database_url is None:
+        database_url = f"sqlite:///{Path(__file__).parent / 'time_off_system.db'}"
+
+    engine = create_db_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            return archive_requests(conn, archive_cutoff(age_days=age_days), batch_size)
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old closed time-off requests to the archive table")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: database/time_off_system.db)")
+    parser.add_argument("--age-days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"archive requests that ended more than this many days ago (default: {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                        help=f"requests moved per transaction (default: {ARCHIVE_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    moved = archive_old_requests(args.database_url, args.age_days, args.batch_size)
+    print(f"✓ Archived {moved} time-off requests")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
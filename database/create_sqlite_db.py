@@ -9,12 +9,87 @@ import os
 import hashlib
 from pathlib import Path
 
-def create_database():
+# Expand every request into one time_off_request_days row per covered day
+INDEX_REQUEST_DAYS_SQL = """
+    WITH RECURSIVE request_days(request_id, manager_id, day, end_date) AS (
+        SELECT id, manager_id, start_date, end_date FROM time_off_requests
+        UNION ALL
+        SELECT request_id, manager_id, date(day, '+1 day'), end_date
+        FROM request_days WHERE day < end_date
+    )
+    INSERT INTO time_off_request_days (request_id, manager_id, day)
+    SELECT request_id, manager_id, day FROM request_days
+"""
+
+# Count approved/pending requests per manager per day from the day index
+COUNT_STAFFING_COVERAGE_SQL = """
+    INSERT INTO staffing_coverage (manager_id, day, approved_count, pending_count)
+    SELECT d.manager_id, d.day,
+           SUM(r.status = 'approved'), SUM(r.status = 'pending')
+    FROM time_off_request_days d
+    JOIN time_off_requests r ON r.id = d.request_id
+    WHERE r.status IN ('approved', 'pending')
+    GROUP BY d.manager_id, d.day
+"""
+
+def insert_sample_data(cursor):
+    """Insert sample managers and time-off requests"""
+
+    # Insert sample data
+    # Password hash for 'admin123'
+    password_hash = '$2b$12$G1Oc3mjnFw1xVUApdfw4d.SttgDUZEB1nsMqDwS6xnfwYPzKS//Wq'
+
+    sample_managers = [
+        ('John Manager', 'john.manager@company.com', password_hash),
+        ('Sarah Supervisor', 'sarah.supervisor@company.com', password_hash)
+    ]
+
+    cursor.executemany(
+        "INSERT INTO managers (name, email, password_hash) VALUES (?, ?, ?)",
+        sample_managers
+    )
+    print("✓ Inserted sample managers")
+
+    # Insert sample time-off requests
+    sample_requests = [
+        ('Alice Smith', '2025-09-25', '2025-09-27', 'Vacation', 1),
+        ('Bob Johnson', '2025-10-01', '2025-10-03', 'Personal time', 2),
+        ('Carol Davis', '2025-10-15', '2025-10-15', 'Medical appointment', 1)
+    ]
+
+    # One employee per distinct name, de-duplicated like apps/api/employees.normalize_name
+    sample_employees = {}
+    for employee_name, _, _, _, manager_id in sample_requests:
+        sample_employees[" ".join(employee_name.split()).casefold()] = (employee_name, manager_id)
+
+    cursor.executemany(
+        "INSERT INTO employees (name, normalized_name, manager_id) VALUES (?, ?, ?)",
+        [(name, normalized_name, manager_id) for normalized_name, (name, manager_id) in sample_employees.items()]
+    )
+    print("✓ Inserted sample employees")
+
+    cursor.executemany(
+        "INSERT INTO time_off_requests (employee_name, employee_id, start_date, end_date, reason, manager_id) "
+        "VALUES (?, (SELECT id FROM employees WHERE normalized_name = ?), ?, ?, ?, ?)",
+        [(employee_name, " ".join(employee_name.split()).casefold(), *rest)
+         for employee_name, *rest in sample_requests]
+    )
+    print("✓ Inserted sample time-off requests")
+
+    # Expand each request into one row per covered day
+    cursor.execute(INDEX_REQUEST_DAYS_SQL)
+    print("✓ Indexed time-off request days")
+
+    cursor.execute(COUNT_STAFFING_COVERAGE_SQL)
+    print("✓ Counted staffing coverage")
+
+def create_database(db_path=None, sample_data=True):
     """Create SQLite database with required tables"""
 
-    # Create database directory
-    db_dir = Path(__file__).parent
-    db_path = db_dir / "time_off_system.db"
+    # Default to the database next to this script
+    if db_path is None:
+        db_path = Path(__file__).parent / "time_off_system.db"
+    db_path = Path(db_path)
 
     # Remove existing database
     if db_path.exists():
@@ -42,11 +117,26 @@ def create_database():
         """)
         print("✓ Created managers table")
 
+        # Create employees table; normalized_name is the de-duplication key
+        cursor.execute("""
+            CREATE TABLE employees (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name VARCHAR(255) NOT NULL,
+                normalized_name VARCHAR(255) NOT NULL,
+                email VARCHAR(255),
+                manager_id INTEGER,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE SET NULL
+            )
+        """)
+        print("✓ Created employees table")
+
         # Create time_off_requests table
         cursor.execute("""
             CREATE TABLE time_off_requests (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 employee_name TEXT NOT NULL,
+                employee_id INTEGER,
                 start_date DATE NOT NULL,
                 end_date DATE NOT NULL,
                 reason TEXT,
@@ -54,44 +144,141 @@ def create_database():
                 status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'denied')),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE
+                FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE,
+                FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE SET NULL
             )
         """)
         print("✓ Created time_off_requests table")
 
+        # Create day-bucket table used for "who is off between X and Y" queries
+        cursor.execute("""
+            CREATE TABLE time_off_request_days (
+                request_id INTEGER NOT NULL,
+                day DATE NOT NULL,
+                manager_id INTEGER NOT NULL,
+                PRIMARY KEY (request_id, day),
+                FOREIGN KEY (request_id) REFERENCES time_off_requests(id) ON DELETE CASCADE
+            )
+        """)
+        print("✓ Created time_off_request_days table")
+
+        # Create per-manager, per-day absence counts for the coverage calendar
+        cursor.execute("""
+            CREATE TABLE staffing_coverage (
+                manager_id INTEGER NOT NULL,
+                day DATE NOT NULL,
+                approved_count INTEGER NOT NULL DEFAULT 0,
+                pending_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (manager_id, day),
+                FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE
+            )
+        """)
+        print("✓ Created staffing_coverage table")
+
+        # Create per-manager counters bumped by every change to their requests (HTTP ETags)
+        cursor.execute("""
+            CREATE TABLE manager_request_versions (
+                manager_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE
+            )
+        """)
+        print("✓ Created manager_request_versions table")
+
+        # Create the outbox of request events awaiting webhook delivery
+        cursor.execute("""
+            CREATE TABLE event_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type VARCHAR(100) NOT NULL,
+                request_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at DATETIME NOT NULL,
+                claim_token VARCHAR(32),
+                last_error TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                delivered_at DATETIME
+            )
+        """)
+        print("✓ Created event_outbox table")
+
+        # Create the archive of closed requests moved out of time_off_requests (same ids)
+        cursor.execute("""
+            CREATE TABLE time_off_requests_archive (
+                id INTEGER PRIMARY KEY,
+                employee_name TEXT NOT NULL,
+                employee_id INTEGER,
+                start_date DATE NOT NULL,
+                end_date DATE NOT NULL,
+                reason TEXT,
+                manager_id INTEGER NOT NULL,
+                status TEXT CHECK (status IN ('pending', 'approved', 'denied')),
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE,
+                FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE SET NULL
+            )
+        """)
+        print("✓ Created time_off_requests_archive table")
+
+        # Create the full-text index over employee names and reasons, kept in sync
+        # with time_off_requests by triggers. manager_key ("m<id>") lets a search
+        # match only one manager's requests; the view is its content for rebuilds
+        cursor.execute("""
+            CREATE VIEW time_off_requests_search AS
+            SELECT id, employee_name, reason, 'm' || manager_id AS manager_key FROM time_off_requests
+        """)
+        cursor.execute("""
+            CREATE VIRTUAL TABLE time_off_requests_fts USING fts5(
+                employee_name, reason, manager_key,
+                content='time_off_requests_search', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6 7 8 9 10'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER time_off_requests_fts_insert AFTER INSERT ON time_off_requests BEGIN
+                INSERT INTO time_off_requests_fts (rowid, employee_name, reason, manager_key)
+                VALUES (new.id, new.employee_name, new.reason, 'm' || new.manager_id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER time_off_requests_fts_delete AFTER DELETE ON time_off_requests BEGIN
+                INSERT INTO time_off_requests_fts (time_off_requests_fts, rowid, employee_name, reason, manager_key)
+                VALUES ('delete', old.id, old.employee_name, old.reason, 'm' || old.manager_id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER time_off_requests_fts_update AFTER UPDATE OF employee_name, reason, manager_id
+            ON time_off_requests BEGIN
+                INSERT INTO time_off_requests_fts (time_off_requests_fts, rowid, employee_name, reason, manager_key)
+                VALUES ('delete', old.id, old.employee_name, old.reason, 'm' || old.manager_id);
+                INSERT INTO time_off_requests_fts (rowid, employee_name, reason, manager_key)
+                VALUES (new.id, new.employee_name, new.reason, 'm' || new.manager_id);
+            END
+        """)
+        print("✓ Created time_off_requests_fts search index")
+
         # Create indexes
         cursor.execute("CREATE INDEX idx_time_off_manager_id ON time_off_requests(manager_id)")
         cursor.execute("CREATE INDEX idx_time_off_dates ON time_off_requests(start_date, end_date)")
+        cursor.execute("CREATE INDEX idx_time_off_manager_start ON time_off_requests(manager_id, start_date)")
+        cursor.execute("CREATE INDEX idx_time_off_employee_id_start ON time_off_requests(employee_id, start_date)")
         cursor.execute("CREATE INDEX idx_managers_email ON managers(email)")
+        cursor.execute("CREATE UNIQUE INDEX uq_employees_normalized_name ON employees(normalized_name)")
+        cursor.execute("CREATE INDEX idx_employees_manager_id ON employees(manager_id)")
+        cursor.execute("CREATE INDEX idx_request_days_day ON time_off_request_days(day, request_id)")
+        cursor.execute("CREATE INDEX idx_request_days_manager_day ON time_off_request_days(manager_id, day)")
+        cursor.execute("CREATE INDEX idx_event_outbox_due ON event_outbox(status, next_attempt_at)")
+        cursor.execute("CREATE INDEX idx_event_outbox_claim ON event_outbox(claim_token)")
+        cursor.execute("CREATE INDEX idx_time_off_archive_manager_end ON time_off_requests_archive(manager_id, end_date)")
+        cursor.execute("CREATE INDEX idx_time_off_archive_employee_end ON time_off_requests_archive(employee_id, end_date)")
+        cursor.execute("CREATE INDEX idx_time_off_archive_end ON time_off_requests_archive(end_date)")
         print("✓ Created indexes")
 
-        # Insert sample data
-        # Password hash for 'admin123'
-        password_hash = '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPWfQKRE8TIaG'
-
-        sample_managers = [
-            ('John Manager', 'john.manager@company.com', password_hash),
-            ('Sarah Supervisor', 'sarah.supervisor@company.com', password_hash)
-        ]
-
-        cursor.executemany(
-            "INSERT INTO managers (name, email, password_hash) VALUES (?, ?, ?)",
-            sample_managers
-        )
-        print("✓ Inserted sample managers")
-
-        # Insert sample time-off requests
-        sample_requests = [
-            ('Alice Smith', '2025-09-25', '2025-09-27', 'Vacation', 1),
-            ('Bob Johnson', '2025-10-01', '2025-10-03', 'Personal time', 2),
-            ('Carol Davis', '2025-10-15', '2025-10-15', 'Medical appointment', 1)
-        ]
-
-        cursor.executemany(
-            "INSERT INTO time_off_requests (employee_name, start_date, end_date, reason, manager_id) VALUES (?, ?, ?, ?, ?)",
-            sample_requests
-        )
-        print("✓ Inserted sample time-off requests")
+        if sample_data:
+            insert_sample_data(cursor)
 
         # Commit changes
         conn.commit()
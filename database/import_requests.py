@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Bulk Time-Off Request Import for Time Off System
+Loads JSON Lines or CSV requests in batched transactions, reporting per-row errors
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Reuse the API's models and import pipeline
+sys.path.insert(0, str(Path(__file__).parent.parent / "apps" / "api"))
+
+from bulk_import import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, BulkImport, import_lines, load_manager_ids
+from database import create_db_engine
+
+def import_requests(path, fmt=None, batch_size=DEFAULT_BATCH_SIZE, database_url=None):
+    """Import requests from a file and return the import report"""
+
+    path = Path(path)
+    if fmt is None:
+        fmt = "csv" if path.suffix.lower() == ".csv" else "jsonl"
+    if database_url is None:
+        database_url = f"sqlite:///{Path(__file__).parent / 'time_off_system.db'}"
+
+    engine = create_db_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            manager_ids = load_manager_ids(conn)
+            importer = BulkImport(fmt, manager_ids, batch_size)
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                return import_lines(conn, f, importer)
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import time-off requests")
+    parser.add_argument("path", help="JSON Lines (.jsonl) or CSV (.csv) file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="input format (default: from file extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: database/time_off_system.db)")
+    args = parser.parse_args()
+
+    report = import_requests(args.path, args.format, args.batch_size, args.database_url)
+
+    print(f"✓ Read {report['received']} records")
+    print(f"✓ Inserted {report['inserted']} time-off requests")
+    if report["failed"]:
+        print(f"✗ {report['failed']} records failed:")
+        for error in report["errors"]:
+            print(f"  - line {error['line']}: {error['error']}")
+    return 0 if not report["failed"] else 1
+
+if __name__ == "__main__":
+    exit(main())
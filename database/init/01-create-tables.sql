@@ -11,10 +11,22 @@ CREATE TABLE IF NOT EXISTS managers (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Create employees table; normalized_name is the de-duplication key
+CREATE TABLE IF NOT EXISTS employees (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    normalized_name VARCHAR(255) NOT NULL,
+    email VARCHAR(255),
+    manager_id INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE SET NULL
+);
+
 -- Create time_off_requests table
 CREATE TABLE IF NOT EXISTS time_off_requests (
     id INT AUTO_INCREMENT PRIMARY KEY,
     employee_name VARCHAR(255) NOT NULL,
+    employee_id INT,
     start_date DATE NOT NULL,
     end_date DATE NOT NULL,
     reason TEXT,
@@ -22,15 +34,88 @@ CREATE TABLE IF NOT EXISTS time_off_requests (
     status ENUM('pending', 'approved', 'denied') DEFAULT 'pending',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE,
+    FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE SET NULL
+);
+
+-- Create day-bucket table used for "who is off between X and Y" queries
+CREATE TABLE IF NOT EXISTS time_off_request_days (
+    request_id INT NOT NULL,
+    day DATE NOT NULL,
+    manager_id INT NOT NULL,
+    PRIMARY KEY (request_id, day),
+    FOREIGN KEY (request_id) REFERENCES time_off_requests(id) ON DELETE CASCADE
+);
+
+-- Create per-manager, per-day absence counts for the coverage calendar
+CREATE TABLE IF NOT EXISTS staffing_coverage (
+    manager_id INT NOT NULL,
+    day DATE NOT NULL,
+    approved_count INT NOT NULL DEFAULT 0,
+    pending_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (manager_id, day),
+    FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE
+);
+
+-- Create per-manager counters bumped by every change to their requests (HTTP ETags)
+CREATE TABLE IF NOT EXISTS manager_request_versions (
+    manager_id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE
 );
 
--- Insert sample data for testing
+-- Create the outbox of request events awaiting webhook delivery
+CREATE TABLE IF NOT EXISTS event_outbox (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    request_id INT NOT NULL,
+    payload TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL,
+    claim_token VARCHAR(32),
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    delivered_at DATETIME
+);
+
+-- Create the archive of closed requests moved out of time_off_requests (same ids)
+CREATE TABLE IF NOT EXISTS time_off_requests_archive (
+    id INT PRIMARY KEY,
+    employee_name VARCHAR(255) NOT NULL,
+    employee_id INT,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    reason TEXT,
+    manager_id INT NOT NULL,
+    status ENUM('pending', 'approved', 'denied'),
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (manager_id) REFERENCES managers(id) ON DELETE CASCADE,
+    FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE SET NULL
+);
+
+-- Insert sample data for testing (manager password: admin123)
 INSERT INTO managers (name, email, password_hash) VALUES
-('John Manager', 'john.manager@company.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPWfQKRE8TIaG'),
-('Sarah Supervisor', 'sarah.supervisor@company.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPWfQKRE8TIaG');
+('John Manager', 'john.manager@company.com', '$2b$12$G1Oc3mjnFw1xVUApdfw4d.SttgDUZEB1nsMqDwS6xnfwYPzKS//Wq'),
+('Sarah Supervisor', 'sarah.supervisor@company.com', '$2b$12$G1Oc3mjnFw1xVUApdfw4d.SttgDUZEB1nsMqDwS6xnfwYPzKS//Wq');
 
 -- Add indexes for performance
 CREATE INDEX idx_time_off_manager_id ON time_off_requests(manager_id);
 CREATE INDEX idx_time_off_dates ON time_off_requests(start_date, end_date);
-CREATE INDEX idx_managers_email ON managers(email);
\ No newline at end of file
+CREATE INDEX idx_time_off_manager_start ON time_off_requests(manager_id, start_date);
+CREATE INDEX idx_time_off_employee_id_start ON time_off_requests(employee_id, start_date);
+CREATE INDEX idx_managers_email ON managers(email);
+CREATE UNIQUE INDEX uq_employees_normalized_name ON employees(normalized_name);
+CREATE INDEX idx_employees_manager_id ON employees(manager_id);
+CREATE INDEX idx_request_days_day ON time_off_request_days(day, request_id);
+CREATE INDEX idx_request_days_manager_day ON time_off_request_days(manager_id, day);
+CREATE INDEX idx_event_outbox_due ON event_outbox(status, next_attempt_at);
+CREATE INDEX idx_event_outbox_claim ON event_outbox(claim_token);
+CREATE INDEX idx_time_off_archive_manager_end ON time_off_requests_archive(manager_id, end_date);
+CREATE INDEX idx_time_off_archive_employee_end ON time_off_requests_archive(employee_id, end_date);
+CREATE INDEX idx_time_off_archive_end ON time_off_requests_archive(end_date);
+
+-- Full-text search over employee names and reasons (GET /manager/requests/search)
+ALTER TABLE time_off_requests ADD FULLTEXT INDEX ft_time_off_search (employee_name, reason);
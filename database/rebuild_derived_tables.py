@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Derived Table Rebuild for Time Off System
+Recomputes time_off_request_days and staffing_coverage from time_off_requests,
+e.g. after rows were changed by hand or by a script that bypassed the API
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Reuse the API's models and maintenance helpers
+sys.path.insert(0, str(Path(__file__).parent.parent / "apps" / "api"))
+
+from database import create_db_engine
+from overlap import rebuild_request_days
+from staffing import rebuild_coverage
+
+def rebuild_derived_tables(database_url=None):
+    """Rebuild both derived tables in one transaction; returns (requests indexed, coverage rows)"""
+
+    if database_url is None:
+        database_url = f"sqlite:///{Path(__file__).parent / 'time_off_system.db'}"
+
+    engine = create_db_engine(database_url)
+    try:
+        with engine.begin() as conn:
+            return rebuild_request_days(conn), rebuild_coverage(conn)
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the day index and staffing coverage tables")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: database/time_off_system.db)")
+    args = parser.parse_args()
+
+    indexed, coverage_rows = rebuild_derived_tables(args.database_url)
+    print(f"✓ Indexed days for {indexed} time-off requests")
+    print(f"✓ Wrote {coverage_rows} staffing coverage rows")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -15,7 +15,7 @@ def test_database_connection():
     db_path = Path(__file__).parent / "time_off_system.db"
 
     if not db_path.exists():
-        print(f"✗ Database not found: {db_path}")
+        print(f"✗ Database not found: {db_path} (create it with database/create_sqlite_db.py)")
         return False
 
     try:
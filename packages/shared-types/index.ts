@@ -11,10 +11,12 @@ export interface Manager {
 export interface TimeOffRequest {
   id?: number // Optional for creation
   employee_name: string
+  employee_id?: number | null // Set by the API from the normalized employee_name
   start_date: string // ISO date string
   end_date: string // ISO date string
   reason?: string // Optional field
   manager_id: number
+  status?: 'pending' | 'approved' | 'denied' // Set by the API, 'pending' on creation
   created_at?: string // Optional, set by database
   updated_at?: string // Optional, set by database
 }
@@ -27,6 +29,13 @@ export interface TimeOffRequestForm {
   manager_id: number
 }
 
+export interface Employee {
+  id: number
+  name: string
+  email?: string | null
+  manager_id?: number | null
+}
+
 export interface ApiResponse<T> {
   success: boolean
   data?: T